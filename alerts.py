@@ -0,0 +1,460 @@
+"""Scheduler that emails saved searches only the postings they have not seen.
+
+Subscriptions sharing a query are scraped once per ``ALERT_INTERVAL``.
+
+Run it next to the web app (see ``Procfile``):
+
+    python alerts.py            # check for due queries every ALERT_TICK seconds
+    python alerts.py --once     # run whatever is due and exit, e.g. from cron
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from dotenv import load_dotenv
+
+from dedup import fingerprint
+from email_render import attachment_format, build_attachment, render_job_alert
+from locations import country_for_search
+from mailer import SENDER_EMAIL, send_message
+from metrics import registry, span, start_http_server
+from parallel_scrape import scrape_sites
+from scrape_cache import normalize_query
+
+load_dotenv()
+
+# -------------------------------------------------
+# Alert Configuration
+# -------------------------------------------------
+ALERTS_DB = os.getenv('ALERTS_DB', os.path.join('.cache', 'alerts.sqlite3'))
+ALERT_INTERVAL = int(os.getenv('ALERT_INTERVAL', 24 * 3600))  # seconds between scrapes of a query
+ALERT_RETRY = int(os.getenv('ALERT_RETRY', 900))  # next attempt after a failed scrape
+ALERT_TICK = int(os.getenv('ALERT_TICK', 60))  # how often the scheduler looks for due queries
+ALERT_WORKERS = int(os.getenv('ALERT_WORKERS', 4))  # queries scraped concurrently
+ALERTS_METRICS_PORT = int(os.getenv('ALERTS_METRICS_PORT', 0))  # exporter of this process; 0 = off
+ALERT_SENT_RETENTION = int(os.getenv('ALERT_SENT_RETENTION', 30 * 24 * 3600))  # forget sent fingerprints after
+
+ALERT_SITES = ["indeed", "linkedin", "zip_recruiter", "glassdoor"]
+ALERT_HOURS_OLD = 72
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    id INTEGER PRIMARY KEY,
+    query_key TEXT NOT NULL UNIQUE,
+    params TEXT NOT NULL,
+    next_run REAL NOT NULL,
+    last_run REAL,
+    last_status TEXT
+);
+CREATE INDEX IF NOT EXISTS queries_due ON queries (next_run);
+
+CREATE TABLE IF NOT EXISTS subscriptions (
+    id TEXT PRIMARY KEY,
+    query_id INTEGER NOT NULL REFERENCES queries (id),
+    email TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    created_at REAL NOT NULL,
+    last_sent REAL
+);
+CREATE INDEX IF NOT EXISTS subscriptions_query ON subscriptions (query_id, active);
+
+CREATE TABLE IF NOT EXISTS sent (
+    subscription_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    PRIMARY KEY (subscription_id, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sent_age ON sent (sent_at);
+"""
+
+
+def alert_params(job_role, location, results_wanted=10, experience_level=None):
+    """``scrape_jobs`` keywords for a saved search, built like a /search request."""
+    params = {
+        "site_name": ALERT_SITES,
+        "search_term": job_role,
+        "location": location,
+        "results_wanted": results_wanted,
+        "hours_old": ALERT_HOURS_OLD,
+        "country_indeed": country_for_search(location),
+    }
+    if experience_level and experience_level != 'all':
+        params["job_type"] = experience_level
+    return params
+
+# -------------------------------------------------
+# Subscription Store
+# -------------------------------------------------
+class AlertStore:
+    """SQLite store of saved searches and of the postings each one was sent.
+
+    Subscriptions whose normalized ``scrape_jobs`` parameters match share one
+    ``queries`` row, which carries the schedule: a query is scraped once per
+    interval however many subscriptions point at it. A claimed query that
+    never finishes (its scheduler died) is due again after ``lease`` seconds.
+    """
+
+    def __init__(self, db_path=ALERTS_DB, interval=ALERT_INTERVAL, retention=ALERT_SENT_RETENTION,
+                 lease=ALERT_RETRY):
+        self.db_path = db_path
+        self.interval = interval
+        self.retention = retention
+        self.lease = lease
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    # -- subscriptions --------------------------------------------------
+    def subscribe_many(self, subscriptions, now=None):
+        """Save ``(email, params)`` pairs in one transaction; returns their ids.
+
+        A new query is due right away, so the first alert goes out on the
+        next scheduler tick.
+        """
+        now = time.time() if now is None else now
+        ids = []
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            query_ids = {}
+            for email, params in subscriptions:
+                key = json.dumps(normalize_query(params))
+                query_id = query_ids.get(key)
+                if query_id is None:
+                    db.execute(
+                        "INSERT OR IGNORE INTO queries (query_key, params, next_run) VALUES (?, ?, ?)",
+                        (key, json.dumps(params), now)
+                    )
+                    query_id = query_ids[key] = db.execute(
+                        "SELECT id FROM queries WHERE query_key = ?", (key,)
+                    ).fetchone()[0]
+                subscription_id = uuid.uuid4().hex
+                db.execute(
+                    "INSERT INTO subscriptions (id, query_id, email, created_at) VALUES (?, ?, ?, ?)",
+                    (subscription_id, query_id, email.strip().lower(), now)
+                )
+                ids.append(subscription_id)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+        return ids
+
+    def subscribe(self, email, params, now=None):
+        return self.subscribe_many([(email, params)], now)[0]
+
+    def unsubscribe(self, subscription_id):
+        """Deactivate a subscription; returns False for unknown ids."""
+        with closing(self._connect()) as db:
+            cursor = db.execute("UPDATE subscriptions SET active = 0 WHERE id = ?", (subscription_id,))
+        return cursor.rowcount > 0
+
+    def get(self, subscription_id):
+        with closing(self._connect()) as db:
+            row = db.execute(
+                """SELECT s.id, s.email, s.active, s.created_at, s.last_sent, q.params,
+                          q.next_run, q.last_run, q.last_status
+                   FROM subscriptions s JOIN queries q ON q.id = s.query_id
+                   WHERE s.id = ?""",
+                (subscription_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        subscription = dict(row)
+        subscription["params"] = json.loads(subscription["params"])
+        subscription["active"] = bool(subscription["active"])
+        return subscription
+
+    # -- scheduling -----------------------------------------------------
+    def claim_due(self, now=None):
+        """Due queries with active subscribers, as ``(query_id, params)``.
+
+        Claimed queries are pushed ``lease`` seconds ahead in the same
+        transaction, so several scheduler processes never scrape the same
+        query twice; ``finish_query`` then schedules the next run.
+        """
+        now = time.time() if now is None else now
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            rows = db.execute(
+                """SELECT id, params FROM queries q
+                   WHERE next_run <= ?
+                     AND EXISTS (SELECT 1 FROM subscriptions s WHERE s.query_id = q.id AND s.active)
+                   ORDER BY next_run""",
+                (now,)
+            ).fetchall()
+            db.executemany(
+                "UPDATE queries SET next_run = ?, last_run = ? WHERE id = ?",
+                [(now + self.lease, now, row["id"]) for row in rows]
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+        return [(row["id"], json.loads(row["params"])) for row in rows]
+
+    def finish_query(self, query_id, status, retry_at=None):
+        """Record the run outcome and schedule the next run one interval after
+        this one started; ``retry_at`` overrides it after a failure."""
+        with closing(self._connect()) as db:
+            if retry_at is None:
+                db.execute("UPDATE queries SET last_status = ?, next_run = last_run + ? WHERE id = ?",
+                           (status, self.interval, query_id))
+            else:
+                db.execute("UPDATE queries SET last_status = ?, next_run = ? WHERE id = ?",
+                           (status, retry_at, query_id))
+
+    # -- diffing --------------------------------------------------------
+    def unsent(self, query_id, fingerprints):
+        """Per active subscription of ``query_id``: its email and which of
+        ``fingerprints`` it has not been sent, as ``{id: (email, set)}``."""
+        with closing(self._connect()) as db:
+            subscriptions = db.execute(
+                "SELECT id, email FROM subscriptions WHERE query_id = ? AND active",
+                (query_id,)
+            ).fetchall()
+            sent = db.execute(
+                """SELECT sent.subscription_id, sent.fingerprint
+                   FROM subscriptions s JOIN sent ON sent.subscription_id = s.id
+                   WHERE s.query_id = ? AND s.active
+                     AND sent.fingerprint IN (SELECT value FROM json_each(?))""",
+                (query_id, json.dumps(list(fingerprints)))
+            ).fetchall()
+        already = {}
+        for subscription_id, fp in sent:
+            already.setdefault(subscription_id, set()).add(fp)
+        everything = set(fingerprints)
+        return {row["id"]: (row["email"], everything - already.get(row["id"], set()))
+                for row in subscriptions}
+
+    def mark_sent(self, sent, now=None):
+        """Record ``{subscription_id: fingerprints}`` as delivered."""
+        now = time.time() if now is None else now
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.executemany(
+                "INSERT OR IGNORE INTO sent (subscription_id, fingerprint, sent_at) VALUES (?, ?, ?)",
+                [(subscription_id, fp, now) for subscription_id, fps in sent.items() for fp in fps]
+            )
+            db.executemany("UPDATE subscriptions SET last_sent = ? WHERE id = ?",
+                           [(now, subscription_id) for subscription_id in sent])
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def purge(self, now=None):
+        """Forget sent fingerprints older than the retention window."""
+        now = time.time() if now is None else now
+        with closing(self._connect()) as db:
+            return db.execute("DELETE FROM sent WHERE sent_at < ?", (now - self.retention,)).rowcount
+
+    def stats(self):
+        with closing(self._connect()) as db:
+            return {
+                "subscriptions": db.execute("SELECT COUNT(*) FROM subscriptions WHERE active").fetchone()[0],
+                "queries": db.execute(
+                    """SELECT COUNT(*) FROM queries q WHERE EXISTS
+                       (SELECT 1 FROM subscriptions s WHERE s.query_id = q.id AND s.active)"""
+                ).fetchone()[0],
+                "due": db.execute("SELECT COUNT(*) FROM queries WHERE next_run <= ?",
+                                  (time.time(),)).fetchone()[0],
+            }
+
+# -------------------------------------------------
+# Delivery
+# -------------------------------------------------
+def render_alert(params, jobs_df):
+    """Subject, HTML body and attachment for the new postings of one saved search."""
+    subject = f'Job Alert: {len(jobs_df)} new {params["search_term"]} positions found!'
+    attachment = None
+    try:
+        with span("alerts.attachment"):
+            attachment = build_attachment(jobs_df, params["search_term"])
+    except Exception as e:
+        print(f"Could not attach job list: {e}")
+    html = render_job_alert(params["search_term"], params["location"], jobs_df, attachment_format(attachment))
+    return subject, html, attachment
+
+
+def send_alert_email(recipient_email, subject, html, attachment):
+    if not SENDER_EMAIL:
+        raise Exception("Email credentials not configured. Please set SENDER_EMAIL and SENDER_PASSWORD environment variables.")
+    msg = MIMEMultipart('alternative')
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = recipient_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(html, 'html'))
+    if attachment is not None:
+        msg.attach(attachment)
+    send_message(msg)
+
+# -------------------------------------------------
+# Scheduler
+# -------------------------------------------------
+class AlertScheduler:
+    """Scrapes each due query once and emails every subscriber only the
+    postings they have not been sent.
+
+    Postings are identified by the normalized title/company/location
+    fingerprint (see ``dedup.fingerprint``), so a posting that moves between
+    boards or shows up again in a later scrape is not sent twice. A failed
+    send leaves the postings unrecorded for that subscriber; they go out with
+    the next run, which comes after ``retry`` seconds when no subscriber of
+    the query could be reached (e.g. SMTP was down).
+    """
+
+    def __init__(self, store=None, scrape=None, send=send_alert_email,
+                 workers=ALERT_WORKERS, tick=ALERT_TICK, retry=ALERT_RETRY):
+        if scrape is None:
+            from jobspy import scrape_jobs
+
+            # Per board through its governor; raises only when every board failed
+            scrape = lambda **params: scrape_sites(params, scrape_jobs)[0]
+        self.store = store or AlertStore()
+        self.scrape = scrape
+        self.send = send
+        self.workers = workers
+        self.tick = tick
+        self.retry = retry
+        self._lock = threading.Lock()
+        self.counters = {"runs": 0, "queries": 0, "failed_queries": 0, "emails": 0,
+                         "failed_emails": 0, "jobs_sent": 0, "jobs_skipped": 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _count(self, **values):
+        with self._lock:
+            for name, value in values.items():
+                self.counters[name] += value
+
+    def run_query(self, query_id, params, now=None):
+        try:
+            with span("alerts.scrape"):
+                jobs = self.scrape(**params)
+        except Exception as e:
+            print(f"Alert query {query_id} failed: {e}")
+            self.store.finish_query(query_id, f"error: {e}", (time.time() if now is None else now) + self.retry)
+            self._count(queries=1, failed_queries=1)
+            return
+
+        if jobs.empty:
+            self.store.finish_query(query_id, "no jobs")
+            self._count(queries=1)
+            return
+        jobs = jobs.assign(_fingerprint=fingerprint(jobs).to_numpy()).drop_duplicates("_fingerprint")
+        fingerprints = jobs["_fingerprint"]
+
+        # Subscribers that joined together have been sent the same postings:
+        # each distinct set of new postings is sliced and rendered once
+        groups = {}
+        skipped = 0
+        for subscription_id, (email, new) in self.store.unsent(query_id, fingerprints.tolist()).items():
+            skipped += len(fingerprints) - len(new)
+            if new:
+                groups.setdefault(frozenset(new), []).append((subscription_id, email))
+
+        delivered, emails, failed, sent_jobs = {}, 0, 0, 0
+        with span("alerts.deliver"):
+            for new, recipients in groups.items():
+                rendered = render_alert(params, jobs[fingerprints.isin(new)].drop(columns="_fingerprint"))
+                for subscription_id, email in recipients:
+                    try:
+                        self.send(email, *rendered)
+                    except Exception as e:
+                        print(f"Alert email to {email} failed: {e}")
+                        failed += 1
+                        continue
+                    delivered[subscription_id] = new
+                    emails += 1
+                    sent_jobs += len(new)
+        self.store.mark_sent(delivered, now)
+        if failed and not emails:
+            self.store.finish_query(query_id, f"{failed} emails failed",
+                                    (time.time() if now is None else now) + self.retry)
+        else:
+            self.store.finish_query(query_id, "ok")
+        self._count(queries=1, emails=emails, failed_emails=failed, jobs_sent=sent_jobs, jobs_skipped=skipped)
+
+    def run_once(self, now=None):
+        """Run every due query; returns the counters for this run."""
+        before = self.stats()
+        due = self.store.claim_due(now)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(lambda query: self.run_query(*query, now), due))
+        self.store.purge(now)
+        self._count(runs=1)
+        after = self.stats()
+        return {name: after[name] - before[name] for name in self.counters}
+
+    def run(self):
+        """Check for due queries every ``tick`` seconds until stopped."""
+        while not self._stop.is_set():
+            try:
+                totals = self.run_once()
+                if totals["queries"]:
+                    print(f"Alert run: {totals}")
+            except Exception as e:
+                print(f"Alert run failed: {e}")
+            self._stop.wait(self.tick)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="alert-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="run due queries once and exit")
+    parser.add_argument("--tick", type=int, default=ALERT_TICK)
+    args = parser.parse_args()
+
+    scheduler = AlertScheduler(tick=args.tick)
+    if ALERTS_METRICS_PORT and not args.once:
+        registry.register_stats("jobspy_alerts", scheduler.stats, "Alert scheduler counters")
+        registry.register_stats("jobspy_alert_store", scheduler.store.stats, "Saved searches")
+        start_http_server(ALERTS_METRICS_PORT)
+    if args.once:
+        print(f"Alert run: {scheduler.run_once()}")
+    else:
+        scheduler.run()
+
+
+if __name__ == "__main__":
+    main()
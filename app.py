@@ -1,22 +1,36 @@
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, Response, stream_with_context, g
 from jobspy import scrape_jobs
 import pandas as pd
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 import os
-from datetime import datetime
-import threading
+import json
+import time
 from dotenv import load_dotenv
-from io import StringIO
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from alerts import AlertStore, alert_params
+from batch_match import (BATCH_MATCH_K, BATCH_MATCH_MAX_RESUMES, CorpusWarmingUp, get_batch_matcher,
+                         matches_to_json, matches_to_parquet)
+from email_render import attachment_format, build_attachment, render_job_alert
+from governor import governor_stats
+from job_queue import JobQueue, QueueFull
+from job_records import JobTable
+from json_response import json_response, paginate, parse_fields
+from locations import country_for_search
+from mailer import mail_stats, send_message
+import metrics
+from metrics import span
+from parallel_scrape import iter_site_results, merge_results, scrape_sites
+from scrape_cache import scrape_cache
 
 # Load environment variables from .env file
 load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this'
+# Whole request body, uploads included; larger requests are refused with 413
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', 100)) * 1024 * 1024
 
 # Email Configuration (users should set these as environment variables)
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -28,23 +42,7 @@ def scrape_and_send_jobs(job_role, location, email, results_wanted=10, experienc
     """Scrape jobs and send email notification"""
     try:
         # Detect country from location
-        location_lower = location.lower()
-        country_indeed = 'USA'  # default
-        
-        if 'india' in location_lower:
-            country_indeed = 'India'
-        elif 'canada' in location_lower:
-            country_indeed = 'Canada'
-        elif 'uk' in location_lower or 'united kingdom' in location_lower or 'britain' in location_lower:
-            country_indeed = 'UK'
-        elif 'australia' in location_lower:
-            country_indeed = 'Australia'
-        elif 'germany' in location_lower:
-            country_indeed = 'Germany'
-        elif 'france' in location_lower:
-            country_indeed = 'France'
-        elif 'singapore' in location_lower:
-            country_indeed = 'Singapore'
+        country_indeed = country_for_search(location)
         
         # Prepare scraping parameters
         scrape_params = {
@@ -60,8 +58,11 @@ def scrape_and_send_jobs(job_role, location, email, results_wanted=10, experienc
         if experience_level and experience_level != 'all':
             scrape_params["job_type"] = experience_level
         
-        # Scrape jobs using jobspy
-        jobs = scrape_jobs(**scrape_params)
+        # Scrape each board through its governor (cached and coalesced per
+        # site and query); "scrape" spans only cover real scrapes,
+        # "search.scrape" includes cache hits
+        with span("search.scrape"):
+            jobs, _ = scrape_sites(scrape_params, scrape_jobs)
         
         if jobs.empty:
             return {"status": "error", "message": "No jobs found matching your criteria"}
@@ -72,7 +73,8 @@ def scrape_and_send_jobs(job_role, location, email, results_wanted=10, experienc
             jobs = jobs.sort_values('date_posted', ascending=False, na_position='last')
         
         # Send email with results (CSV will be created in memory)
-        send_email_notification(email, job_role, location, jobs)
+        with span("search.email"):
+            send_email_notification(email, job_role, location, jobs)
         
         return {
             "status": "success", 
@@ -95,113 +97,74 @@ def send_email_notification(recipient_email, job_role, location, jobs_df):
     msg['To'] = recipient_email
     msg['Subject'] = f'Job Alert: {len(jobs_df)} {job_role} positions found!'
     
-    # Create HTML email body
-    html_body = f"""
-    <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .header {{ background-color: #4CAF50; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 20px; }}
-                .job-card {{ 
-                    border: 1px solid #ddd; 
-                    border-radius: 8px; 
-                    padding: 15px; 
-                    margin: 15px 0;
-                    background-color: #f9f9f9;
-                }}
-                .job-title {{ color: #2196F3; font-size: 18px; font-weight: bold; }}
-                .company {{ color: #666; font-size: 16px; }}
-                .location {{ color: #888; font-size: 14px; }}
-                .salary {{ color: #4CAF50; font-weight: bold; }}
-                .description {{ margin-top: 10px; color: #555; }}
-                .footer {{ text-align: center; padding: 20px; color: #888; font-size: 12px; }}
-                a {{ color: #2196F3; text-decoration: none; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🎯 Job Alert: {job_role}</h1>
-                <p>We found {len(jobs_df)} opportunities for you!</p>
-            </div>
-            <div class="content">
-                <p><strong>Search Location:</strong> {location}</p>
-                <p><strong>Date:</strong> {datetime.now().strftime("%B %d, %Y")}</p>
-                <hr>
-    """
-    
-    # Add top 10 jobs to email body
-    for idx, job in jobs_df.head(10).iterrows():
-        job_url = job.get('job_url', '#')
-        title = job.get('title', 'N/A')
-        company = job.get('company', 'N/A')
-        job_location = job.get('location', 'N/A')
-        description = job.get('description', 'No description available')
-        salary = job.get('min_amount', '')
-        
-        # Truncate description
-        if len(str(description)) > 300:
-            description = str(description)[:300] + "..."
-        
-        salary_text = f"<p class='salary'>Salary: ${salary}</p>" if salary else ""
-        
-        html_body += f"""
-            <div class="job-card">
-                <div class="job-title"><a href="{job_url}" target="_blank">{title}</a></div>
-                <div class="company">🏢 {company}</div>
-                <div class="location">📍 {job_location}</div>
-                {salary_text}
-                <div class="description">{description}</div>
-            </div>
-        """
-    
-    if len(jobs_df) > 10:
-        html_body += f"<p><em>...and {len(jobs_df) - 10} more jobs! See attached CSV for full list.</em></p>"
-    
-    html_body += """
-            </div>
-            <div class="footer">
-                <p>This is an automated job alert from JobSpy Application</p>
-                <p>Happy Job Hunting! 🚀</p>
-            </div>
-        </body>
-    </html>
-    """
-    
-    # Attach HTML body
-    msg.attach(MIMEText(html_body, 'html'))
-    
-    # Create CSV in memory and attach
+    # Stream the full result set into a base64 attachment
+    attachment = None
     try:
-        # Create CSV in memory
-        csv_buffer = StringIO()
-        jobs_df.to_csv(csv_buffer, index=False)
-        csv_content = csv_buffer.getvalue()
-        
-        # Create filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"jobs_{job_role.replace(' ', '_')}_{timestamp}.csv"
-        
-        # Attach CSV
-        part = MIMEBase('application', 'octet-stream')
-        part.set_payload(csv_content.encode('utf-8'))
-        encoders.encode_base64(part)
-        part.add_header('Content-Disposition', f'attachment; filename={filename}')
-        msg.attach(part)
+        with span("email.attachment"):
+            attachment = build_attachment(jobs_df, job_role)
     except Exception as e:
-        print(f"Could not attach CSV: {e}")
+        print(f"Could not attach job list: {e}")
     
-    # Send email
+    # Render HTML body from the precompiled template (see email_render.py),
+    # naming the attachment that was actually built
+    with span("email.render"):
+        msg.attach(MIMEText(render_job_alert(job_role, location, jobs_df, attachment_format(attachment)), 'html'))
+    if attachment is not None:
+        msg.attach(attachment)
+    
+    # Send email over a pooled, rate-limited SMTP connection (see mailer.py)
     try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        with span("email.send"):
+            send_message(msg)
         print(f"Email sent successfully to {recipient_email}")
     except Exception as e:
         raise Exception(f"Failed to send email: {str(e)}")
 
+def run_search_job(payload):
+    """Queue handler: run one /search request"""
+    with metrics.trace() as spans:
+        result = scrape_and_send_jobs(**payload)
+    metrics.registry.inc("jobspy_searches_total", status=result["status"])
+    print(f"{result} [{metrics.format_trace(spans)}]")
+    return result
+
+# Bounded worker pool backed by a local SQLite queue (see job_queue.py)
+job_queue = JobQueue(run_search_job)
+job_queue.start()
+
+# Saved searches, emailed by the alert scheduler (see alerts.py)
+alert_store = AlertStore()
+
+# Gauges read on every /metrics scrape
+metrics.registry.describe("jobspy_http_request_seconds", "histogram", "Flask request latency")
+metrics.registry.register_stats("jobspy_queue_depth", job_queue.depth, "Searches waiting to run")
+metrics.registry.register_stats("jobspy_scrape_cache", scrape_cache.stats, "Scrape cache counters")
+metrics.registry.register_stats("jobspy_mail", mail_stats, "SMTP dispatcher counters")
+metrics.registry.register_stats("jobspy_alert_store", alert_store.stats, "Saved searches")
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    # Opt-in sampling profile of this request's thread (PROFILE_ENABLED=True, ?profile=1)
+    if metrics.PROFILE_ENABLED and request.args.get('profile'):
+        g.profiler = metrics.SamplingProfiler().start()
+
+@app.after_request
+def record_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        metrics.registry.observe("jobspy_http_request_seconds", time.perf_counter() - started,
+                                 endpoint=request.endpoint or "unknown", status=response.status_code)
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        response.headers['X-Profile'] = profiler.stop().save(request.endpoint or "request")
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of stage timings, counters and cache stats"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/')
 def index():
     """Home page with search form"""
@@ -225,22 +188,145 @@ def search_jobs():
         if not location:
             location = "United States"
         
-        # Run job scraping in background thread
-        def background_task():
-            result = scrape_and_send_jobs(job_role, location, email, results_wanted, experience_level)
-            print(result)
-        
-        thread = threading.Thread(target=background_task)
-        thread.start()
+        # Hand the scrape to the worker pool; reject when the queue is full
+        try:
+            job_id = job_queue.submit({
+                "job_role": job_role,
+                "location": location,
+                "email": email,
+                "results_wanted": results_wanted,
+                "experience_level": experience_level
+            })
+        except QueueFull:
+            return jsonify({
+                "status": "error",
+                "message": "Too many searches in progress. Please try again in a few minutes."
+            }), 429
         
         return jsonify({
             "status": "success",
+            "job_id": job_id,
             "message": f"Job search initiated for '{job_role}' in {location}. You'll receive an email at {email} shortly!"
         })
         
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status of a queued /search request"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job id"}), 404
+    return jsonify({"status": "success", "job": job})
+
+@app.route('/stats')
+def stats():
+    """Queue depth, scrape cache counters and per-source governor state"""
+    return jsonify({
+        "status": "success",
+        "queue_depth": job_queue.depth(),
+        "scrape_cache": scrape_cache.stats(),
+        "sources": governor_stats()
+    })
+
+@app.route('/alerts', methods=['POST'])
+def create_alert():
+    """Save a search; new postings for it are emailed every ALERT_INTERVAL"""
+    try:
+        data = request.get_json(silent=True) or request.form
+        job_role = data.get('job_role', '').strip()
+        location = data.get('location', '').strip() or "United States"
+        email = data.get('email', '').strip()
+        results_wanted = int(data.get('results_wanted', 10))
+        experience_level = data.get('experience_level', 'all').strip()
+        
+        if not job_role:
+            return jsonify({"status": "error", "message": "Job role is required"})
+        if not email:
+            return jsonify({"status": "error", "message": "Email is required"})
+        
+        subscription_id = alert_store.subscribe(
+            email, alert_params(job_role, location, results_wanted, experience_level))
+        return jsonify({
+            "status": "success",
+            "alert_id": subscription_id,
+            "message": f"Alert saved for '{job_role}' in {location}. New postings will be emailed to {email}."
+        })
+        
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route('/alerts/<alert_id>', methods=['GET', 'DELETE'])
+def alert_detail(alert_id):
+    """Show or cancel a saved search"""
+    if request.method == 'DELETE':
+        if not alert_store.unsubscribe(alert_id):
+            return jsonify({"status": "error", "message": "Unknown alert id"}), 404
+        return jsonify({"status": "success", "message": "Alert cancelled"})
+    alert = alert_store.get(alert_id)
+    if alert is None:
+        return jsonify({"status": "error", "message": "Unknown alert id"}), 404
+    return jsonify({"status": "success", "alert": alert})
+
+@app.route('/batch-match', methods=['POST'])
+def batch_match():
+    """Top-k jobs from the local job store for many resumes at once"""
+    try:
+        data = request.get_json(silent=True) or {}
+        k = int(data.get('k') or request.form.get('k') or request.args.get('k') or BATCH_MATCH_K)
+        fmt = (data.get('format') or request.form.get('format') or request.args.get('format') or 'json').lower()
+        
+        # PDF uploads (multipart "resumes") or already extracted text
+        files = {f"{i}:{f.filename}": f.read() for i, f in enumerate(request.files.getlist('resumes'))}
+        texts = {str(r.get('id', i)): r.get('text', '') for i, r in enumerate(data.get('resumes', []))}
+        if not files and not texts:
+            return jsonify({"status": "error", "message": "Upload PDFs as 'resumes' or send {\"resumes\": [{\"id\", \"text\"}]}"}), 400
+        if len(files) + len(texts) > BATCH_MATCH_MAX_RESUMES:
+            return jsonify({"status": "error", "message": f"At most {BATCH_MATCH_MAX_RESUMES} resumes per request"}), 413
+        
+        matcher = get_batch_matcher()
+        errors = {}
+        with span("batch_match.read"):
+            if files:
+                extracted, errors = matcher.read_resumes(files)
+                texts.update(extracted)
+        with span("batch_match.score"):
+            table = matcher.match_texts({name: text for name, text in texts.items() if text}, k)
+        
+        if fmt == 'parquet':
+            try:
+                body = matches_to_parquet(table)
+            except ImportError:
+                return jsonify({"status": "error", "message": "Parquet output needs pyarrow"}), 400
+            return Response(body, mimetype='application/vnd.apache.parquet',
+                            headers={"Content-Disposition": "attachment; filename=matches.parquet"})
+        return Response(matches_to_json(table, errors), mimetype='application/json')
+        
+    except RequestEntityTooLarge:
+        return jsonify({"status": "error", "message": f"Uploads are limited to {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB per request"}), 413
+    except CorpusWarmingUp:
+        return jsonify({"status": "error", "message": "The job corpus is still being built. Please try again in a few minutes."}), 503, {"Retry-After": "60"}
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+def stream_quick_search(scrape_params, results_wanted):
+    """Yield one NDJSON line per finished site, then the merged result"""
+    sites = scrape_params["site_name"]
+    frames, failed = [], {}
+    for site, jobs, error in iter_site_results(scrape_params, sites, scrape_jobs):
+        if error is not None:
+            failed[site] = str(error)
+            yield json.dumps({"type": "site", "site": site, "status": "error", "message": str(error)}) + "\n"
+            continue
+        frames.append(jobs)
+        records = jobs.head(results_wanted).to_json(orient='records', date_format='iso')
+        yield f'{{"type": "site", "site": {json.dumps(site)}, "status": "success", "count": {min(len(jobs), results_wanted)}, "jobs": {records}}}\n'
+    
+    jobs = merge_results(frames).head(results_wanted)
+    records = jobs.to_json(orient='records', date_format='iso') if not jobs.empty else "[]"
+    yield f'{{"type": "done", "status": "success", "count": {len(jobs)}, "failed_sites": {json.dumps(failed)}, "jobs": {records}}}\n'
+
 @app.route('/quick-search', methods=['POST'])
 def quick_search():
     """Quick search that returns results directly without email"""
@@ -250,22 +336,15 @@ def quick_search():
         location = data.get('location', 'United States').strip()
         results_wanted = int(data.get('results_wanted', 5))
         experience_level = data.get('experience_level', 'all').strip()
+        fields = parse_fields(data.get('fields') or request.args.get('fields'))
+        page = int(data.get('page') or request.args.get('page') or 1)
+        page_size = data.get('page_size') or request.args.get('page_size')
         
         if not job_role:
             return jsonify({"status": "error", "message": "Job role is required"})
         
         # Detect country from location
-        location_lower = location.lower()
-        country_indeed = 'USA'
-        
-        if 'india' in location_lower:
-            country_indeed = 'India'
-        elif 'canada' in location_lower:
-            country_indeed = 'Canada'
-        elif 'uk' in location_lower or 'united kingdom' in location_lower:
-            country_indeed = 'UK'
-        elif 'australia' in location_lower:
-            country_indeed = 'Australia'
+        country_indeed = country_for_search(location)
         
         # Prepare scraping parameters
         scrape_params = {
@@ -281,25 +360,35 @@ def quick_search():
         if experience_level and experience_level != 'all':
             scrape_params["job_type"] = experience_level
         
-        # Scrape jobs
-        jobs = scrape_jobs(**scrape_params)
+        # Streaming mode: one worker per site, NDJSON lines as each finishes
+        if data.get('stream') or request.args.get('stream'):
+            return Response(
+                stream_with_context(stream_quick_search(scrape_params, results_wanted)),
+                mimetype='application/x-ndjson'
+            )
+        
+        # Scrape each board through its governor (cached and coalesced per site and query)
+        with span("quick_search.scrape"):
+            jobs, failed_sites = scrape_sites(scrape_params, scrape_jobs)
         
         if jobs.empty:
             return jsonify({"status": "success", "jobs": [], "message": "No jobs found"})
         
-        # Sort by date_posted to get earliest (most recent) postings first
-        if 'date_posted' in jobs.columns:
-            jobs['date_posted'] = pd.to_datetime(jobs['date_posted'], errors='coerce')
-            jobs = jobs.sort_values('date_posted', ascending=False, na_position='last')
-        
-        # Convert to list of dictionaries
-        jobs_list = jobs.head(results_wanted).to_dict('records')
-        
-        return jsonify({
-            "status": "success",
-            "jobs": jobs_list,
-            "count": len(jobs_list)
-        })
+        # Most recent postings first; only the requested fields and page are
+        # converted, then encoded once with orjson (gzip/brotli when accepted)
+        with span("quick_search.serialize"):
+            columns = fields + ['date_posted'] if fields else None
+            table = JobTable.from_frame(jobs, columns).top_k('date_posted', results_wanted)
+            page_table, pagination = paginate(table, page, page_size)
+            jobs_list = page_table.to_records(fields)
+            
+            return json_response({
+                "status": "success",
+                "jobs": jobs_list,
+                "count": len(jobs_list),
+                "failed_sites": failed_sites,
+                **pagination
+            }, request.accept_encodings)
         
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+
+import pandas as pd
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from governor import GOVERNOR_ENABLED, get_governor
+from http_cache import ResponseCache
+from metrics import registry, span
+from text_utils import clean_html
+
+load_dotenv()
+
+# -------------------------------------------------
+# ATS Companies – Data / AI / ML (50+)
+# -------------------------------------------------
+ATS_COMPANIES = {
+    "lever": [
+        "scaleai","figma","canva","duolingo","webflow","postman","posthog",
+        "segment","plaid","brex","shopify","algolia","datarobot","paxos",
+        "supabase","vercel","linear","netlify","airbyte","fivetran",
+        "rudderstack","montecarlodata","weightsandbiases","cohere",
+        "stabilityai","cerebras","perplexityai","huggingface"
+    ],
+    "greenhouse": [
+        "databricks","snowflake","datadog","airbnb","uber","lyft",
+        "dropbox","twilio","github","elastic","cloudflare","mongodb",
+        "palantir","pinterest","spotify","reddit","zoom","square",
+        "hashicorp","gitlab","digitalocean","openai","anthropic",
+        "amplitude","mixpanel"
+    ]
+}
+
+# -------------------------------------------------
+# Fetch Engine Configuration
+# -------------------------------------------------
+LEVER_URL = os.getenv('LEVER_URL', 'https://api.lever.co/v0/postings/{company}?mode=json')
+GREENHOUSE_URL = os.getenv('GREENHOUSE_URL', 'https://boards-api.greenhouse.io/v1/boards/{company}/jobs')
+
+ATS_MAX_WORKERS = int(os.getenv('ATS_MAX_WORKERS', 16))
+ATS_PER_HOST_LIMIT = int(os.getenv('ATS_PER_HOST_LIMIT', 8))
+ATS_REQUEST_TIMEOUT = float(os.getenv('ATS_REQUEST_TIMEOUT', 10))
+ATS_DEADLINE = float(os.getenv('ATS_DEADLINE', 20))
+ATS_CACHE_ENABLED = os.getenv('ATS_CACHE_ENABLED', 'True').lower() == 'true'
+
+# -------------------------------------------------
+# Board Parsers
+# -------------------------------------------------
+def parse_lever_jobs(company, payload):
+    return [{
+        "title": j.get("text"),
+        "company": company.title(),
+        "location": j.get("categories", {}).get("location", ""),
+        "description": clean_html(j.get("description", "")),
+        "job_url": j.get("hostedUrl"),
+        "source": "Lever"
+    } for j in payload]
+
+def parse_greenhouse_jobs(company, payload):
+    return [{
+        "title": j.get("title"),
+        "company": company.title(),
+        "location": j.get("location", {}).get("name", ""),
+        "description": clean_html(j.get("content", "")),
+        "job_url": j.get("absolute_url"),
+        "source": "Greenhouse"
+    } for j in payload.get("jobs", [])]
+
+def _source_fault(error):
+    """Errors that mean the board host is in trouble, as opposed to one
+    company's board being missing or malformed."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+# -------------------------------------------------
+# Concurrent Fetch Engine
+# -------------------------------------------------
+class ATSFetcher:
+    """Fans ATS board requests out over a bounded thread pool.
+
+    Each board host gets its own keep-alive session and a semaphore that caps
+    in-flight requests to it, and every fan-out shares a single deadline.
+    With a ``cache`` (see ``http_cache.ResponseCache``) fresh boards are served
+    locally and stale ones are revalidated with a conditional GET. Requests to
+    each host go through its governor (see ``governor.py``): a host that keeps
+    failing is skipped until its circuit closes again.
+    """
+
+    def __init__(self, lever_url=LEVER_URL, greenhouse_url=GREENHOUSE_URL,
+                 max_workers=ATS_MAX_WORKERS, per_host_limit=ATS_PER_HOST_LIMIT,
+                 request_timeout=ATS_REQUEST_TIMEOUT, deadline=ATS_DEADLINE, cache=None):
+        self.urls = {"lever": lever_url, "greenhouse": greenhouse_url}
+        self.parsers = {"lever": parse_lever_jobs, "greenhouse": parse_greenhouse_jobs}
+        self.max_workers = max_workers
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.cache = cache
+        self.sessions = {}
+        self.limits = {}
+        for board in self.urls:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=per_host_limit)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self.sessions[board] = session
+            self.limits[board] = threading.BoundedSemaphore(per_host_limit)
+        self.governors = {
+            board: get_governor(board, max_timeout=request_timeout, is_fault=_source_fault)
+            for board in self.urls
+        } if GOVERNOR_ENABLED else {}
+
+    def _get(self, board, company, expires=None, revalidate=False):
+        key = f"{board}/{company}"
+        entry = self.cache.get(key) if self.cache else None
+        if entry is not None and not revalidate and self.cache.is_fresh(entry, company):
+            self.cache.record_hit()
+            return entry["jobs"]
+
+        headers = self.cache.conditional_headers(entry) if self.cache else {}
+        governor = self.governors.get(board)
+        with span("ats.request", board=board):
+            with governor.admit() if governor else nullcontext(self.request_timeout) as timeout:
+                with self.limits[board]:
+                    if expires is not None:
+                        timeout = min(timeout, expires - time.monotonic())
+                        if timeout <= 0:
+                            raise TimeoutError(f"{key} deadline passed")
+                    r = self.sessions[board].get(
+                        self.urls[board].format(company=company), headers=headers, timeout=timeout
+                    )
+                # Errors count as misses, so callers never mistake them for an empty board
+                if r.status_code != 304:
+                    r.raise_for_status()
+
+            if r.status_code == 304 and entry is not None:
+                return self.cache.touch(key, entry)["jobs"]
+            r.raise_for_status()
+            jobs = self.parsers[board](company, r.json())
+        if self.cache:
+            self.cache.record_miss()
+            self.cache.put(
+                key, jobs,
+                etag=r.headers.get("ETag"),
+                last_modified=r.headers.get("Last-Modified"),
+            )
+        return jobs
+
+    def fetch(self, board, company):
+        """Fetch and parse one board; returns [] (and logs why) on any failure."""
+        try:
+            return self._get(board, company)
+        except Exception as e:
+            print(f"ATS fetch {board}/{company} failed: {e}")
+            return []
+
+    def fetch_all(self, companies=None, deadline=None, revalidate=False):
+        """Fetch every board concurrently under one overall deadline.
+
+        Returns ``(jobs, missed)`` where ``missed`` lists the
+        ``(board, company)`` pairs that errored or did not finish in time.
+        With ``revalidate`` even fresh cache entries are checked with a
+        conditional GET (the crawler must not re-read its own last crawl).
+        """
+        companies = ATS_COMPANIES if companies is None else companies
+        deadline = self.deadline if deadline is None else deadline
+        expires = time.monotonic() + deadline
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ats")
+        futures = {
+            pool.submit(self._get, board, company, expires, revalidate): (board, company)
+            for board, names in companies.items()
+            for company in names
+        }
+        done, pending = wait(futures, timeout=deadline)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        jobs, missed = [], [futures[f] for f in pending]
+        for future in done:
+            if future.exception() is not None:
+                missed.append(futures[future])
+            else:
+                jobs.extend(future.result())
+        return jobs, sorted(missed)
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+def get_fetcher():
+    """Process-wide fetcher so keep-alive connections survive across searches."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = ATSFetcher(cache=ResponseCache() if ATS_CACHE_ENABLED else None)
+        return _fetcher
+
+# -------------------------------------------------
+# Public Fetchers
+# -------------------------------------------------
+def fetch_lever_jobs(company):
+    return get_fetcher().fetch("lever", company)
+
+def fetch_greenhouse_jobs(company):
+    return get_fetcher().fetch("greenhouse", company)
+
+def ats_cache_stats():
+    cache = get_fetcher().cache
+    return cache.stats() if cache else {}
+
+def fetch_all_ats_jobs(deadline=None):
+    with span("ats.fetch_all"):
+        jobs, missed = get_fetcher().fetch_all(deadline=deadline)
+    registry.inc("jobspy_ats_boards_missed_total", len(missed))
+    if missed:
+        print(f"ATS fetch: {len(missed)} boards failed or missed the deadline")
+    return pd.DataFrame(jobs)
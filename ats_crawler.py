@@ -0,0 +1,123 @@
+"""Background crawler that keeps the local job store in sync with the ATS boards.
+
+Run it next to the web apps (see ``Procfile``):
+
+    python ats_crawler.py            # crawl every ATS_CRAWL_INTERVAL seconds
+    python ats_crawler.py --once     # single crawl, e.g. from cron
+"""
+import argparse
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from ats import ATS_COMPANIES, get_fetcher
+from job_store import JobStore
+from metrics import span, start_http_server
+
+load_dotenv()
+
+# -------------------------------------------------
+# Crawler Configuration
+# -------------------------------------------------
+ATS_CRAWL_INTERVAL = int(os.getenv('ATS_CRAWL_INTERVAL', 1800))
+ATS_CRAWL_DEADLINE = float(os.getenv('ATS_CRAWL_DEADLINE', 120))
+ATS_CRAWLER_METRICS_PORT = int(os.getenv('ATS_CRAWLER_METRICS_PORT', 0))  # exporter of this process; 0 = off
+ATS_CRAWL_IN_APP = os.getenv('ATS_CRAWL_IN_APP', 'False').lower() == 'true'  # for hosts without the crawler process
+
+BOARD_SOURCES = {"lever": "Lever", "greenhouse": "Greenhouse"}
+
+# -------------------------------------------------
+# Crawler
+# -------------------------------------------------
+class ATSCrawler:
+    """Refreshes every board in ``companies`` into a ``JobStore`` on a schedule.
+
+    Boards that fail or miss the crawl deadline are left untouched, so their
+    postings stay searchable until the next successful crawl. A scheduled
+    crawl is skipped while another process sharing the store has crawled
+    within ``interval``. Crawls revalidate every board instead of trusting
+    the response cache's TTL, so each one sees the boards as they are now.
+    """
+
+    def __init__(self, store=None, fetcher=None, companies=None,
+                 interval=ATS_CRAWL_INTERVAL, deadline=ATS_CRAWL_DEADLINE):
+        self.store = store or JobStore()
+        self.fetcher = fetcher or get_fetcher()
+        self.companies = ATS_COMPANIES if companies is None else companies
+        self.interval = interval
+        self.deadline = deadline
+        self._stop = threading.Event()
+        self._thread = None
+
+    def crawl_once(self):
+        started = time.time()
+        with span("ats.crawl"):
+            jobs, missed = self.fetcher.fetch_all(self.companies, deadline=self.deadline, revalidate=True)
+        by_board = {}
+        for job in jobs:
+            by_board.setdefault((job["source"], job["company"]), []).append(job)
+
+        totals = {"boards": 0, "missed": len(missed), "new": 0, "updated": 0, "closed": 0}
+        missed = set(missed)
+        for board, names in self.companies.items():
+            for company in names:
+                if (board, company) in missed:
+                    continue
+                # Parsers title-case the company name
+                board_jobs = by_board.get((BOARD_SOURCES[board], company.title()), [])
+                new, updated, closed = self.store.upsert_board(board, company, board_jobs, started)
+                totals["boards"] += 1
+                totals["new"] += new
+                totals["updated"] += updated
+                totals["closed"] += closed
+        totals["purged"] = self.store.purge()
+        totals["seconds"] = round(time.time() - started, 1)
+        return totals
+
+    def run(self, delay=0):
+        """Crawl every ``interval`` seconds until stopped, the first time after ``delay``."""
+        while not self._stop.wait(delay):
+            delay = self.interval
+            try:
+                last = self.store.last_crawled()
+                if last is not None and time.time() - last < self.interval:
+                    # Another process crawled meanwhile; wait until its crawl is due
+                    delay = self.interval - (time.time() - last)
+                    continue
+                print(f"ATS crawl: {self.crawl_once()}")
+            except Exception as e:
+                print(f"ATS crawl failed: {e}")
+
+    def start(self, delay=0):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, args=(delay,),
+                                            name="ats-crawler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="crawl once and exit")
+    parser.add_argument("--interval", type=int, default=ATS_CRAWL_INTERVAL)
+    args = parser.parse_args()
+
+    crawler = ATSCrawler(interval=args.interval)
+    if ATS_CRAWLER_METRICS_PORT and not args.once:
+        start_http_server(ATS_CRAWLER_METRICS_PORT)
+    if args.once:
+        print(f"ATS crawl: {crawler.crawl_once()}")
+    else:
+        crawler.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""Match many resumes against the local job corpus in one pass.
+
+    python batch_match.py resumes/ -k 20 --output matches.parquet
+    python batch_match.py alice.pdf bob.pdf --format json
+
+Resumes are embedded together, then scored against the chunk vectors of every
+open posting in the job store with one matrix product per block of resumes.
+"""
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from dedup import fingerprint
+from json_response import dumps
+from resume import ResumeRejected, get_resume_processor
+
+load_dotenv()
+
+# -------------------------------------------------
+# Batch Matching Configuration
+# -------------------------------------------------
+EMBED_DIM = 384
+BATCH_MATCH_K = int(os.getenv('BATCH_MATCH_K', 20))  # jobs returned per resume
+BATCH_MATCH_BLOCK = int(os.getenv('BATCH_MATCH_BLOCK', 256))  # resumes per matrix product
+BATCH_MATCH_MAX_RESUMES = int(os.getenv('BATCH_MATCH_MAX_RESUMES', 1000))  # per API request
+BATCH_MATCH_BUILD_SLICE = int(os.getenv('BATCH_MATCH_BUILD_SLICE', 2000))  # postings embedded per index save
+# Shared by every web worker; JobIndex serializes writers with a file lock
+BATCH_MATCH_INDEX_DIR = os.getenv('BATCH_MATCH_INDEX_DIR', os.path.join('.cache', 'batch_index'))
+
+# Two-stage retrieval for large corpora: HNSW candidates, then an exact re-rank
+ANN_MIN_ROWS = int(os.getenv('ANN_MIN_ROWS', 100000))        # below this every job is scored exactly
+ANN_HNSW_M = int(os.getenv('ANN_HNSW_M', 16))
+ANN_EF_CONSTRUCTION = int(os.getenv('ANN_EF_CONSTRUCTION', 64))
+ANN_EF_SEARCH = int(os.getenv('ANN_EF_SEARCH', 64))          # higher = better recall, slower
+ANN_CANDIDATES = int(os.getenv('ANN_CANDIDATES', 200))       # chunks pulled per resume before re-ranking
+
+JOB_COLUMNS = ["title", "company", "location", "job_url", "source"]
+MATCH_COLUMNS = ["resume", "rank", "job_id", "score"] + JOB_COLUMNS
+
+
+class CorpusWarmingUp(Exception):
+    """Raised by ``BatchMatcher.match_texts`` while the first corpus is still being built."""
+
+
+def _normalize(emb):
+    emb = np.asarray(emb, dtype="float32")
+    norms = np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb / np.where(norms == 0, 1, norms)
+
+
+def top_k_rows(scores, k):
+    """Column indices and values of the ``k`` largest entries of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(k), (len(scores), k))
+    values = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+# -------------------------------------------------
+# Job Corpus
+# -------------------------------------------------
+class JobCorpus:
+    """Postings with their chunk vectors gathered into one contiguous matrix.
+
+    ``offsets[j]`` is the first chunk row of job ``j``; a job's score is its
+    best chunk, as in ``JobIndex.score``.
+
+    Corpora of ``ANN_MIN_ROWS`` chunks or more also get an HNSW graph over
+    the chunk rows: ``top_k`` then re-ranks, exactly over all their chunks,
+    only the jobs owning each resume's ``candidates`` nearest chunks.
+    ``ef_search`` and ``candidates`` trade recall for latency.
+    """
+
+    def __init__(self, jobs, vectors, offsets, ann_min_rows=ANN_MIN_ROWS):
+        self.jobs = jobs
+        self.vectors = vectors
+        self.offsets = np.asarray(offsets, dtype="int64")
+        self.ends = np.append(self.offsets[1:], len(vectors)).astype("int64")
+        self.ann = self._build_ann() if len(vectors) and len(vectors) >= ann_min_rows else None
+
+    @classmethod
+    def from_index(cls, index, jobs, ann_min_rows=ANN_MIN_ROWS):
+        """Jobs of ``jobs`` (with a ``job_id`` column) that have chunks in ``index``."""
+        # One lock for both, so a reload between them cannot renumber the rows
+        with index._lock:
+            rows, owners, offsets = index.rows_for(jobs["job_id"])
+            vectors = np.array(index.vectors[rows], dtype="float32")
+        jobs = jobs.drop_duplicates("job_id").set_index("job_id").loc[owners].reset_index()
+        return cls(jobs, vectors, offsets, ann_min_rows)
+
+    def _build_ann(self):
+        import faiss
+
+        ann = faiss.IndexHNSWFlat(self.vectors.shape[1], ANN_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        ann.hnsw.efConstruction = ANN_EF_CONSTRUCTION
+        ann.add(self.vectors)
+        return ann
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def top_k(self, resume_emb, k=BATCH_MATCH_K, block=BATCH_MATCH_BLOCK, exact=None,
+              ef_search=ANN_EF_SEARCH, candidates=ANN_CANDIDATES):
+        """``(job indices, scores)`` of the best ``k`` jobs for each resume row.
+
+        ``exact`` forces (True) or skips (False) the full scan; by default the
+        HNSW path is taken whenever the corpus has a graph.
+        """
+        resume_emb = _normalize(resume_emb)
+        k = min(k, len(self))
+        idx = np.empty((len(resume_emb), k), dtype="int64")
+        scores = np.empty((len(resume_emb), k), dtype="float32")
+        if not k:
+            return idx, scores
+        if exact is None:
+            exact = self.ann is None
+        if not exact:
+            return self._top_k_ann(resume_emb, k, ef_search, candidates)
+        for start in range(0, len(resume_emb), block):
+            sims = resume_emb[start:start + block] @ self.vectors.T
+            best = np.maximum.reduceat(sims, self.offsets, axis=1)
+            idx[start:start + block], scores[start:start + block] = top_k_rows(best, k)
+        return idx, scores
+
+    def _top_k_ann(self, resume_emb, k, ef_search, candidates):
+        if self.ann is None:
+            self.ann = self._build_ann()
+        self.ann.hnsw.efSearch = ef_search
+        _, nearest = self.ann.search(resume_emb, min(max(candidates, k), self.ann.ntotal))
+        idx = np.empty((len(resume_emb), k), dtype="int64")
+        scores = np.empty((len(resume_emb), k), dtype="float32")
+        for i, rows in enumerate(nearest):
+            pool = np.unique(np.searchsorted(self.offsets, rows[rows >= 0], side="right") - 1)
+            if len(pool) < k:  # too few distinct jobs among the candidates: scan them all
+                pool = np.arange(len(self))
+            counts = self.ends[pool] - self.offsets[pool]
+            local = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            chunk_rows = np.repeat(self.offsets[pool] - local, counts) + np.arange(counts.sum())
+            best = np.maximum.reduceat(self.vectors[chunk_rows] @ resume_emb[i], local)
+            found, values = top_k_rows(best[None, :], k)
+            idx[i], scores[i] = pool[found[0]], values[0]
+        return idx, scores
+
+    def matches(self, names, resume_emb, k=BATCH_MATCH_K, block=BATCH_MATCH_BLOCK):
+        """Long-format top-k table: one row per (resume, rank)."""
+        idx, scores = self.top_k(resume_emb, k, block)
+        flat = idx.reshape(-1)
+        table = self.jobs.iloc[flat][["job_id"] + [c for c in JOB_COLUMNS if c in self.jobs]].reset_index(drop=True)
+        table.insert(0, "resume", np.repeat(np.asarray(names, dtype=object), idx.shape[1]))
+        table.insert(1, "rank", np.tile(np.arange(1, idx.shape[1] + 1), len(names)))
+        table.insert(3, "score", (scores.reshape(-1).astype("float64") * 100).round(2))
+        return table
+
+# -------------------------------------------------
+# Batch Matcher
+# -------------------------------------------------
+def _default_encode(texts):
+    from embedding_service import get_embedding_service
+
+    return get_embedding_service().encode(texts)
+
+
+class BatchMatcher:
+    """Scores batches of resumes against the open postings of a ``JobStore``.
+
+    Job chunks are embedded once into a persistent ``JobIndex`` and the
+    corpus matrix is rebuilt only after the crawler has written new postings.
+    """
+
+    def __init__(self, store=None, index=None, encode=None, processor=None, block=BATCH_MATCH_BLOCK):
+        self._store = store
+        self._index = index
+        self.encode = encode or _default_encode
+        self.processor = processor or get_resume_processor()
+        self.block = block
+        self._corpus = None
+        self._corpus_version = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.counters = {"requests": 0, "resumes": 0, "rejected": 0, "corpus_builds": 0, "corpus_build_errors": 0,
+                         "embed_seconds": 0.0, "score_seconds": 0.0}
+
+    @property
+    def store(self):
+        if self._store is None:
+            from job_store import JobStore
+
+            self._store = JobStore(text_index=False)
+        return self._store
+
+    @property
+    def index(self):
+        if self._index is None:
+            from job_index import JobIndex
+
+            self._index = JobIndex(directory=BATCH_MATCH_INDEX_DIR, dim=EMBED_DIM)
+        return self._index
+
+    def corpus(self, wait=False):
+        """Open postings and their chunk vectors, rebuilt when the store changes.
+
+        A build embeds every new posting and can take minutes, so it runs on
+        a background thread: meanwhile the previous corpus is returned, or
+        None before the first build finishes. ``wait=True`` builds in the
+        calling thread instead (the CLI).
+        """
+        version = self.store.last_crawled()
+        with self._lock:
+            current = self._corpus
+            if current is not None and version == self._corpus_version:
+                return current
+        if wait:
+            with self._build_lock:
+                return self._build(version)
+        if self._build_lock.acquire(blocking=False):
+            threading.Thread(target=self._build_in_background, args=(version,),
+                             name="batch-match-corpus", daemon=True).start()
+        return current
+
+    def _build_in_background(self, version):
+        try:
+            self._build(version)
+        except Exception as e:
+            print(f"Batch match corpus build failed: {e}")
+            with self._lock:
+                self.counters["corpus_build_errors"] += 1
+        finally:
+            self._build_lock.release()
+
+    def _build(self, version):
+        """Embed new postings ``BATCH_MATCH_BUILD_SLICE`` at a time, saving the
+        index after each slice so an interrupted build resumes where it
+        stopped; call under ``_build_lock``."""
+        with self._lock:
+            if self._corpus is not None and version == self._corpus_version:
+                return self._corpus
+        jobs = self.store.search()
+        jobs = jobs.assign(job_id=fingerprint(jobs).to_numpy()).drop_duplicates("job_id")
+        descriptions = list(zip(jobs["job_id"], jobs["description"].fillna("")))
+        for start in range(0, len(descriptions), BATCH_MATCH_BUILD_SLICE):
+            self.index.add_jobs(dict(descriptions[start:start + BATCH_MATCH_BUILD_SLICE]), self.encode)
+            self.index.save()
+        self.index.expire()
+        self.index.save()
+        corpus = JobCorpus.from_index(self.index, jobs)
+        with self._lock:
+            self._corpus = corpus
+            self._corpus_version = version
+            self.counters["corpus_builds"] += 1
+        return corpus
+
+    def read_resumes(self, files):
+        """Text of each ``{name: pdf bytes}`` upload; returns ``(texts, errors)``."""
+        def read(item):
+            name, data = item
+            try:
+                return name, self.processor.process(data)["text"], None
+            except ResumeRejected as e:
+                return name, None, str(e)
+
+        texts, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=max(self.processor.workers, 1)) as pool:
+            for name, text, error in pool.map(read, files.items()):
+                if error is not None:
+                    errors[name] = error
+                elif not text:
+                    errors[name] = "No text could be extracted"
+                else:
+                    texts[name] = text
+        return texts, errors
+
+    def match_texts(self, texts, k=BATCH_MATCH_K, wait=False):
+        """Top-``k`` table (``MATCH_COLUMNS``) for ``{name: resume text}``.
+
+        Raises ``CorpusWarmingUp`` until the first corpus is built, unless ``wait``.
+        """
+        corpus = self.corpus(wait)
+        if corpus is None:
+            raise CorpusWarmingUp("The job corpus is still being built")
+        names = list(texts)
+        if not names or not len(corpus):
+            return pd.DataFrame(columns=MATCH_COLUMNS)
+        started = time.perf_counter()
+        emb = self.encode([texts[name] for name in names])
+        embedded = time.perf_counter()
+        table = corpus.matches(names, emb, k, self.block)
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["resumes"] += len(names)
+            self.counters["embed_seconds"] += embedded - started
+            self.counters["score_seconds"] += time.perf_counter() - embedded
+        return table
+
+    def match_files(self, files, k=BATCH_MATCH_K, wait=False):
+        """Top-``k`` table for ``{name: pdf bytes}``, plus ``{name: error}`` for skipped files."""
+        texts, errors = self.read_resumes(files)
+        with self._lock:
+            self.counters["rejected"] += len(errors)
+        return self.match_texts(texts, k, wait), errors
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["jobs"] = len(self._corpus) if self._corpus is not None else 0
+        return stats
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+def get_batch_matcher():
+    """Process-wide matcher sharing one corpus matrix."""
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            _matcher = BatchMatcher()
+        return _matcher
+
+# -------------------------------------------------
+# Output
+# -------------------------------------------------
+def matches_to_json(table, errors=None):
+    """``{"results": [{"resume", "matches": [...]}], "errors": {...}}`` as UTF-8 JSON."""
+    records = table.drop(columns="resume").to_dict("records")
+    results, by_name = [], {}
+    for name, record in zip(table["resume"].tolist(), records):
+        if name not in by_name:
+            by_name[name] = []
+            results.append({"resume": name, "matches": by_name[name]})
+        by_name[name].append(record)
+    return dumps({"status": "success", "results": results, "errors": errors or {}})
+
+
+def matches_to_parquet(table):
+    """Parquet bytes of the long-format table; raises ``ImportError`` without pyarrow."""
+    buffer = io.BytesIO()
+    table.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _resume_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(".pdf"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("resumes", nargs="+", help="PDF files or directories of PDFs")
+    parser.add_argument("-k", type=int, default=BATCH_MATCH_K)
+    parser.add_argument("--format", choices=["parquet", "json"], default="parquet")
+    parser.add_argument("--output", help="file to write (default: matches.<format>)")
+    args = parser.parse_args()
+
+    files = {}
+    for path in _resume_paths(args.resumes):
+        with open(path, "rb") as f:
+            files[path] = f.read()
+
+    started = time.perf_counter()
+    table, errors = get_batch_matcher().match_files(files, args.k, wait=True)
+    seconds = time.perf_counter() - started
+    for name, error in errors.items():
+        print(f"Skipped {name}: {error}", file=sys.stderr)
+
+    fmt = args.format
+    if fmt == "parquet":
+        try:
+            body = matches_to_parquet(table)
+        except ImportError:
+            print("Parquet output needs pyarrow; writing JSON instead", file=sys.stderr)
+            fmt = "json"
+    if fmt == "json":
+        body = matches_to_json(table, errors)
+    output = args.output or f"matches.{args.format}"
+    if fmt != args.format:
+        output = os.path.splitext(output)[0] + ".json"
+    with open(output, "wb") as f:
+        f.write(body)
+    matched = len(files) - len(errors)
+    print(f"Matched {matched} resumes against {get_batch_matcher().stats()['jobs']} jobs in "
+          f"{seconds:.1f}s ({matched / seconds if seconds else 0:.1f} resumes/s) -> {output}")
+
+
+if __name__ == "__main__":
+    main()
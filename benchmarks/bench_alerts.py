@@ -0,0 +1,102 @@
+"""Saved-search alerts: one scrape per subscription vs the grouped, diffing scheduler.
+
+Creates ``--subscriptions`` saved searches over ``--queries`` distinct queries
+in a scratch SQLite store, then runs the scheduler for ``--days`` daily
+intervals against a fake scraper whose results slide by ``--new-per-day``
+postings a day. Emails are rendered (HTML body and attachment) but not sent.
+
+Reported per day: scrapes, emails and postings emailed by the scheduler next
+to the on-demand baseline (every subscription scraped and emailed everything
+it found, as a resubmitted /search does), and the scheduler's own wall time.
+``--scrape-seconds`` converts scrape counts into modelled scraping time.
+
+    python benchmarks/bench_alerts.py --subscriptions 10000 --queries 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alerts import ALERT_INTERVAL, AlertScheduler, AlertStore, alert_params
+
+ROLES = ["Data Scientist", "ML Engineer", "Software Engineer", "Backend Engineer", "Product Manager"]
+LOCATIONS = ["Remote", "New York, NY", "San Francisco, CA", "London, UK", "Bengaluru, India"]
+
+
+def make_queries(n):
+    return [alert_params(f"{ROLES[i % len(ROLES)]} {i // len(ROLES)}", LOCATIONS[i % len(LOCATIONS)], 25)
+            for i in range(n)]
+
+
+class FakeScraper:
+    """``results_wanted`` postings per query from a window that slides by ``new_per_day`` a day."""
+
+    def __init__(self, new_per_day):
+        self.new_per_day = new_per_day
+        self.day = 0
+        self.calls = 0
+
+    def __call__(self, search_term, location, results_wanted, **params):
+        self.calls += 1
+        start = self.day * self.new_per_day
+        ids = np.arange(start, start + results_wanted)
+        return pd.DataFrame({
+            "title": [f"{search_term} #{i}" for i in ids],
+            "company": [f"Company {i % 97}" for i in ids],
+            "location": location,
+            "job_url": [f"https://jobs.example.com/{search_term.replace(' ', '-')}/{i}" for i in ids],
+            "description": "x" * 500,
+            "date_posted": pd.Timestamp("2024-01-01") + pd.to_timedelta(ids % 3, unit="D"),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscriptions", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--new-per-day", type=int, default=5)
+    parser.add_argument("--scrape-seconds", type=float, default=8.0, help="modelled cost of one real scrape")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AlertStore(os.path.join(tmp, "alerts.sqlite3"))
+        queries = make_queries(args.queries)
+        start = time.perf_counter()
+        store.subscribe_many(
+            ((f"user{i}@example.com", queries[i % args.queries]) for i in range(args.subscriptions)), now=0)
+        print(f"{args.subscriptions:,} subscriptions over {store.stats()['queries']:,} queries "
+              f"saved in {time.perf_counter() - start:.2f}s")
+
+        scraper = FakeScraper(args.new_per_day)
+        scheduler = AlertScheduler(store, scrape=scraper, send=lambda *message: None, workers=args.workers)
+        print(f"{'day':>4} {'path':<10} {'scrapes':>8} {'scrape h':>9} {'emails':>8} "
+              f"{'jobs sent':>10} {'wall s':>8}")
+        for day in range(args.days):
+            scraper.day = day
+            baseline_jobs = args.subscriptions * 25
+            print(f"{day + 1:>4} {'baseline':<10} {args.subscriptions:>8,} "
+                  f"{args.subscriptions * args.scrape_seconds / 3600 / args.workers:>9.1f} "
+                  f"{args.subscriptions:>8,} {baseline_jobs:>10,} {'':>8}")
+
+            calls = scraper.calls
+            start = time.perf_counter()
+            totals = scheduler.run_once(now=day * ALERT_INTERVAL)
+            seconds = time.perf_counter() - start
+            scrapes = scraper.calls - calls
+            print(f"{day + 1:>4} {'scheduler':<10} {scrapes:>8,} "
+                  f"{scrapes * args.scrape_seconds / 3600 / args.workers:>9.1f} "
+                  f"{totals['emails']:>8,} {totals['jobs_sent']:>10,} {seconds:>8.2f}")
+            if totals["failed_queries"] or totals["failed_emails"]:
+                print(f"     failures: {totals}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Compare the sequential ATS loop with the concurrent fetch engine.
+
+Runs a local stub HTTP server that serves Lever/Greenhouse-shaped payloads
+with simulated latency, so no real boards are contacted.
+
+    python benchmarks/bench_ats_fetch.py --latency 0.2 --slow 3
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats import ATS_COMPANIES, ATSFetcher, parse_greenhouse_jobs, parse_lever_jobs
+
+
+def make_handler(latency, slow_companies, slow_latency):
+    posting = {"description": "<p>Build <b>ML</b> pipelines.</p>" * 20}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            company = self.path.strip("/").split("/")[1].split("?")[0]
+            time.sleep(slow_latency if company in slow_companies else latency)
+            if self.path.startswith("/lever/"):
+                payload = [
+                    dict(posting, text=f"Engineer {i}", hostedUrl=f"https://x/{i}",
+                         categories={"location": "Remote"})
+                    for i in range(25)
+                ]
+            else:
+                payload = {"jobs": [
+                    {"title": f"Engineer {i}", "content": posting["description"],
+                     "absolute_url": f"https://x/{i}", "location": {"name": "Remote"}}
+                    for i in range(25)
+                ]}
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def sequential(base):
+    jobs = []
+    for c in ATS_COMPANIES["lever"]:
+        try:
+            r = requests.get(f"{base}/lever/{c}?mode=json", timeout=10)
+            jobs.extend(parse_lever_jobs(c, r.json()))
+        except Exception:
+            pass
+    for c in ATS_COMPANIES["greenhouse"]:
+        try:
+            r = requests.get(f"{base}/greenhouse/{c}/jobs", timeout=10)
+            jobs.extend(parse_greenhouse_jobs(c, r.json()))
+        except Exception:
+            pass
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--slow", type=int, default=2, help="number of slow boards")
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--deadline", type=float, default=2.0)
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    slow = set(ATS_COMPANIES["greenhouse"][:args.slow])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency, slow, args.slow_latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    if not args.skip_sequential:
+        start = time.perf_counter()
+        jobs = sequential(base)
+        print(f"sequential: {time.perf_counter() - start:7.2f}s  jobs={len(jobs)}")
+
+    fetcher = ATSFetcher(
+        lever_url=base + "/lever/{company}?mode=json",
+        greenhouse_url=base + "/greenhouse/{company}/jobs",
+        deadline=args.deadline,
+    )
+    for label in ("engine cold", "engine warm"):
+        start = time.perf_counter()
+        jobs, missed = fetcher.fetch_all()
+        print(f"{label:11s}: {time.perf_counter() - start:7.2f}s  jobs={len(jobs)} missed={len(missed)}")
+    fetcher.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
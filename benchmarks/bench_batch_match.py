@@ -0,0 +1,92 @@
+"""Batch resume matching: one ``JobIndex.score`` per resume vs blocked matrix products.
+
+Builds a synthetic corpus of ``--chunks`` normalized chunk vectors (three per
+job, drawn around topic centroids) and ``--resumes`` resume embeddings near
+the same topics, then reports resumes/second for:
+
+* ``per-resume`` -- the Streamlit path, ``JobIndex.score`` over every job plus
+  a sort, timed on ``--sample`` resumes and extrapolated,
+* ``batched``    -- ``JobCorpus.top_k`` at each ``--block`` size (resumes per
+  matrix product), after a one-off corpus build that is reported separately.
+
+Resume embedding and PDF extraction are not included; both are per-resume
+costs shared by the two paths.
+
+    python benchmarks/bench_batch_match.py --resumes 1000 --chunks 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_match import JobCorpus
+from job_index import EMBED_DIM, JobIndex
+
+
+def make_corpus(chunks, resumes, chunks_per_job=3, topics=1000, noise=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((topics, EMBED_DIM)).astype("float32")
+    n_jobs = chunks // chunks_per_job
+    topic_of = np.repeat(rng.integers(0, topics, n_jobs), chunks_per_job)
+    vectors = centroids[topic_of] + noise * rng.standard_normal((len(topic_of), EMBED_DIM)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    index = JobIndex(directory=None)
+    index.vectors = vectors
+    now = time.time()
+    index.jobs = {f"job-{i}": [i * chunks_per_job, chunks_per_job, now] for i in range(n_jobs)}
+    resume_emb = centroids[rng.integers(0, topics, resumes)]
+    resume_emb = resume_emb + noise * rng.standard_normal(resume_emb.shape).astype("float32")
+    return index, resume_emb
+
+
+def per_resume(index, job_ids, resume_emb, k):
+    out = []
+    for emb in resume_emb:
+        scores = index.score(emb, job_ids)
+        out.append([fp for fp, _ in sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--block", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--sample", type=int, default=50, help="resumes timed on the per-resume path")
+    parser.add_argument("-k", type=int, default=20)
+    args = parser.parse_args()
+
+    index, resume_emb = make_corpus(args.chunks, args.resumes)
+    job_ids = list(index.jobs)
+    print(f"{args.resumes:,} resumes x {len(index.vectors):,} chunks ({len(job_ids):,} jobs), k={args.k}")
+
+    start = time.perf_counter()
+    corpus = JobCorpus.from_index(index, pd.DataFrame({"job_id": job_ids}))
+    print(f"corpus build: {time.perf_counter() - start:.2f}s")
+
+    print(f"{'path':<20} {'seconds':>9} {'resumes/s':>10} {'agree':>7}")
+    sample = resume_emb[:args.sample]
+    start = time.perf_counter()
+    expected = per_resume(index, job_ids, sample, args.k)
+    seconds = time.perf_counter() - start
+    print(f"{'per-resume':<20} {seconds * args.resumes / len(sample):>9.2f} "
+          f"{len(sample) / seconds:>10.1f} {'':>7}")
+
+    for block in args.block:
+        start = time.perf_counter()
+        idx, _ = corpus.top_k(resume_emb, args.k, block)
+        seconds = time.perf_counter() - start
+        got = corpus.jobs["job_id"].to_numpy()[idx[:len(sample)]]
+        agree = np.mean([len(set(g) & set(e)) / len(e) for g, e in zip(got.tolist(), expected)])
+        print(f"{'batched block=' + str(block):<20} {seconds:>9.2f} {args.resumes / seconds:>10.1f} "
+              f"{agree:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
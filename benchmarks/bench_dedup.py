@@ -0,0 +1,102 @@
+"""Deduplication throughput: row-wise MD5 fingerprints vs the vectorized engine.
+
+Builds a synthetic frame where a share of postings reappear on other boards
+with title variations, then times the original
+``apply(job_fingerprint, axis=1)`` + ``drop_duplicates`` path against
+``dedup.dedupe_jobs`` with and without near-duplicate detection.
+
+Four of the variations are undone by exact normalization (case, punctuation);
+the others only the near-duplicate pass can catch: "Sr.", "ML", "(Remote)"
+and a trailing city through canonical titles, plurals through MinHash
+similarity alone. ``ideal`` is the number of distinct original
+postings; for the near-duplicate pass the benchmark also counts groups that
+merged different postings (``wrong``) and postings left split (``missed``).
+
+    python benchmarks/bench_dedup.py --rows 100000
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup import dedupe_jobs, fingerprint, near_duplicate_groups
+
+TITLES = ["Machine Learning Engineer", "Data Scientist", "Software Engineer",
+          "Data Engineer", "Product Manager", "Research Scientist", "Analytics Engineer"]
+PREFIXES = ["", "Senior ", "Staff ", "Lead ", "Principal "]
+# Caught by exact normalization
+EXACT_VARIANTS = [lambda t, city: t, lambda t, city: t.replace(" ", "-", 1),
+                  lambda t, city: t + " ", lambda t, city: t.upper()]
+# Only caught by the near-duplicate pass
+NEAR_VARIANTS = [lambda t, city: t.replace("Senior", "Sr."), lambda t, city: t + " (Remote)",
+                 lambda t, city: t.replace("Machine Learning", "ML"), lambda t, city: f"{t} - {city}",
+                 lambda t, city: t + "s"]
+VARIANTS = EXACT_VARIANTS + NEAR_VARIANTS
+
+
+def make_jobs(n, dup_share=0.3, seed=0):
+    rng = np.random.default_rng(seed)
+    base = int(n * (1 - dup_share))
+    jobs = pd.DataFrame({
+        "title": [rng.choice(PREFIXES) + rng.choice(TITLES) for _ in range(base)],
+        "company": [f"Company {c}" for c in rng.integers(0, base // 4 + 1, base)],
+        "location": rng.choice(["Remote", "New York, NY", "San Francisco, CA", "Bengaluru, India"], base),
+        "source": rng.choice(["Lever", "Greenhouse", "JobBoard"], base),
+    })
+    jobs["origin"] = fingerprint(jobs).to_numpy()
+    dups = jobs.sample(n - base, replace=True, random_state=seed).copy()
+    dups["title"] = [VARIANTS[i % len(VARIANTS)](t, loc.split(",")[0])
+                     for i, (t, loc) in enumerate(zip(dups["title"], dups["location"]))]
+    dups["source"] = "JobBoard"
+    return pd.concat([jobs, dups], ignore_index=True)
+
+
+def near_quality(jobs):
+    """``(wrong, missed)``: groups spanning several originals, originals split across groups."""
+    groups = pd.Series(near_duplicate_groups(jobs))
+    origins = jobs["origin"].reset_index(drop=True)
+    wrong = int((origins.groupby(groups).nunique() > 1).sum())
+    missed = int((groups.groupby(origins).nunique() > 1).sum())
+    return wrong, missed
+
+
+def job_fingerprint(row):
+    base = (str(row.get("title", "")) + str(row.get("company", "")) + str(row.get("location", ""))).lower()
+    return hashlib.md5(base.encode()).hexdigest()
+
+
+def legacy(jobs):
+    jobs = jobs.copy()
+    jobs["job_id"] = jobs.apply(job_fingerprint, axis=1)
+    return jobs.drop_duplicates("job_id")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'variant':<14} {'time':>8} {'kept':>8} {'ideal':>8}")
+    for n in args.rows:
+        jobs = make_jobs(n)
+        ideal = jobs["origin"].nunique()
+        runs = [
+            ("legacy md5", lambda: legacy(jobs)),
+            ("exact", lambda: dedupe_jobs(jobs)),
+            ("near (minhash)", lambda: dedupe_jobs(jobs, near_duplicates=True)),
+        ]
+        for label, fn in runs:
+            start = time.perf_counter()
+            kept = fn()
+            print(f"{n:>7} {label:<14} {time.perf_counter() - start:>7.3f}s {len(kept):>8} {ideal:>8}")
+        wrong, missed = near_quality(jobs)
+        print(f"{'':>7} near-duplicate groups: {wrong} wrong, {missed} originals missed")
+
+if __name__ == "__main__":
+    main()
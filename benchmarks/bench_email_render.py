@@ -0,0 +1,97 @@
+"""Memory and latency of building the alert email for large result sets.
+
+Compares the original f-string/iterrows body plus StringIO CSV and
+``encoders.encode_base64`` with the template renderer and streaming
+attachment in ``email_render``.
+
+    python benchmarks/bench_email_render.py --rows 10000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from email import encoders
+from email.mime.base import MIMEBase
+from email.mime.text import MIMEText
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_render import build_attachment, render_job_alert
+
+
+def make_jobs(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "title": [f"Machine Learning Engineer {i}" for i in range(n)],
+        "company": rng.choice(["Acme", "Globex", "Initech", "Umbrella"], n),
+        "location": rng.choice(["Remote", "New York, NY", "Bengaluru, India"], n),
+        "job_url": [f"https://jobs.example.com/{i}" for i in range(n)],
+        "description": ["Build and ship ML systems. " * 80] * n,
+        "min_amount": rng.choice([np.nan, 120000.0, 150000.0], n),
+        "date_posted": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 72, n), unit="h"),
+    })
+
+
+def legacy(job_role, location, jobs_df):
+    html_body = f"<html><body><h1>Job Alert: {job_role}</h1><p>{location}</p>"
+    for idx, job in jobs_df.head(10).iterrows():
+        description = job.get('description', 'No description available')
+        if len(str(description)) > 300:
+            description = str(description)[:300] + "..."
+        salary = job.get('min_amount', '')
+        salary_text = f"<p class='salary'>Salary: ${salary}</p>" if salary else ""
+        html_body += f"""
+            <div class="job-card">
+                <div class="job-title"><a href="{job.get('job_url', '#')}">{job.get('title', 'N/A')}</a></div>
+                <div class="company">{job.get('company', 'N/A')}</div>
+                <div class="location">{job.get('location', 'N/A')}</div>
+                {salary_text}
+                <div class="description">{description}</div>
+            </div>
+        """
+    html_body += "</body></html>"
+    body = MIMEText(html_body, 'html')
+    csv_buffer = StringIO()
+    jobs_df.to_csv(csv_buffer, index=False)
+    csv_content = csv_buffer.getvalue()
+    part = MIMEBase('application', 'octet-stream')
+    part.set_payload(csv_content.encode('utf-8'))
+    encoders.encode_base64(part)
+    return body, part
+
+
+def current(job_role, location, jobs_df, fmt):
+    return MIMEText(render_job_alert(job_role, location, jobs_df), 'html'), build_attachment(jobs_df, job_role, fmt)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    body, part = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(part.get_payload())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'variant':<16} {'time':>8} {'peak MB':>9} {'payload MB':>11}")
+    for n in args.rows:
+        jobs = make_jobs(n)
+        runs = [("legacy", legacy, ())] + [(f"template+{fmt}", current, (fmt,)) for fmt in ("csv", "csv.gz", "parquet")]
+        for label, fn, extra in runs:
+            elapsed, peak, size = measure(fn, "ML Engineer", "Remote", jobs, *extra)
+            print(f"{n:>7} {label:<16} {elapsed:>7.3f}s {peak / 2**20:>9.1f} {size / 2**20:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
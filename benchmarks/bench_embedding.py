@@ -0,0 +1,108 @@
+"""Embedding throughput: plain ``SentenceTransformer.encode`` vs the batching service.
+
+Encodes synthetic 300-word job-description chunks and reports chunks/sec for
+
+* ``encode``           -- one ``model.encode`` call over every chunk (today's path),
+* ``encode/session``   -- concurrent sessions each calling ``model.encode`` on
+  their own small request, as Streamlit sessions do now,
+* ``service/<backend>`` -- the same sessions going through ``EmbeddingService``,
+  for every ``--backends`` entry that can be loaded (``onnx`` needs onnxruntime),
+
+plus the mean cosine between each backend's vectors and the PyTorch ones.
+
+    python benchmarks/bench_embedding.py --chunks 2000 --sessions 8 --threads 4 --backends torch onnx
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import embedding_service
+from embedding_service import EMBED_MODEL, EmbeddingService, load_backend
+
+WORDS = ("python pytorch spark kubernetes sql aws models pipelines experimentation latency "
+         "distributed systems customers roadmap statistics dashboards serving inference "
+         "collaborate stakeholders ownership mentoring design reviews testing on-call").split()
+
+
+def make_chunks(n, words=300, seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(words // 3, words + 1, n)  # last chunks of a description are short
+    return [" ".join(rng.choice(WORDS, k)) for k in lengths]
+
+
+def run_sessions(encode, chunks, sessions, request_size):
+    """Split ``chunks`` into requests and push them through ``sessions`` threads."""
+    requests = [chunks[i:i + request_size] for i in range(0, len(chunks), request_size)]
+    results = [None] * len(requests)
+
+    def session(idx):
+        for i in range(idx, len(requests), sessions):
+            results[i] = encode(requests[i])
+
+    threads = [threading.Thread(target=session, args=(s,)) for s in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, np.vstack(results)
+
+
+def report(label, n, seconds, cosine=None):
+    agreement = f"{cosine:>10.4f}" if cosine is not None else f"{'':>10}"
+    print(f"{label:<22} {n / seconds:>10,.1f} {seconds:>9.2f}s {agreement}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent callers")
+    parser.add_argument("--request-size", type=int, default=8, help="chunks per session request")
+    parser.add_argument("--threads", type=int, default=embedding_service.EMBED_THREADS,
+                        help="intra-op threads for the service backends (0 = default)")
+    parser.add_argument("--batch-size", type=int, default=embedding_service.EMBED_BATCH_SIZE)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx"], choices=["torch", "onnx"])
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    chunks = make_chunks(args.chunks)
+    model = SentenceTransformer(EMBED_MODEL, device="cpu")
+    model.encode(chunks[:32], show_progress_bar=False)  # warm up
+
+    print(f"{args.chunks} chunks, {args.sessions} sessions x {args.request_size}-chunk requests")
+    print(f"{'path':<22} {'chunks/s':>10} {'total':>10} {'cos vs pt':>10}")
+    start = time.perf_counter()
+    reference = model.encode(chunks, show_progress_bar=False)
+    report("encode", len(chunks), time.perf_counter() - start)
+    seconds, _ = run_sessions(lambda batch: model.encode(batch, show_progress_bar=False),
+                              chunks, args.sessions, args.request_size)
+    report("encode/session", len(chunks), seconds)
+    del model
+
+    for name in args.backends:
+        if name == "onnx":
+            try:
+                import onnxruntime  # noqa: F401
+            except ImportError:
+                print(f"{'service/onnx':<22} skipped (onnxruntime not installed)")
+                continue
+        backend = load_backend(name, threads=args.threads, batch_size=args.batch_size)
+        service = EmbeddingService(backend, batch_size=args.batch_size)
+        service.encode(chunks[:32])
+        seconds, vectors = run_sessions(service.encode, chunks, args.sessions, args.request_size)
+        cosine = float(np.mean(np.sum(vectors * reference, axis=1)))  # both L2-normalized
+        report(f"service/{backend.name}", len(chunks), seconds, cosine)
+        stats = service.stats()
+        print(f"{'':<22} {stats['batches']} batches, {stats['texts'] / max(stats['batches'], 1):.1f} chunks/batch")
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
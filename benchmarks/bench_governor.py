@@ -0,0 +1,113 @@
+"""Per-source governor under injected faults: plain fan-out vs governed fan-out.
+
+Four fake boards stand in for ``scrape_jobs`` (``FaultyBackend``):
+
+* ``indeed``        -- healthy, ~50 ms,
+* ``linkedin``      -- blocking us: 90% of calls fail fast (429-style),
+* ``glassdoor``     -- hangs past the site timeout during an outage
+  (searches ``--outage`` start..end), healthy afterwards,
+* ``zip_recruiter`` -- ~100 ms with a 10% tail of 1.5 s calls.
+
+Each of ``--searches`` sequential searches scrapes the four boards through
+``iter_site_results`` with a ``--timeout`` second site timeout, first with the
+governor disabled, then enabled (breaker cooldown scaled down to
+``--cooldown`` seconds). Reported: search latency percentiles and, per board,
+calls that returned jobs, failed, or were skipped by an open circuit.
+
+    python benchmarks/bench_governor.py --searches 80 --timeout 2
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import governor
+from governor import CircuitBreaker, SourceUnavailable, get_governor
+from parallel_scrape import iter_site_results
+from scrape_cache import scrape_cache
+
+
+class FaultyBackend:
+    """Fake ``scrape_jobs`` injecting latency, errors and hangs per site.
+
+    ``faults[site]`` is a function of the search number returning
+    ``(latency_seconds, error_or_None)``; errors are raised after the latency.
+    """
+
+    def __init__(self, faults, seed=0):
+        self.faults = faults
+        self.search = 0
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, site_name, search_term, **params):
+        site = site_name[0]
+        with self._lock:
+            latency, error = self.faults[site](self.search, self.rng)
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        return pd.DataFrame({"title": [f"{search_term} at {site}"], "company": [site], "location": ["Remote"]})
+
+
+def default_faults(outage):
+    start, end = outage
+    return {
+        "indeed": lambda i, rng: (rng.uniform(0.03, 0.07), None),
+        "linkedin": lambda i, rng: (0.03, RuntimeError("429 Too Many Requests") if rng.random() < 0.9 else None),
+        "glassdoor": lambda i, rng: (5.0, None) if start <= i < end else (rng.uniform(0.06, 0.1), None),
+        "zip_recruiter": lambda i, rng: (1.5 if rng.random() < 0.1 else rng.uniform(0.08, 0.12), None),
+    }
+
+
+def run(backend, searches, timeout):
+    sites = list(backend.faults)
+    latencies, outcomes = [], {site: Counter() for site in sites}
+    for i in range(searches):
+        backend.search = i
+        start = time.perf_counter()
+        for site, jobs, error in iter_site_results({"search_term": f"query {i}"}, sites, backend, timeout):
+            if error is None:
+                outcomes[site]["ok"] += 1
+            elif isinstance(error, SourceUnavailable):
+                outcomes[site]["skipped"] += 1
+            else:
+                outcomes[site]["failed"] += 1
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies), outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--searches", type=int, default=80)
+    parser.add_argument("--timeout", type=float, default=2.0, help="site timeout (SITE_TIMEOUT)")
+    parser.add_argument("--cooldown", type=float, default=1.0, help="breaker cooldown before a probe")
+    parser.add_argument("--outage", type=int, nargs=2, default=[10, 40], help="glassdoor hangs for these searches")
+    args = parser.parse_args()
+
+    print(f"{'path':<10} {'p50 s':>7} {'p95 s':>7} {'max s':>7} {'total s':>8}   per site ok/failed/skipped")
+    for label, enabled in (("plain", False), ("governed", True)):
+        governor.GOVERNOR_ENABLED = enabled
+        scrape_cache.clear()
+        backend = FaultyBackend(default_faults(args.outage))
+        for site in backend.faults:
+            get_governor(site, rate_per_minute=6000, max_timeout=args.timeout, min_timeout=0.05,
+                         breaker=CircuitBreaker(cooldown=args.cooldown, max_cooldown=args.cooldown * 4))
+        latencies, outcomes = run(backend, args.searches, args.timeout)
+        sites = "  ".join(f"{site} {c['ok']}/{c['failed']}/{c['skipped']}" for site, c in outcomes.items())
+        print(f"{label:<10} {np.percentile(latencies, 50):>7.2f} {np.percentile(latencies, 95):>7.2f} "
+              f"{latencies.max():>7.2f} {latencies.sum():>8.1f}   {sites}")
+    timeouts = {site: stats["timeout"] for site, stats in governor.governor_stats().items()}
+    print(f"adaptive timeouts after the run: {timeouts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Ranking latency with a cold vs warm persistent job index.
+
+By default chunks are "encoded" with a fast deterministic stand-in so the
+benchmark runs without the model; pass ``--model`` to use all-MiniLM-L6-v2.
+
+    python benchmarks/bench_job_index.py --sizes 1000 10000 100000
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_index import EMBED_DIM, JobIndex
+
+WORDS = ("python data pipeline machine learning model spark sql cloud "
+         "kubernetes api product team remote senior engineer").split()
+
+
+def make_jobs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    jobs = {}
+    for i in range(n):
+        text = " ".join(rng.choice(WORDS, size=250))
+        jobs[hashlib.md5(f"{seed}-{i}".encode()).hexdigest()] = text
+    return jobs
+
+
+def fake_encoder(encode_ms):
+    def encode(texts):
+        if encode_ms:
+            time.sleep(encode_ms * len(texts) / 1000)
+        seeds = [int(hashlib.md5(t.encode()).hexdigest()[:8], 16) for t in texts]
+        return np.stack([np.random.default_rng(s).standard_normal(EMBED_DIM) for s in seeds]).astype("float32")
+    return encode
+
+
+def rank(index, jobs, encode):
+    start = time.perf_counter()
+    index.add_jobs(jobs, encode)
+    index.save()
+    query = encode(["resume text for a senior machine learning engineer"])
+    index.score(query, list(jobs))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--encode-ms", type=float, default=1.0,
+                        help="simulated per-chunk encode cost for the stand-in encoder")
+    parser.add_argument("--model", action="store_true", help="use SentenceTransformer")
+    args = parser.parse_args()
+
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+        encode = lambda texts: model.encode(texts, show_progress_bar=False)
+    else:
+        encode = fake_encoder(args.encode_ms)
+
+    print(f"{'chunks':>8} {'cold':>9} {'warm':>9} {'reload':>9} {'+1% new':>9}")
+    for n in args.sizes:
+        jobs = make_jobs(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            index = JobIndex(directory=tmp)
+            cold = rank(index, jobs, encode)
+            warm = rank(index, jobs, encode)
+            reload = rank(JobIndex(directory=tmp), jobs, encode)
+            fresh = dict(jobs, **make_jobs(max(1, n // 100), seed=1))
+            incremental = rank(index, fresh, encode)
+        print(f"{n:>8} {cold:>8.3f}s {warm:>8.3f}s {reload:>8.3f}s {incremental:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Result handling per search: DataFrame + iterrows vs the columnar ``JobTable``.
+
+For result lists of each size, times (and tracemalloc-peaks) the two things a
+search does with its results:
+
+* ``cards``  -- sort by match score and build the Streamlit card HTML
+  (original: ``sort_values`` + ``iterrows`` + one f-string per
+  ``st.markdown`` call; new: ``JobTable.sort`` + one ``render_cards``),
+* ``json``   -- newest-first ``to_dict('records')`` for /quick-search vs
+  ``JobTable.top_k`` + ``to_records``.
+
+    python benchmarks/bench_job_records.py --results 1000 5000 20000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_records import JobTable
+
+
+def make_results(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "job_id": [f"{i:016x}" for i in range(n)],
+        "title": rng.choice(["ML Engineer", "Data Scientist", "Software Engineer"], n),
+        "company": [f"Company {c}" for c in rng.integers(0, n // 5 + 1, n)],
+        "location": rng.choice(["Remote", "New York, NY", "Bengaluru, India"], n),
+        "job_url": [f"https://jobs.example.com/{i}" for i in range(n)],
+        "description": ["x" * 2000] * n,
+        "date_posted": pd.to_datetime("2024-01-01") + pd.to_timedelta(rng.integers(0, 90, n), unit="D"),
+        "min_amount": np.where(rng.random(n) < 0.5, np.nan, rng.integers(50, 200, n) * 1000.0),
+        "match_score": rng.random(n).round(4) * 100,
+        "merged_sources": rng.choice(["Lever", "Indeed, LinkedIn", "Greenhouse"], n),
+    })
+
+
+def legacy_cards(jobs_df):
+    calls = []
+    for _, row in jobs_df.sort_values("match_score", ascending=False).iterrows():
+        calls.append(
+            f"""
+            <div style="background:black;padding:1.5rem;
+            border-radius:12px;margin-bottom:1rem;
+            box-shadow:0 4px 12px rgba(0,0,0,0.08)">
+                <a href="{row.get('job_url', '#')}" target="_blank"
+                   style="font-size:1.1rem;font-weight:700;color:#4DA6FF">
+                    {row.get('title', 'N/A')}
+                </a>
+                <div style="color:white">
+                    {row.get('company', 'N/A')} — {row.get('location', 'N/A')}
+                </div>
+                <div style="color:white;font-weight:600">
+                    Match Score: {row.get('match_score', 0)}%
+                </div>
+                <div style="color:#AAAAAA;font-size:0.85rem">
+                    Seen on: {row.get('merged_sources', 'N/A')}
+                </div>
+            </div>
+            """)
+    return calls
+
+
+def table_cards(jobs_df):
+    return [JobTable.from_frame(jobs_df).sort("match_score").render_cards()]
+
+
+def legacy_json(jobs_df, k):
+    return jobs_df.sort_values("date_posted", ascending=False, na_position="last").head(k).to_dict("records")
+
+
+def table_json(jobs_df, k):
+    return JobTable.from_frame(jobs_df).top_k("date_posted", k).to_records()
+
+
+def measure(fn, *args, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        samples.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(samples), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    print(f"{'results':>8} {'task':<16} {'ms':>9} {'peak MB':>9} {'markdown calls':>15}")
+    for n in args.results:
+        jobs = make_results(n)
+        for label, fn, extra in (("cards iterrows", legacy_cards, ()), ("cards JobTable", table_cards, ()),
+                                 ("json all", legacy_json, (n,)), ("json JobTable", table_json, (n,))):
+            seconds, peak, out = measure(fn, jobs, *extra)
+            calls = len(out) if label.startswith("cards") else ""
+            print(f"{n:>8} {label:<16} {seconds * 1000:>9.1f} {peak / 1e6:>9.1f} {calls:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""/quick-search payloads: ``jsonify(to_dict('records'))`` vs the orjson serializer.
+
+For 50, 500 and 5000 result rows, reports serialization time and payload size
+for Flask's default JSON provider over ``to_dict('records')`` (the original
+path) and for ``JobTable`` records encoded by ``json_response.dumps``, with
+all fields and projected to ``title,company,job_url``, plus gzip (and brotli,
+when installed) sizes and compression time.
+
+    python benchmarks/bench_json_response.py --rows 50 500 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_response
+from bench_job_records import make_results
+from job_records import JobTable
+from json_response import compress, dumps
+
+PROJECTION = ["title", "company", "job_url"]
+flask_json = Flask(__name__).json
+
+
+def legacy(jobs):
+    return flask_json.dumps(jobs.sort_values("date_posted", ascending=False).to_dict("records")).encode()
+
+
+def serializer(jobs, fields=None):
+    columns = fields + ["date_posted"] if fields else None
+    table = JobTable.from_frame(jobs, columns).top_k("date_posted", len(jobs))
+    return dumps(table.to_records(fields))
+
+
+def best_of(fn, *args, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(*args)
+        samples.append(time.perf_counter() - start)
+    return min(samples), out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args()
+
+    encodings = json_response.ENCODINGS
+    print(f"orjson: {'yes' if json_response.orjson else 'no (stdlib json)'}; "
+          f"compression: {', '.join(encodings)}")
+    header = f"{'rows':>6} {'path':<18} {'ms':>8} {'bytes':>10}"
+    for encoding in encodings:
+        header += f" {encoding + ' bytes':>11} {encoding + ' ms':>8}"
+    print(header)
+    for n in args.rows:
+        jobs = make_results(n)
+        for label, fn, extra in (("to_dict+jsonify", legacy, ()), ("orjson", serializer, ()),
+                                 ("orjson projected", serializer, (PROJECTION,))):
+            seconds, body = best_of(fn, jobs, *extra)
+            line = f"{n:>6} {label:<18} {seconds * 1000:>8.2f} {len(body):>10,}"
+            for encoding in encodings:
+                packed_seconds, packed = best_of(compress, body, encoding)
+                line += f" {len(packed):>11,} {packed_seconds * 1000:>8.2f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
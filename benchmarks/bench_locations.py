@@ -0,0 +1,104 @@
+"""Location filtering: per-row ``location_match``/``determine_country`` vs ``locations``.
+
+Builds job frames whose location column draws from ``--distinct`` different
+strings (real feeds repeat a few thousand locations many times over), then
+times the original ``apply`` + country-map loop against ``location_mask`` and
+``resolve_locations``. The resolver cache is cleared before each run.
+
+    python benchmarks/bench_locations.py --rows 100000 --distinct 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from locations import location_mask, resolve_location, resolve_locations
+
+PLACES = ["San Francisco, CA", "New York, NY", "Austin, TX", "Seattle, WA", "Toronto, ON, Canada",
+          "Bengaluru, Karnataka, India", "Pune, India", "London, UK", "Berlin, Germany",
+          "Paris, France", "Sydney NSW", "Singapore", "Remote - US", "Remote", "Boston, MA",
+          "Hyderabad", "Chicago, Illinois, United States", "Munich", "Vancouver, BC"]
+USER_LOCATIONS = ["India", "San Francisco", "USA", "London"]
+
+
+def make_locations(n, distinct, seed=0):
+    rng = np.random.default_rng(seed)
+    pool = [f"{PLACES[i % len(PLACES)]}" + (f" (Office {i // len(PLACES)})" if i >= len(PLACES) else "")
+            for i in range(distinct)]
+    return pd.Series(rng.choice(pool, n))
+
+
+def determine_country(location_text):
+    loc = str(location_text).lower()
+    mapping = {
+        "india": "India", "canada": "Canada", "uk": "UK",
+        "united kingdom": "UK", "australia": "Australia",
+        "germany": "Germany", "france": "France", "singapore": "Singapore"
+    }
+    for k, v in mapping.items():
+        if k in loc:
+            return v
+    return "USA"
+
+
+def location_match(job_location, user_location):
+    if not job_location or not user_location:
+        return True
+    jl = job_location.lower()
+    ul = user_location.lower()
+    if "remote" in jl:
+        return True
+    if ul in jl:
+        return True
+    country_map = {
+        "india": ["india", "in"],
+        "usa": ["united states", "usa", "us"],
+        "uk": ["united kingdom", "uk", "england"],
+        "canada": ["canada"],
+        "australia": ["australia"],
+        "germany": ["germany"],
+        "france": ["france"],
+        "singapore": ["singapore"]
+    }
+    for key, variants in country_map.items():
+        if ul == key and any(v in jl for v in variants):
+            return True
+    return False
+
+
+def legacy(locations):
+    for user in USER_LOCATIONS:
+        locations.apply(lambda x: location_match(x, user))
+    return locations.apply(determine_country)
+
+
+def compiled(locations):
+    for user in USER_LOCATIONS:
+        location_mask(locations, user)
+    return resolve_locations(locations)["country"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--distinct", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{len(USER_LOCATIONS)} location filters + one country pass per run")
+    print(f"{'rows':>7} {'variant':<10} {'time':>8}")
+    for n in args.rows:
+        locations = make_locations(n, args.distinct)
+        for label, fn in [("legacy", legacy), ("compiled", compiled)]:
+            resolve_location.cache_clear()
+            start = time.perf_counter()
+            fn(locations)
+            print(f"{n:>7} {label:<10} {time.perf_counter() - start:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
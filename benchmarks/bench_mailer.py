@@ -0,0 +1,115 @@
+"""Email throughput: one connection per message vs the pooled dispatcher.
+
+Starts a minimal local SMTP stand-in (in the spirit of ``aiosmtpd``'s debug
+server) that accepts EHLO/AUTH PLAIN/MAIL/RCPT/DATA and adds a configurable
+delay to each new connection, simulating the TLS handshake and login round
+trips of a real provider.
+
+    python benchmarks/bench_mailer.py --messages 200 --handshake-ms 150
+"""
+import argparse
+import os
+import smtplib
+import socketserver
+import sys
+import threading
+import time
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mailer import MailDispatcher, ProviderRateLimiter, SMTPPool
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    handshake_delay = 0.0
+    received = 0
+    lock = threading.Lock()
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        time.sleep(self.handshake_delay)
+        self.reply("220 stand-in ESMTP ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250-stand-in")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with self.lock:
+                    StandInSMTPHandler.received += 1
+                self.reply("250 OK queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+def make_message(i):
+    msg = MIMEText(f"<p>Job alert #{i}</p>" * 50, "html")
+    msg["From"] = "alerts@example.com"
+    msg["To"] = f"user{i}@example.com"
+    msg["Subject"] = f"Job Alert {i}"
+    return msg
+
+
+def one_connection_per_message(port, messages):
+    for msg in messages:
+        server = smtplib.SMTP("127.0.0.1", port)
+        server.login("alerts@example.com", "secret")
+        server.send_message(msg)
+        server.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=20)
+    args = parser.parse_args()
+
+    StandInSMTPHandler.handshake_delay = args.handshake_ms / 1000
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), StandInSMTPHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    messages = [make_message(i) for i in range(args.messages)]
+
+    start = time.perf_counter()
+    one_connection_per_message(port, messages)
+    baseline = time.perf_counter() - start
+    print(f"per-message connection: {baseline:7.2f}s  {args.messages / baseline:8.1f} msg/s")
+
+    pool = SMTPPool("127.0.0.1", port, "alerts@example.com", "secret",
+                    size=args.pool_size, starttls=False)
+    dispatcher = MailDispatcher(pool=pool, limiter=ProviderRateLimiter("127.0.0.1"),
+                                workers=args.pool_size, batch_size=args.batch_size)
+    start = time.perf_counter()
+    futures = [dispatcher.send(msg) for msg in messages]
+    for future in futures:
+        future.result()
+    pooled = time.perf_counter() - start
+    print(f"pooled dispatcher:      {pooled:7.2f}s  {args.messages / pooled:8.1f} msg/s")
+    print(f"dispatcher stats: {dispatcher.stats()}")
+    print(f"stand-in server received {StandInSMTPHandler.received} messages across both runs")
+    pool.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
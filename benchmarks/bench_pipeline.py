@@ -0,0 +1,474 @@
+"""Offline replay of the whole search pipeline from recorded fixtures.
+
+``record`` saves real ``scrape_jobs`` DataFrames and raw Lever/Greenhouse
+payloads (needs jobspy and the network, once); ``synth`` writes fixtures of
+the same shape from a seed instead. ``run`` replays them through stub
+fetchers, with no network, and times every stage at each corpus size:
+
+* ``fetch.scrape``   -- per-site ``scrape_sites`` fan-out over the stub boards,
+* ``fetch.ats``      -- ``ATSFetcher.fetch_all`` parsing the stub payloads,
+* ``store``          -- ``JobStore.upsert_board`` of the ATS postings,
+* ``filter``         -- ``JobStore.search`` (title + location) and
+  ``location_mask`` on the board results,
+* ``dedup``          -- ``dedupe_jobs`` with near-duplicates,
+* ``chunk``          -- ``iter_chunks`` over every description,
+* ``embed``          -- encoding the chunks (the sentence-transformers model
+  when installed, else a deterministic hashing encoder; results record which),
+* ``rank``           -- ``JobIndex`` best-chunk scores blended with BM25,
+  as in the Streamlit ranking,
+* ``email``          -- ``render_job_alert`` and ``build_attachment``.
+
+Results (best of ``--repeat``) are written as JSON tagged with the commit, and
+``compare`` flags stages that got slower between two result files.
+
+    python benchmarks/bench_pipeline.py synth
+    python benchmarks/bench_pipeline.py run --sizes 1000 5000 20000
+    python benchmarks/bench_pipeline.py compare old.json new.json --threshold 1.2
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SITES = ["indeed", "linkedin", "zip_recruiter", "glassdoor"]
+QUERIES = [("Machine Learning Engineer", "United States"), ("Data Scientist", "Remote"),
+           ("Software Engineer", "New York, NY")]
+RESUME = ("Machine learning engineer with five years of Python, PyTorch and Kubernetes. Built "
+          "recommendation systems, feature stores and model serving on AWS; led a data platform team.")
+STAGES = ["fetch.scrape", "fetch.ats", "store", "filter", "dedup", "chunk", "embed", "rank", "email"]
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+# -------------------------------------------------
+# Fixtures
+# -------------------------------------------------
+def _write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+
+def record(directory, results_wanted):
+    """Scrape the benchmark queries and ATS boards once and save what came back."""
+    from jobspy import scrape_jobs
+
+    from ats import ATS_COMPANIES, GREENHOUSE_URL, LEVER_URL
+    from locations import country_for_search
+
+    for term, location in QUERIES:
+        for site in SITES:
+            try:
+                df = scrape_jobs(site_name=[site], search_term=term, location=location,
+                                 results_wanted=results_wanted, hours_old=72,
+                                 country_indeed=country_for_search(location))
+            except Exception as e:
+                print(f"  {site} / {term}: {e}")
+                continue
+            path = os.path.join(directory, "jobspy", site, f"{_slug(term)}.json")
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                df.to_json(path, orient="records", date_format="iso")
+            except (OSError, ValueError) as e:
+                print(f"  {site} / {term}: could not save: {e}")
+                continue
+            print(f"  {site} / {term}: {len(df)} jobs")
+    urls = {"lever": LEVER_URL, "greenhouse": GREENHOUSE_URL}
+    for board, companies in ATS_COMPANIES.items():
+        for company in companies:
+            try:
+                r = requests.get(urls[board].format(company=company), timeout=20)
+                if r.ok:
+                    _write_json(os.path.join(directory, "ats", board, f"{company}.json"), r.json())
+            except (requests.RequestException, OSError, ValueError) as e:
+                print(f"  {board} / {company}: {e}")
+    _write_json(os.path.join(directory, "manifest.json"),
+                {"queries": QUERIES, "synthetic": False, "recorded_at": datetime.now(timezone.utc).isoformat()})
+
+
+def synth(directory, results_wanted, seed=0):
+    """Seeded fixtures with the columns and payload shapes of the real sources."""
+    rng = np.random.default_rng(seed)
+    companies = [f"Company {i}" for i in range(60)]
+    places = ["New York, NY", "San Francisco, CA", "Remote", "Austin, TX", "London, UK", "Bengaluru, India"]
+    words = ("python pytorch kubernetes spark sql airflow aws gcp docker modeling experimentation "
+             "pipelines latency serving ranking retrieval llm analytics dashboards stakeholders").split()
+
+    def description(n_words):
+        return " ".join(rng.choice(words, n_words)) + "."
+
+    for term, location in QUERIES:
+        for site in SITES:
+            n = results_wanted
+            df = pd.DataFrame({
+                "id": [f"{site[:2]}-{_slug(term)}-{i}" for i in range(n)],
+                "site": site,
+                "job_url": [f"https://{site}.example.com/{_slug(term)}/{i}" for i in range(n)],
+                "title": [f"{rng.choice(['Senior ', '', 'Staff ', 'Junior '])}{term}" for _ in range(n)],
+                "company": rng.choice(companies, n),
+                "location": rng.choice(places, n),
+                "date_posted": (pd.Timestamp("2024-03-01") - pd.to_timedelta(rng.integers(0, 4, n), unit="D")).astype(str),
+                "job_type": rng.choice(["fulltime", "contract", "internship"], n),
+                "min_amount": np.where(rng.random(n) < 0.5, np.nan, rng.integers(80, 180, n) * 1000.0),
+                "max_amount": np.nan,
+                "is_remote": rng.random(n) < 0.3,
+                "description": [description(int(w)) for w in rng.integers(150, 700, n)],
+            })
+            # Boards share postings: copy some rows from the first site
+            if site != SITES[0]:
+                first = pd.read_json(os.path.join(directory, "jobspy", SITES[0], f"{_slug(term)}.json"))
+                shared = first.sample(frac=0.2, random_state=seed)
+                df.iloc[:len(shared), df.columns.get_indexer(["title", "company", "location"])] = \
+                    shared[["title", "company", "location"]].to_numpy()
+            path = os.path.join(directory, "jobspy", site, f"{_slug(term)}.json")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.to_json(path, orient="records", date_format="iso")
+
+    for board in ("lever", "greenhouse"):
+        for c in range(25):
+            jobs = []
+            for i in range(int(rng.integers(5, 40))):
+                title = rng.choice(["Machine Learning Engineer", "Data Scientist", "Software Engineer",
+                                    "Product Manager", "Recruiter"])
+                html = "".join(f"<p>{description(60)}</p>" for _ in range(int(rng.integers(2, 8))))
+                place = str(rng.choice(places))
+                url = f"https://{board}.example.com/company{c}/{i}"
+                if board == "lever":
+                    jobs.append({"text": title, "hostedUrl": url, "categories": {"location": place},
+                                 "description": html})
+                else:
+                    jobs.append({"title": title, "absolute_url": url, "location": {"name": place},
+                                 "content": html.replace("<", "&lt;").replace(">", "&gt;")})
+            payload = jobs if board == "lever" else {"jobs": jobs}
+            _write_json(os.path.join(directory, "ats", board, f"company{c}.json"), payload)
+    _write_json(os.path.join(directory, "manifest.json"),
+                {"queries": QUERIES, "synthetic": True, "seed": seed})
+
+
+def load_fixtures(directory):
+    with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    frames = {}
+    for path in sorted(glob.glob(os.path.join(directory, "jobspy", "*", "*.json"))):
+        site = os.path.basename(os.path.dirname(path))
+        frames.setdefault(site, []).append(pd.read_json(path, orient="records", convert_dates=False))
+    boards = {}
+    for path in sorted(glob.glob(os.path.join(directory, "ats", "*", "*.json"))):
+        board = os.path.basename(os.path.dirname(path))
+        with open(path, encoding="utf-8") as f:
+            boards.setdefault(board, {})[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return manifest, {site: pd.concat(dfs, ignore_index=True) for site, dfs in frames.items()}, boards
+
+# -------------------------------------------------
+# Stub Fetchers
+# -------------------------------------------------
+def scale_frame(df, n):
+    """``n`` rows cycled from ``df``; repeats get distinct URLs and titles,
+    except every tenth, which stays an exact cross-posting duplicate."""
+    idx = np.arange(n) % len(df)
+    copy = np.arange(n) // len(df)
+    out = df.iloc[idx].reset_index(drop=True)
+    varied = (copy > 0) & (np.arange(n) % 10 != 0)
+    suffix = pd.Series(copy.astype(str), dtype=object)
+    out.loc[varied, "title"] = out.loc[varied, "title"] + " " + suffix[varied]
+    if "job_url" in out:
+        out.loc[copy > 0, "job_url"] = out.loc[copy > 0, "job_url"] + "#" + suffix[copy > 0]
+    return out
+
+
+class StubScraper:
+    """``scrape_jobs`` replaying each site's recorded rows, scaled to ``per_site``."""
+
+    def __init__(self, frames, per_site):
+        self.frames = {site: scale_frame(df, per_site) for site, df in frames.items()}
+
+    def __call__(self, site_name, **params):
+        return self.frames[site_name[0]].copy()
+
+
+class StubSession:
+    """Stands in for a ``requests.Session``: serves recorded payloads by company."""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+
+    def get(self, url, headers=None, timeout=None):
+        r = requests.Response()
+        r.url = url
+        company = url.rstrip("/").split("/")[-1].split("?")[0]
+        if company == "jobs":  # greenhouse: .../boards/<company>/jobs
+            company = url.rstrip("/").split("/")[-2]
+        body = self.payloads.get(company)
+        r.status_code = 200 if body is not None else 404
+        r._content = (body or "").encode("utf-8")
+        return r
+
+    def close(self):
+        pass
+
+
+def scale_payloads(boards, n):
+    """Payloads cut or cycled to about ``n`` postings, spread evenly over the
+    companies; repeated entries get distinct URLs and titles."""
+    quota = max(1, int(np.ceil(n / max(sum(len(c) for c in boards.values()), 1))))
+    out = {}
+    for board, companies in boards.items():
+        url_key, title_key = ("hostedUrl", "text") if board == "lever" else ("absolute_url", "title")
+        out[board] = {}
+        for company, body in companies.items():
+            entries = _entries(board, json.loads(body))
+            scaled = []
+            for i in range(quota if entries else 0):
+                job = dict(entries[i % len(entries)])
+                copy = i // len(entries)
+                if copy:
+                    job[url_key] = f"{job.get(url_key)}#{copy}"
+                    job[title_key] = f"{job.get(title_key)} {copy}"
+                scaled.append(job)
+            out[board][company] = json.dumps(scaled if board == "lever" else {"jobs": scaled})
+    return out
+
+
+def _entries(board, payload):
+    return payload if board == "lever" else payload.get("jobs", [])
+
+# -------------------------------------------------
+# Encoders
+# -------------------------------------------------
+def hashing_encoder(dim=384):
+    """Deterministic bag-of-words feature hashing, for machines without the model."""
+    token = re.compile(r"\w+")
+    buckets = {}
+
+    def encode(texts):
+        out = np.zeros((len(texts), dim), dtype="float32")
+        for i, text in enumerate(texts):
+            for word in token.findall(text.lower()):
+                if word not in buckets:
+                    buckets[word] = zlib.crc32(word.encode("utf-8")) % dim
+                out[i, buckets[word]] += 1.0
+        return out
+    return encode
+
+
+def load_encoder(name):
+    if name in ("auto", "model"):
+        try:
+            from embedding_service import load_backend
+
+            backend = load_backend()
+            return f"model:{backend.name}", backend.encode
+        except ImportError:
+            if name == "model":
+                raise
+            print("sentence-transformers is not installed; using the hashing encoder")
+    return "hashing", hashing_encoder()
+
+# -------------------------------------------------
+# Pipeline
+# -------------------------------------------------
+def run_pipeline(manifest, frames, boards, size, encode, tmp):
+    """One pass over every stage for a corpus of about ``size`` jobs; returns
+    ``({stage: seconds}, {count: value})``."""
+    import governor
+    from ats import ATSFetcher
+    from dedup import dedupe_jobs
+    from email_render import build_attachment, render_job_alert
+    from job_index import JobIndex, hybrid_scores
+    from job_store import JobStore
+    from locations import location_mask
+    from parallel_scrape import scrape_sites
+    from scrape_cache import scrape_cache
+    from text_index import TextIndex
+    from text_utils import iter_chunks
+
+    term, location = manifest["queries"][0]
+    timings, counts = {}, {}
+
+    def stage(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        timings[name] = time.perf_counter() - start
+        return result
+
+    # Fetch: 60% of the corpus from the boards, 40% from ATS payloads
+    governor.GOVERNOR_ENABLED = False  # rate limits would throttle repeated replays
+    scraper = StubScraper(frames, max(1, int(size * 0.6) // len(frames)))
+    scrape_cache.clear()
+    params = {"site_name": list(frames), "search_term": term, "location": location,
+              "results_wanted": size, "hours_old": 72}
+    board_df, _ = stage("fetch.scrape", lambda: scrape_sites(params, scraper))
+
+    payloads = scale_payloads(boards, int(size * 0.4))
+    fetcher = ATSFetcher(cache=None)
+    fetcher.governors = {}
+    for board in fetcher.sessions:
+        fetcher.sessions[board] = StubSession(payloads.get(board, {}))
+    companies = {board: list(names) for board, names in payloads.items()}
+    ats_jobs, _ = stage("fetch.ats", lambda: fetcher.fetch_all(companies, deadline=600))
+    counts["fetched"] = len(board_df) + len(ats_jobs)
+
+    # Store and filter
+    store = JobStore(db_path=os.path.join(tmp, f"store-{size}.sqlite3"))
+    by_board = {}
+    for job in ats_jobs:
+        by_board.setdefault((job["source"].lower(), job["company"]), []).append(job)
+    stage("store", lambda: [store.upsert_board(board, company, jobs) for (board, company), jobs in by_board.items()])
+
+    def filter_jobs():
+        ats_df = store.search(term, location)
+        boards_df = board_df[location_mask(board_df["location"], location)]
+        return pd.concat([ats_df, boards_df.assign(source="JobBoard")], ignore_index=True)
+    jobs_df = stage("filter", filter_jobs)
+    jobs_df["description"] = jobs_df["description"].fillna("")
+    counts["filtered"] = len(jobs_df)
+
+    jobs_df = stage("dedup", lambda: dedupe_jobs(jobs_df, near_duplicates=True))
+    counts["deduped"] = len(jobs_df)
+
+    descriptions = dict(zip(jobs_df["job_id"], jobs_df["description"]))
+    chunks = stage("chunk", lambda: [chunk for _, chunk in iter_chunks(descriptions)])
+    counts["chunks"] = len(chunks)
+    chunk_emb = stage("embed", lambda: np.asarray(encode(chunks + [RESUME]), dtype="float32"))
+    resume_emb = chunk_emb[-1:] / max(np.linalg.norm(chunk_emb[-1]), 1e-9)
+    counts["embedded"] = len(chunk_emb)
+
+    # add_jobs chunks again, as it does in the app; only the encoding is precomputed
+    def rank():
+        index = JobIndex(directory=None, dim=chunk_emb.shape[1])
+        index.add_jobs(descriptions, lambda texts: chunk_emb[:len(texts)])
+        lexical = TextIndex()
+        lexical.add_many(jobs_df["job_id"].tolist(), title=jobs_df["title"].fillna("").tolist(),
+                         description=jobs_df["description"].tolist())
+        keys, values = lexical.search(RESUME, require=None, prefix=False)
+        scores = hybrid_scores(index.score(resume_emb, jobs_df["job_id"]), dict(zip(keys, values.tolist())))
+        ranked = jobs_df.assign(match_score=(jobs_df["job_id"].map(scores).fillna(0) * 100).round(2))
+        return ranked.sort_values("match_score", ascending=False)
+    ranked = stage("rank", rank)
+
+    stage("email", lambda: (render_job_alert(term, location, ranked), build_attachment(ranked, term)))
+    return timings, counts
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args):
+    if not os.path.exists(os.path.join(args.fixtures, "manifest.json")):
+        print(f"No fixtures in {args.fixtures}; writing synthetic ones (see `record` for real data)")
+        synth(args.fixtures, args.results_wanted)
+    manifest, frames, boards = load_fixtures(args.fixtures)
+    encoder_name, encode = load_encoder(args.encoder)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.machine()} x{os.cpu_count()}",
+        "encoder": encoder_name,
+        "fixtures": {"synthetic": manifest.get("synthetic", False),
+                     "board_rows": sum(len(df) for df in frames.values()),
+                     "ats_boards": sum(len(c) for c in boards.values())},
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+    print(f"{'size':>7} " + " ".join(f"{s:>12}" for s in STAGES) + f" {'total':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            best, counts = {}, {}
+            for _ in range(args.repeat):
+                timings, counts = run_pipeline(manifest, frames, boards, size, encode, tmp)
+                for name, seconds in timings.items():
+                    best[name] = min(best.get(name, float("inf")), seconds)
+            results["sizes"][str(size)] = {"seconds": {k: round(v, 5) for k, v in best.items()},
+                                           "counts": counts}
+            print(f"{size:>7} " + " ".join(f"{best[s]:>12.3f}" for s in STAGES) + f" {sum(best.values()):>9.2f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{results['commit']}.json")
+    _write_json(output, results)
+    print(f"Results written to {output}")
+
+
+def compare(args):
+    """Per stage and size: new / old seconds; exits 1 if any ratio exceeds ``threshold``."""
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    if old.get("encoder") != new.get("encoder"):
+        print(f"Note: encoders differ ({old.get('encoder')} vs {new.get('encoder')}); 'embed' is not comparable")
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    print(f"{'size':>7} {'stage':<14} {'old s':>9} {'new s':>9} {'ratio':>7}")
+    regressions = 0
+    for size, entry in new["sizes"].items():
+        before = old["sizes"].get(size, {}).get("seconds", {})
+        for name in STAGES:
+            if name not in before or name not in entry["seconds"]:
+                continue
+            a, b = before[name], entry["seconds"][name]
+            ratio = b / a if a else float("inf")
+            # Sub-millisecond stages are noise
+            flag = ratio > args.threshold and b - a > args.min_seconds
+            regressions += flag
+            print(f"{size:>7} {name:<14} {a:>9.4f} {b:>9.4f} {ratio:>7.2f}{'  REGRESSION' if flag else ''}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command")
+    for name in ("record", "synth"):
+        sub = commands.add_parser(name)
+        sub.add_argument("--fixtures", default=FIXTURE_DIR)
+        sub.add_argument("--results-wanted", type=int, default=100, help="jobs per site and query")
+    sub = commands.add_parser("run")
+    sub.add_argument("--fixtures", default=FIXTURE_DIR)
+    sub.add_argument("--results-wanted", type=int, default=100, help="per site, when synthesizing")
+    sub.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    sub.add_argument("--repeat", type=int, default=3)
+    sub.add_argument("--encoder", choices=["auto", "model", "hashing"], default="auto")
+    sub.add_argument("--output", help="results file (default: benchmarks/results/pipeline-<commit>.json)")
+    sub = commands.add_parser("compare")
+    sub.add_argument("old")
+    sub.add_argument("new")
+    sub.add_argument("--threshold", type=float, default=1.2, help="flag stages slower by this factor")
+    sub.add_argument("--min-seconds", type=float, default=0.005, help="ignore smaller absolute changes")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.fixtures, args.results_wanted)
+    elif args.command == "synth":
+        synth(args.fixtures, args.results_wanted)
+    elif args.command == "compare":
+        sys.exit(compare(args))
+    else:
+        if args.command is None:
+            args = parser.parse_args(["run"])
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
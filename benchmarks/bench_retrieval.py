@@ -0,0 +1,84 @@
+"""Whole-corpus retrieval: exact scan vs HNSW candidates + exact re-rank.
+
+Jobs get three chunk vectors drawn around topic centroids (so neighbourhoods
+look like real embeddings rather than uniform noise). For each corpus size the
+benchmark reports recall@k of ``JobCorpus.top_k`` on the HNSW path against
+the exact scan, and p50/p99 latency of one resume for several ``ef_search``
+settings.
+
+    python benchmarks/bench_retrieval.py --sizes 10000 50000 100000 --ef 16 64 256
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_match
+from batch_match import JobCorpus
+from job_index import EMBED_DIM
+
+
+def make_corpus(chunks, queries, chunks_per_job=3, topics=1000, noise=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((topics, EMBED_DIM)).astype("float32")
+    n_jobs = chunks // chunks_per_job
+    topic_of = np.repeat(rng.integers(0, topics, n_jobs), chunks_per_job)
+    vectors = centroids[topic_of] + noise * rng.standard_normal((len(topic_of), EMBED_DIM)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    jobs = pd.DataFrame({"job_id": [f"job-{i}" for i in range(n_jobs)]})
+    # ann_min_rows=inf: the graph is built (and timed) separately below
+    corpus = JobCorpus(jobs, vectors, np.arange(n_jobs) * chunks_per_job, ann_min_rows=float("inf"))
+    resumes = centroids[rng.integers(0, topics, queries)]
+    return corpus, resumes + noise * rng.standard_normal(resumes.shape).astype("float32")
+
+
+def percentile_ms(samples, q):
+    return np.percentile(samples, q) * 1000
+
+
+def timed(corpus, resumes, k, **options):
+    found, samples = [], []
+    for emb in resumes:
+        t = time.perf_counter()
+        idx, _ = corpus.top_k(emb[None, :], k, **options)
+        samples.append(time.perf_counter() - t)
+        found.append(set(idx[0].tolist()))
+    return found, samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000],
+                        help="number of chunk vectors")
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--candidates", type=int, default=batch_match.ANN_CANDIDATES)
+    parser.add_argument("-k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'chunks':>8} {'method':<14} {'recall@k':>9} {'p50':>9} {'p99':>9}")
+    for n in args.sizes:
+        corpus, resumes = make_corpus(n, args.queries)
+        start = time.perf_counter()
+        corpus.ann = corpus._build_ann()
+        build = time.perf_counter() - start
+
+        truth, samples = timed(corpus, resumes, args.k, exact=True)
+        print(f"{len(corpus.vectors):>8} {'exact':<14} {1.0:>9.3f} "
+              f"{percentile_ms(samples, 50):>7.2f}ms {percentile_ms(samples, 99):>7.2f}ms")
+        for ef in args.ef:
+            found, samples = timed(corpus, resumes, args.k, exact=False, ef_search=ef,
+                                   candidates=args.candidates)
+            recall = np.mean([len(t & f) / len(t) for t, f in zip(truth, found)])
+            print(f"{'':>8} {f'hnsw ef={ef}':<14} {recall:>9.3f} "
+                  f"{percentile_ms(samples, 50):>7.2f}ms {percentile_ms(samples, 99):>7.2f}ms")
+        print(f"{'':>8} (HNSW build {build:.1f}s, M={batch_match.ANN_HNSW_M}, candidates={args.candidates})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Streamlit cold start: time from a fresh interpreter to the first rendered page.
+
+Each run starts a new Python process that imports Streamlit, executes
+``streamlit_app.py`` once through ``streamlit.testing.v1.AppTest`` (the same
+script run a first browser session triggers) and reports
+
+* ``first page`` -- process start until the first script run has rendered,
+* ``model ready`` -- process start until the embedding model has encoded a text.
+
+``--mode eager`` imports jobspy, faiss, pypdf and loads the model before the
+first run, as the app did before these were deferred.
+
+    python benchmarks/bench_startup.py --runs 3 --mode lazy eager
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def child(mode):
+    from streamlit.testing.v1 import AppTest
+
+    from embedding_service import get_embedding_service
+
+    if mode == "eager":
+        import faiss  # noqa: F401
+        import jobspy  # noqa: F401
+        import pypdf  # noqa: F401
+        get_embedding_service().encode(["warm-up"])
+    app = AppTest.from_file(os.path.join(ROOT, "streamlit_app.py"), default_timeout=600)
+    app.run()
+    first_page = time.time()
+    if app.exception:
+        raise SystemExit(f"app raised: {app.exception}")
+    get_embedding_service().encode(["ready?"])  # waits for the background load
+    print(json.dumps({"first_page": first_page, "model_ready": time.time()}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--mode", nargs="+", default=["lazy", "eager"], choices=["lazy", "eager"])
+    parser.add_argument("--child", choices=["lazy", "eager"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child)
+
+    print(f"{'mode':<8} {'first page':>12} {'model ready':>12}   (median of {args.runs} runs)")
+    for mode in args.mode:
+        first, ready = [], []
+        for _ in range(args.runs):
+            launched = time.time()
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode],
+                                 cwd=ROOT, capture_output=True, text=True, check=True)
+            timings = json.loads(out.stdout.strip().splitlines()[-1])
+            first.append(timings["first_page"] - launched)
+            ready.append(timings["model_ready"] - launched)
+        print(f"{mode:<8} {np.median(first):>11.2f}s {np.median(ready):>11.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Title filtering: ``str.contains`` scans vs the BM25 inverted index.
+
+Indexes synthetic postings (title plus a short description), then runs a mix
+of plain, abbreviated and prefix queries, reporting build time, p50/p99 lookup
+latency (all matches, and the top ``--top`` by BM25) and how many postings each
+approach matched.
+
+    python benchmarks/bench_text_index.py --postings 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_index import TextIndex
+
+SENIORITY = ["", "Senior ", "Staff ", "Lead ", "Principal ", "Junior "]
+ROLES = ["Machine Learning Engineer", "ML Engineer", "Data Scientist", "Software Engineer",
+         "Data Engineer", "Product Manager", "Research Scientist", "Backend Engineer",
+         "Front-End Developer", "Site Reliability Engineer", "Analytics Engineer", "NLP Scientist"]
+TEAMS = ["", ", Platform", ", Growth", " - Payments", ", Infrastructure", " (Remote)"]
+WORDS = ("python pytorch spark kubernetes sql aws models pipelines experimentation latency "
+         "distributed systems customers roadmap statistics dashboards serving inference").split()
+QUERIES = ["ML Engineer", "machine learning engineer", "data scien", "software engineer",
+           "swe", "frontend dev", "staff", "sre", "product man", "research"]
+
+
+def make_postings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    titles = [rng.choice(SENIORITY) + rng.choice(ROLES) + rng.choice(TEAMS) for _ in range(n)]
+    descriptions = [" ".join(rng.choice(WORDS, 40)) for _ in range(n)]
+    return pd.DataFrame({"title": titles, "description": descriptions})
+
+
+def percentile_ms(samples, q):
+    return np.percentile(samples, q) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--postings", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--top", type=int, default=50)
+    args = parser.parse_args()
+
+    for n in args.postings:
+        postings = make_postings(n)
+        start = time.perf_counter()
+        index = TextIndex()
+        index.add_many(range(n), title=postings["title"].tolist(),
+                       description=postings["description"].tolist())
+        build = time.perf_counter() - start
+        for query in QUERIES:  # freeze postings once, as after the first searches
+            index.search(query)
+        print(f"\n{n} postings: index built in {build:.2f}s ({n / build:,.0f} docs/s)")
+        print(f"{'query':<28} {'contains':>10} {'all p50':>10} {'all p99':>10} "
+              f"{f'top{args.top} p50':>10} {f'top{args.top} p99':>10} {'str hits':>9} {'idx hits':>9}")
+        for query in QUERIES:
+            start = time.perf_counter()
+            scan = postings["title"].str.contains(query, case=False, regex=False)
+            contains = time.perf_counter() - start
+            timings = {}
+            for limit in (None, args.top):
+                samples = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    keys, _ = index.search(query, limit=limit)
+                    samples.append(time.perf_counter() - start)
+                timings[limit] = samples
+            hits = len(index.search(query)[0])
+            print(f"{query:<28} {contains * 1000:>8.2f}ms "
+                  f"{percentile_ms(timings[None], 50):>8.3f}ms {percentile_ms(timings[None], 99):>8.3f}ms "
+                  f"{percentile_ms(timings[args.top], 50):>8.3f}ms {percentile_ms(timings[args.top], 99):>8.3f}ms "
+                  f"{int(scan.sum()):>9} {hits:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""HTML cleaning and chunking: the original regex/word-slice functions vs text_utils.
+
+Generates real-length postings (600-900 words) in the three shapes the app
+sees: Lever HTML, Greenhouse entity-encoded HTML and plain JobSpy text. Times
+cleaning every description, then chunking the cleaned descriptions as the job
+index does (original: ``chunk_text`` re-cleans and slices 300-word lists;
+new: ``iter_chunks`` token windows with overlap), and reports throughput and
+tracemalloc peak memory for each stage.
+
+    python benchmarks/bench_text_utils.py --descriptions 50000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_utils import clean_html, iter_chunks
+
+WORDS = ("we are looking for an engineer to design build and operate distributed systems "
+         "python pytorch spark kubernetes sql aws models pipelines experimentation latency "
+         "customers roadmap statistics dashboards serving inference collaborate with "
+         "stakeholders ownership mentoring code reviews testing on-call benefits").split()
+
+
+def legacy_clean_html(text):
+    if not isinstance(text, str):
+        return ""
+    text = re.sub(r"<.*?>", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def legacy_chunk_text(text, chunk_size=300):
+    words = legacy_clean_html(text).split()
+    return [" ".join(words[i:i+chunk_size]) for i in range(0, len(words), chunk_size)]
+
+
+def make_descriptions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        paragraphs = [" ".join(rng.choice(WORDS, rng.integers(60, 120))) + "."
+                      for _ in range(rng.integers(6, 10))]
+        shape = i % 3
+        if shape == 0:  # Lever: raw HTML
+            out.append("".join(f"<div><b>Section</b></div><ul><li>{p}</li></ul>\n" for p in paragraphs))
+        elif shape == 1:  # Greenhouse: entity-encoded HTML
+            out.append("".join(f"&lt;p&gt;{p} &amp;amp; more&amp;nbsp;&lt;/p&gt;" for p in paragraphs))
+        else:  # JobSpy: markdown-ish plain text
+            out.append("\n\n".join(f"**Section**\n- {p}" for p in paragraphs))
+    return out
+
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--descriptions", type=int, default=50000)
+    args = parser.parse_args()
+
+    raw = make_descriptions(args.descriptions)
+    mb = sum(map(len, raw)) / 1e6
+    print(f"{len(raw)} descriptions, {mb:.0f} MB of text")
+    print(f"{'stage':<26} {'seconds':>8} {'desc/s':>9} {'peak MB':>8} {'chunks':>8}")
+
+    def row(label, seconds, peak, chunks=""):
+        print(f"{label:<26} {seconds:>8.2f} {len(raw) / seconds:>9,.0f} {peak / 1e6:>8.1f} {chunks:>8}")
+
+    seconds, peak, legacy_clean = measure(lambda: [legacy_clean_html(d) for d in raw])
+    row("clean (original)", seconds, peak)
+    seconds, peak, cleaned = measure(lambda: [clean_html(d) for d in raw])
+    row("clean (text_utils)", seconds, peak)
+    leftovers = sum("&lt;" in d or "&amp;" in d for d in legacy_clean)
+    print(f"{'':<26} original leaves entity-encoded markup in {leftovers} descriptions")
+
+    seconds, peak, chunks = measure(lambda: [ch for d in legacy_clean for ch in legacy_chunk_text(d)])
+    row("chunk list (original)", seconds, peak, len(chunks))
+    del chunks
+    seconds, peak, chunks = measure(lambda: [ch for _, ch in iter_chunks(enumerate(cleaned))])
+    row("chunk list (text_utils)", seconds, peak, len(chunks))
+    del chunks
+    seconds, peak, count = measure(lambda: sum(1 for _ in iter_chunks(enumerate(cleaned))))
+    row("chunk stream (text_utils)", seconds, peak, count)
+
+
+if __name__ == "__main__":
+    main()
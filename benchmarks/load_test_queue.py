@@ -0,0 +1,112 @@
+"""Load-test the /search job queue with a stubbed ``scrape_jobs``.
+
+Fires concurrent POSTs at the Flask app through its test client, counts
+accepted vs 429-rejected requests, and tracks how many jobs ever ran at once
+(each job scrapes its sites in parallel, so that is never above the number
+of workers). The per-source governor is disabled: its rate limits would
+reject most of the stubbed scrapes. ``--restart`` stops the workers mid-run and starts a fresh queue on the
+same SQLite file to show queued/running jobs are picked up again.
+
+    python benchmarks/load_test_queue.py --requests 200 --workers 2 --depth 50
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--depth", type=int, default=50)
+    parser.add_argument("--scrape-seconds", type=float, default=0.05)
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["JOB_QUEUE_DB"] = os.path.join(tmp, "jobs.sqlite3")
+    os.environ["JOB_WORKERS"] = str(args.workers)
+    os.environ["JOB_QUEUE_DEPTH"] = str(args.depth)
+
+    import app as flask_app
+    import governor
+    from job_queue import JobQueue
+
+    governor.GOVERNOR_ENABLED = False
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def fake_scrape_jobs(**kwargs):
+        time.sleep(args.scrape_seconds)
+        return pd.DataFrame([{"title": "Engineer", "company": "Acme", "date_posted": "2024-01-01"}])
+
+    def counted(handler):
+        def run(payload):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                return handler(payload)
+            finally:
+                with lock:
+                    active[0] -= 1
+        return run
+
+    flask_app.scrape_jobs = fake_scrape_jobs
+    flask_app.job_queue.handler = counted(flask_app.job_queue.handler)
+    flask_app.send_email_notification = lambda *a, **k: None
+    client = flask_app.app.test_client()
+
+    def post(i):
+        r = client.post("/search", data={"job_role": f"role {i}", "location": "Remote", "email": "x@example.com"})
+        return r.status_code, r.get_json().get("job_id")
+
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    quiet.__enter__()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        responses = list(pool.map(post, range(args.requests)))
+    submit_time = time.perf_counter() - start
+    accepted = [job_id for code, job_id in responses if code == 200]
+    rejected = sum(1 for code, _ in responses if code == 429)
+
+    if args.restart:
+        # Simulate a crashed process: stop the workers and expire their leases
+        flask_app.job_queue.stop(timeout=5)
+        waiting = flask_app.job_queue.depth()
+        with contextlib.closing(sqlite3.connect(os.environ["JOB_QUEUE_DB"])) as db:
+            db.execute("UPDATE jobs SET lease_expires = 0 WHERE status = 'running'")
+            db.commit()
+        flask_app.job_queue = JobQueue(counted(flask_app.run_search_job))
+        flask_app.job_queue.start()
+
+    while True:
+        statuses = [client.get(f"/jobs/{job_id}").get_json()["job"]["status"] for job_id in accepted]
+        if all(s in ("done", "failed") for s in statuses):
+            break
+        time.sleep(0.05)
+    total = time.perf_counter() - start
+    quiet.__exit__(None, None, None)
+
+    if args.restart:
+        print(f"restart: {waiting} jobs were waiting when the workers stopped")
+    print(f"requests={args.requests} accepted={len(accepted)} rejected_429={rejected}")
+    print(f"submit phase {submit_time:.2f}s, drained in {total:.2f}s "
+          f"({len(accepted) / total:.1f} jobs/s)")
+    print(f"peak concurrent jobs={peak[0]} (workers={args.workers}), "
+          f"done={statuses.count('done')} failed={statuses.count('failed')}")
+
+
+if __name__ == "__main__":
+    main()
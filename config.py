@@ -34,10 +34,9 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     TESTING = False
-    # In production, always use strong secret key
+    # In production, always use strong secret key (checked by get_config, so
+    # modules that only read shared settings can import this file anywhere)
     SECRET_KEY = os.getenv('SECRET_KEY')
-    if not SECRET_KEY:
-        raise ValueError("SECRET_KEY environment variable must be set in production")
 
 class TestingConfig(Config):
     """Testing configuration"""
@@ -55,4 +54,7 @@ config = {
 def get_config():
     """Get configuration based on environment"""
     env = os.getenv('FLASK_ENV', 'development')
-    return config.get(env, config['default'])
+    selected = config.get(env, config['default'])
+    if not selected.SECRET_KEY:
+        raise ValueError("SECRET_KEY environment variable must be set in production")
+    return selected
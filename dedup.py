@@ -0,0 +1,268 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Deduplication Configuration
+# -------------------------------------------------
+KEY_COLUMNS = ("title", "company", "location")
+SHINGLE_WIDTH = 64        # bytes of normalized text shingled per job
+NUM_HASHES = 64           # MinHash signature length
+BANDS = 8                 # LSH bands of NUM_HASHES // BANDS rows each (candidates from ~0.77 Jaccard)
+NEAR_DUPLICATE_THRESHOLD = 0.85  # estimated Jaccard a candidate pair must reach to merge
+DESCRIPTION_CHARS = 120   # description prefix mixed in when use_description=True
+
+# Title words that make two otherwise similar titles different jobs
+LEVEL_WORDS = {"senior": "senior", "sr": "senior", "junior": "junior", "jr": "junior", "staff": "staff",
+               "principal": "principal", "lead": "lead", "head": "head", "intern": "intern",
+               "associate": "associate", "manager": "manager", "director": "director",
+               "i": "1", "ii": "2", "iii": "3", "iv": "4", "v": "5"}
+_LEVEL_RE = r"\b(?:" + "|".join(LEVEL_WORDS) + r"|\d+)\b"
+
+# Spelled out before shingling, so "Sr. ML Engineer" and "Senior Machine
+# Learning Engineer" sign alike; work-mode words are dropped ("X (Remote)")
+TITLE_ABBREVIATIONS = {"sr": "senior", "snr": "senior", "jr": "junior", "ml": "machine learning",
+                       "mle": "machine learning engineer", "swe": "software engineer",
+                       "eng": "engineer", "engr": "engineer", "mgr": "manager", "dev": "developer",
+                       "assoc": "associate", "mgmt": "management"}
+TITLE_NOISE = ("remote", "hybrid", "onsite", "on site", "work from home", "wfh")
+_ABBREVIATION_RE = re.compile(r"\b(?:" + "|".join(TITLE_ABBREVIATIONS) + r")\b")
+_NOISE_RE = re.compile(r"\b(?:" + "|".join(TITLE_NOISE) + r")\b")
+
+_rng = np.random.default_rng(20240101)
+_HASH_A = _rng.integers(1, 1 << 63, NUM_HASHES, dtype=np.uint64) | np.uint64(1)
+_HASH_B = _rng.integers(0, 1 << 63, NUM_HASHES, dtype=np.uint64)
+
+# -------------------------------------------------
+# Normalization & Exact Fingerprints
+# -------------------------------------------------
+def normalize_text(series):
+    """Lowercase, strip punctuation and collapse whitespace, vectorized.
+
+    Work is done once per distinct value, since company and location repeat a lot.
+    """
+    codes, uniques = pd.factorize(series.fillna("").astype(str))
+    cleaned = (
+        pd.Series(uniques, dtype=object).str.lower()
+        .str.replace(r"[^\w]+", " ", regex=True)
+        .str.strip()
+        .to_numpy(dtype=object)
+    )
+    return pd.Series(cleaned.take(codes) if len(cleaned) else np.full(len(series), "", dtype=object),
+                     index=series.index)
+
+
+def normalized_keys(df):
+    return pd.DataFrame({
+        col: normalize_text(df[col]) if col in df.columns else ""
+        for col in KEY_COLUMNS
+    }, index=df.index)
+
+
+def fingerprint(df, keys=None):
+    """Bulk 64-bit hash of normalized title/company/location, as hex strings."""
+    keys = normalized_keys(df) if keys is None else keys
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return pd.Series([format(h, "016x") for h in hashes.tolist()], index=df.index)
+
+# -------------------------------------------------
+# Near-Duplicate Detection (MinHash / LSH)
+# -------------------------------------------------
+def _shingle_codes(texts, width=SHINGLE_WIDTH):
+    """Character 3-gram codes for each text as an ``(n, width - 2)`` array,
+    plus a mask of the positions that fall inside the text."""
+    raw = np.array(texts.str.encode("utf-8", errors="ignore").tolist(), dtype=f"S{width}")
+    chars = raw.view(np.uint8).reshape(len(raw), width).astype(np.uint64)
+    codes = (chars[:, :-2] << np.uint64(16)) | (chars[:, 1:-1] << np.uint64(8)) | chars[:, 2:]
+    valid = chars[:, 2:] != 0
+    return codes, valid
+
+
+def minhash_signatures(texts):
+    """``(n, NUM_HASHES)`` MinHash signatures over character 3-grams.
+
+    Uses multiply-shift hashing (wrapping uint64 arithmetic) so every hash
+    function is two vectorized ops. Also returns a mask of texts too short to
+    have any 3-gram.
+    """
+    codes, valid = _shingle_codes(texts)
+    # Pad positions past the end with the first shingle so they never win the min
+    codes = np.where(valid, codes, codes[:, :1])
+    sig = np.empty((len(codes), NUM_HASHES), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for k in range(NUM_HASHES):
+            sig[:, k] = ((codes * _HASH_A[k] + _HASH_B[k]) >> np.uint64(32)).min(axis=1)
+    return sig, ~valid.any(axis=1)
+
+
+def _canonical_title(title, location):
+    """Normalized title with abbreviations spelled out, work-mode words
+    dropped and a trailing copy of the location ("Data Scientist - New
+    York" at "New York, NY") cut off."""
+    words = _NOISE_RE.sub(" ", _ABBREVIATION_RE.sub(lambda m: TITLE_ABBREVIATIONS[m.group(0)], title)).split()
+    place = location.split()
+    for k in range(min(len(place), len(words) - 1), 0, -1):
+        if words[-k:] == place[:k]:
+            del words[-k:]
+            break
+    return " ".join(words) or title
+
+
+def canonical_titles(keys):
+    """``_canonical_title`` of every row of normalized ``keys``, once per
+    distinct title/location pair."""
+    codes, uniques = pd.factorize(keys["title"] + "\n" + keys["location"])
+    canonical = np.array([_canonical_title(*pair.split("\n")) for pair in uniques], dtype=object)
+    return pd.Series(canonical.take(codes) if len(canonical) else np.empty(0, dtype=object),
+                     index=keys.index)
+
+
+def _levels(titles):
+    """Canonical seniority/level words and numbers of each normalized title, as one string."""
+    found = titles.str.findall(_LEVEL_RE)
+    return found.map(lambda words: " ".join(sorted({LEVEL_WORDS.get(w, w) for w in words})))
+
+
+def _candidate_pairs(band_keys):
+    """Row pairs ``(a, b)`` with ``a < b`` sharing a bucket in any band."""
+    pairs = set()
+    for keys in band_keys:
+        order = np.argsort(keys, kind="stable")
+        ordered = keys[order]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+        for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+            members = np.sort(order[start:start + size]).tolist()
+            pairs.update((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+    if not pairs:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    a, b = np.array(sorted(pairs), dtype=np.int64).T
+    return a, b
+
+
+def near_duplicate_groups(df, use_description=False, keys=None):
+    """Cluster label per row from MinHash/LSH over canonical titles.
+
+    Titles are compared after ``canonical_titles`` (abbreviations spelled
+    out, "remote" and a trailing location dropped). Rows with the same exact
+    key always share a label. Otherwise rows only
+    collide within the same company, the same first word of the location
+    ("san francisco ca" and "san francisco california" block together; NYC
+    and London postings of one role do not) and the same level words
+    ("Software Engineer I" and "II" never do). LSH candidates merge only when
+    their estimated Jaccard similarity reaches ``NEAR_DUPLICATE_THRESHOLD``,
+    and each row joins a cluster only if it is similar to the cluster's first
+    row, so chains of small edits do not merge different jobs.
+    """
+    n = len(df)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    keys = normalized_keys(df) if keys is None else keys
+    exact = pd.factorize(fingerprint(df, keys))[0]
+    first = np.unique(exact, return_index=True)[1]
+    reps = keys.iloc[first].reset_index(drop=True)
+    m = len(reps)
+
+    titles = canonical_titles(reps)
+    text = titles
+    if use_description and "description" in df.columns:
+        prefix = df["description"].iloc[first].astype(str).str.slice(0, DESCRIPTION_CHARS)
+        text = text + " " + normalize_text(prefix.reset_index(drop=True))
+    # Titles repeat heavily across boards: sign each distinct text once
+    text_codes, text_uniques = pd.factorize(text)
+    sig, empty = minhash_signatures(pd.Series(text_uniques, dtype=object))
+    sig, empty = sig[text_codes], empty[text_codes]
+    title_codes, title_uniques = pd.factorize(titles)
+    levels = _levels(pd.Series(title_uniques, dtype=object)).to_numpy(dtype=object).take(title_codes)
+    loc_codes, loc_uniques = pd.factorize(reps["location"])
+    city = pd.Series(loc_uniques, dtype=object).str.split(" ", n=1).str[0].to_numpy(dtype=object).take(loc_codes)
+    block = pd.factorize(reps["company"].to_numpy(dtype=object) + "|" + city + "|" + levels)[0]
+    # Texts without a single 3-gram only match their exact key
+    block = np.where(empty, -1 - np.arange(m), block)
+
+    # Same block and same canonical text: certain duplicates, merged before LSH
+    unit = pd.factorize(pd.util.hash_pandas_object(
+        pd.DataFrame({"block": block, "text": text_codes}), index=False).to_numpy())[0]
+    unit_first = np.unique(unit, return_index=True)[1]
+    sig, block = sig[unit_first], block[unit_first]
+    units = len(unit_first)
+
+    rows = NUM_HASHES // BANDS
+    band_keys = []
+    for b in range(BANDS):
+        band = pd.DataFrame(sig[:, b * rows:(b + 1) * rows])
+        band["block"] = block
+        band_keys.append(pd.util.hash_pandas_object(band, index=False).to_numpy())
+    a, b = _candidate_pairs(band_keys)
+    similarity = (sig[a] == sig[b]).mean(axis=1)
+    close = similarity >= NEAR_DUPLICATE_THRESHOLD
+
+    # Leader clustering in row order: a row joins the most similar earlier leader
+    neighbours = {}
+    for x, y, sim in zip(a[close].tolist(), b[close].tolist(), similarity[close].tolist()):
+        neighbours.setdefault(y, []).append((sim, x))
+    labels = np.arange(units)
+    leader = np.ones(units, dtype=bool)
+    for y in sorted(neighbours):
+        leaders = [(sim, -x) for sim, x in neighbours[y] if leader[x]]
+        if leaders:
+            labels[y] = -max(leaders)[1]
+            leader[y] = False
+    labels = unit_first[labels][unit]
+    return labels[exact]
+
+# -------------------------------------------------
+# Dedup Engine
+# -------------------------------------------------
+def _source_labels(df):
+    if "site" in df.columns:
+        site = df["site"].astype("string").str.title()
+        if "source" in df.columns:
+            return site.fillna(df["source"].astype("string")).fillna("Unknown")
+        return site.fillna("Unknown")
+    if "source" in df.columns:
+        return df["source"].astype("string").fillna("Unknown")
+    return pd.Series("Unknown", index=df.index, dtype="string")
+
+
+def dedupe_jobs(jobs_df, near_duplicates=False, use_description=False):
+    """Drop duplicate postings and record where each surviving job was seen.
+
+    Adds ``job_id`` (exact fingerprint of normalized title/company/location),
+    ``merged_sources`` (comma-separated boards the job appeared on) and
+    ``duplicates_merged``. With ``near_duplicates`` the same role posted with
+    slightly different titles is also merged, using MinHash/LSH over titles
+    (plus a description prefix with ``use_description``).
+    """
+    if jobs_df.empty:
+        return jobs_df.assign(job_id=pd.Series(dtype=str), merged_sources=pd.Series(dtype=str),
+                              duplicates_merged=pd.Series(dtype=int))
+    jobs_df = jobs_df.reset_index(drop=True)
+    keys = normalized_keys(jobs_df)
+    job_id = fingerprint(jobs_df, keys)
+    if near_duplicates:
+        group = pd.Series(near_duplicate_groups(jobs_df, use_description, keys))
+    else:
+        group = pd.Series(pd.factorize(job_id)[0])
+
+    # Few distinct boards: build a per-group bitmask of boards, then name each distinct mask once
+    source_codes, source_names = pd.factorize(_source_labels(jobs_df))
+    masks = 0
+    for i in range(len(source_names)):
+        seen = pd.Series(source_codes == i).groupby(group.to_numpy()).any()
+        masks = masks + seen.astype("int64") * (1 << i)
+    names = {
+        mask: ", ".join(sorted(name for i, name in enumerate(source_names) if mask >> i & 1))
+        for mask in masks.unique()
+    }
+    merged = masks.map(names)
+    counts = group.value_counts()
+
+    keep = ~group.duplicated()
+    result = jobs_df[keep.to_numpy()].copy()
+    kept_groups = group[keep]
+    result["job_id"] = job_id[keep].to_numpy()
+    result["merged_sources"] = merged.reindex(kept_groups).to_numpy()
+    result["duplicates_merged"] = counts.reindex(kept_groups).to_numpy() - 1
+    return result
@@ -0,0 +1,149 @@
+import base64
+import gzip
+import io
+import os
+from datetime import datetime
+from email.mime.base import MIMEBase
+
+import pandas as pd
+from dotenv import load_dotenv
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+load_dotenv()
+
+# -------------------------------------------------
+# Rendering Configuration
+# -------------------------------------------------
+EMAIL_TOP_JOBS = 10
+EMAIL_DESCRIPTION_CHARS = 300
+EMAIL_ATTACHMENT_FORMAT = os.getenv('EMAIL_ATTACHMENT_FORMAT', 'csv')  # csv, csv.gz or parquet
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Compiled once per process; Jinja caches the compiled template
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+JOB_ALERT_TEMPLATE = _env.get_template("email/job_alert.html")
+
+ATTACHMENT_LABELS = {"csv": "CSV", "csv.gz": "CSV", "parquet": "Parquet file"}
+ATTACHMENT_TYPES = {"text/csv": "csv", "application/gzip": "csv.gz", "application/vnd.apache.parquet": "parquet"}
+
+# -------------------------------------------------
+# HTML Body
+# -------------------------------------------------
+def _column(df, name, default):
+    if name not in df.columns:
+        return pd.Series([default] * len(df), index=df.index, dtype="object")
+    return df[name].where(df[name].notna(), default)
+
+
+def render_job_alert(job_role, location, jobs_df, attachment_format=EMAIL_ATTACHMENT_FORMAT):
+    """Render the alert email body from the top jobs, column by column.
+
+    ``attachment_format`` is the format actually attached (see
+    ``attachment_format``), or ``None`` when there is no attachment.
+    """
+    top = jobs_df.head(EMAIL_TOP_JOBS)
+
+    description = _column(top, "description", "No description available").astype(str)
+    truncated = description.str.slice(0, EMAIL_DESCRIPTION_CHARS)
+    description = truncated.where(description.str.len() <= EMAIL_DESCRIPTION_CHARS, truncated + "...")
+    salary = _column(top, "min_amount", "")
+
+    jobs = zip(
+        _column(top, "job_url", "#").tolist(),
+        _column(top, "title", "N/A").tolist(),
+        _column(top, "company", "N/A").tolist(),
+        _column(top, "location", "N/A").tolist(),
+        salary.tolist(),
+        description.tolist(),
+    )
+    return JOB_ALERT_TEMPLATE.render(
+        job_role=job_role,
+        location=location,
+        date=datetime.now().strftime("%B %d, %Y"),
+        total=len(jobs_df),
+        shown=len(top),
+        jobs=jobs,
+        attachment_label=ATTACHMENT_LABELS.get(attachment_format) if attachment_format else None,
+    )
+
+# -------------------------------------------------
+# Streaming Attachment
+# -------------------------------------------------
+class Base64Sink(io.RawIOBase):
+    """Write-only stream that base64-encodes into 76-column MIME lines as it goes.
+
+    Only the encoded text is kept, so the raw attachment bytes never exist
+    as one buffer.
+    """
+
+    LINE_BYTES = 57  # 57 raw bytes -> one 76-char base64 line
+    BLOCK_BYTES = LINE_BYTES * 4096  # encode ~230 KB at a time
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._lines = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._pending += data
+        if len(self._pending) < self.BLOCK_BYTES:
+            return len(data)
+        usable = len(self._pending) - len(self._pending) % self.LINE_BYTES
+        if usable:
+            self._lines.append(base64.encodebytes(bytes(self._pending[:usable])).decode("ascii"))
+            del self._pending[:usable]
+        return len(data)
+
+    def getvalue(self):
+        if self._pending:
+            self._lines.append(base64.encodebytes(bytes(self._pending)).decode("ascii"))
+            self._pending.clear()
+        return "".join(self._lines)
+
+
+def build_attachment(jobs_df, job_role, attachment_format=EMAIL_ATTACHMENT_FORMAT):
+    """Encode ``jobs_df`` straight into a base64 MIME part (CSV, gzipped CSV or Parquet)."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = f"jobs_{job_role.replace(' ', '_')}_{timestamp}"
+    sink = Base64Sink()
+
+    if attachment_format == "parquet":
+        try:
+            buffer = io.BytesIO()
+            jobs_df.to_parquet(buffer, index=False)
+        except ImportError:
+            print("Parquet attachments need pyarrow; falling back to CSV")
+            return build_attachment(jobs_df, job_role, "csv")
+        sink.write(buffer.getbuffer())
+        filename, mime = f"{stem}.parquet", ("application", "vnd.apache.parquet")
+    elif attachment_format == "csv.gz":
+        with gzip.GzipFile(filename=f"{stem}.csv", mode="wb", fileobj=sink) as gz:
+            with io.TextIOWrapper(gz, encoding="utf-8", newline="") as text:
+                jobs_df.to_csv(text, index=False)
+        filename, mime = f"{stem}.csv.gz", ("application", "gzip")
+    else:
+        text = io.TextIOWrapper(sink, encoding="utf-8", newline="")
+        jobs_df.to_csv(text, index=False)
+        text.flush()
+        text.detach()
+        filename, mime = f"{stem}.csv", ("text", "csv")
+
+    part = MIMEBase(*mime)
+    part.set_payload(sink.getvalue())
+    part["Content-Transfer-Encoding"] = "base64"
+    part.add_header("Content-Disposition", f"attachment; filename={filename}")
+    return part
+
+
+def attachment_format(part):
+    """Format ``build_attachment`` produced for ``part`` (it falls back from
+    Parquet to CSV without pyarrow); ``None`` for no attachment."""
+    return ATTACHMENT_TYPES.get(part.get_content_type()) if part is not None else None
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process per cache directory
+    fcntl = None
+
+load_dotenv()
+
+# -------------------------------------------------
+# Cache Configuration
+# -------------------------------------------------
+EMBED_CACHE_DIR = os.getenv('EMBED_CACHE_DIR', os.path.join('.cache', 'embeddings'))
+EMBED_CACHE_ROWS = int(os.getenv('EMBED_CACHE_ROWS', 100000))  # ~77 MB at 384-d float16
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def text_key(text, model=""):
+    """Content address of a chunk: SHA-1 of ``model`` and the whitespace-collapsed,
+    lowercased text, so vectors of different models never mix."""
+    normalized = _WHITESPACE.sub(" ", str(text)).strip().lower()
+    return hashlib.sha1(f"{model}\n{normalized}".encode("utf-8")).hexdigest()
+
+def _tag(key):
+    """Nonzero 64-bit tag of a key, stored next to its vector (0 marks an empty slot)."""
+    return int(key[:16], 16) or 1
+
+# -------------------------------------------------
+# Content-Addressed Embedding Cache
+# -------------------------------------------------
+class EmbeddingCache:
+    """Fixed-capacity float16 vector store addressed by ``text_key``.
+
+    Vectors sit in a memory-mapped ``capacity x dim`` slot file; ``index.json``
+    keeps the key -> slot map in LRU order. When full, the least recently
+    used slot is overwritten, but only after ``index.json`` no longer maps
+    its old key, so a crash never leaves a key pointing at another text's
+    vector.
+
+    Several processes may share a directory: new vectors are stored under an
+    exclusive ``flock`` on ``index.lock``, after re-reading ``index.json``,
+    and the index is written before the lock is released. Each slot also
+    carries the tag of the key it holds (``tags.u64``), so a hit on a slot
+    another process has since reused is treated as a miss.
+    """
+
+    def __init__(self, dim, directory=EMBED_CACHE_DIR, capacity=EMBED_CACHE_ROWS):
+        self.dim = dim
+        self.directory = directory
+        self.capacity = capacity
+        self.slots = OrderedDict()
+        self._free = []
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._index_stat = None  # (inode, mtime, size) of the index.json last read or written
+        self._open()
+
+    # -- storage --------------------------------------------------------
+    @property
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the directory across processes (and this cache's threads)."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, "index.lock"), "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _open(self):
+        if not self.directory:
+            self.vectors = np.zeros((self.capacity, self.dim), dtype="float16")
+            self.tags = np.zeros(self.capacity, dtype="uint64")
+            self._free = list(range(self.capacity - 1, -1, -1))
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        vectors_path = os.path.join(self.directory, "vectors.f16")
+        tags_path = os.path.join(self.directory, "tags.u64")
+        with self._file_lock():
+            meta = self._read_index()
+            compatible = (
+                meta.get("dim") == self.dim
+                and meta.get("capacity") == self.capacity
+                and os.path.exists(vectors_path)
+                and os.path.exists(tags_path)
+            )
+            mode = "r+" if compatible else "w+"
+            self.vectors = np.memmap(vectors_path, dtype="float16", mode=mode,
+                                     shape=(self.capacity, self.dim))
+            self.tags = np.memmap(tags_path, dtype="uint64", mode=mode, shape=(self.capacity,))
+            self._load_slots(meta if compatible else {})
+            if not compatible:
+                self._write_index()
+
+    def _read_index(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                stat = os.fstat(f.fileno())
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        self._index_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        return meta
+
+    def _load_slots(self, meta):
+        self.slots = OrderedDict(meta.get("slots", []))
+        # Slots not in the index (never used, or written after the last save) are free
+        used = set(self.slots.values())
+        self._free = [slot for slot in range(self.capacity - 1, -1, -1) if slot not in used]
+
+    def _sync(self):
+        """Adopt the index another process wrote since we last read or wrote
+        it, keeping our recency order for the keys both still map alike.
+        Call under ``_file_lock``."""
+        try:
+            stat = os.stat(self._index_path)
+        except OSError:
+            return
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._index_stat:
+            return
+        meta = self._read_index()
+        if meta.get("dim") != self.dim or meta.get("capacity") != self.capacity:
+            return
+        disk = OrderedDict(meta.get("slots", []))
+        ours = [(key, slot) for key, slot in self.slots.items() if disk.get(key) == slot]
+        for key, _ in ours:
+            del disk[key]
+        disk.update(ours)
+        self._load_slots({"slots": list(disk.items())})
+
+    def _write_index(self):
+        self.vectors.flush()
+        self.tags.flush()
+        tmp = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "slots": list(self.slots.items()),
+            }, f)
+        os.replace(tmp, self._index_path)
+        stat = os.stat(self._index_path)
+        self._index_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._dirty = False
+
+    def save(self):
+        with self._lock:
+            if not self.directory or not self._dirty:
+                return
+            with self._file_lock():
+                self._sync()
+                self._write_index()
+
+    def _allocate(self, n):
+        """``n`` slots: free ones first, then the least recently used. Evicted
+        keys are dropped from ``index.json`` before their slots are reused."""
+        slots = [self._free.pop() for _ in range(min(n, len(self._free)))]
+        evicted = 0
+        while len(slots) < n:
+            _, slot = self.slots.popitem(last=False)
+            slots.append(slot)
+            evicted += 1
+        if evicted and self.directory:
+            self._write_index()
+        return slots
+
+    def _store(self, new):
+        """Write ``[(key, vector)]`` into fresh slots. Call under ``_lock``."""
+        new = [(key, vec) for key, vec in new if key not in self.slots][-self.capacity:]
+        for (key, vec), slot in zip(new, self._allocate(len(new))):
+            self.tags[slot] = 0  # readers of the old key see a miss while the vector changes
+            self.vectors[slot] = vec
+            self.tags[slot] = _tag(key)
+            self.slots[key] = slot
+
+    # -- public API -----------------------------------------------------
+    def encode(self, texts, encode, model=""):
+        """Return float32 embeddings for ``texts``, calling ``encode`` only on misses.
+
+        Misses are de-duplicated and sent to ``encode`` in a single batch.
+        ``model`` identifies the encoder (see ``model_id`` in
+        ``embedding_service``); entries are only shared under the same one.
+        """
+        keys = [text_key(t, model) for t in texts]
+        out = np.empty((len(texts), self.dim), dtype="float32")
+
+        missing = OrderedDict()
+        with self._lock:
+            for i, key in enumerate(keys):
+                slot = self.slots.get(key)
+                if slot is not None:
+                    tag = _tag(key)
+                    if self.tags[slot] == tag:
+                        out[i] = self.vectors[slot]
+                    if self.tags[slot] != tag:  # reused by another process
+                        del self.slots[key]
+                        slot = None
+                if slot is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self.slots.move_to_end(key)
+            hits = len(keys) - sum(len(v) for v in missing.values())
+            self.hits += hits
+            self.misses += len(keys) - hits
+            if hits:
+                self._dirty = True  # recency changed; persisted by ``save``
+
+        if not missing:
+            return out
+
+        batch = [texts[positions[0]] for positions in missing.values()]
+        emb = np.asarray(encode(batch), dtype="float32")
+
+        new = []
+        for (key, positions), vec in zip(missing.items(), emb):
+            out[positions] = vec
+            new.append((key, vec))
+        if not self.directory:
+            with self._lock:
+                self._store(new)
+            return out
+        # Another thread or process may have stored some of them meanwhile
+        with self._file_lock():
+            self._sync()
+            self._store(new)
+            self._write_index()
+        return out
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.slots),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
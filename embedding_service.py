@@ -0,0 +1,401 @@
+"""Shared sentence-embedding service with dynamic batching.
+
+Concurrent callers (Streamlit sessions, Flask threads) hand their texts to one
+batching thread, which coalesces them into model-sized batches. The model runs
+either in-process or in a sidecar that every worker reaches over a Unix
+socket, so a host holds a single copy of it:
+
+    python embedding_service.py --socket /tmp/jobspy-embed.sock
+    EMBED_SOCKET=/tmp/jobspy-embed.sock streamlit run streamlit_app.py
+
+``EMBED_BACKEND=onnx`` swaps PyTorch for an int8-quantized ONNX Runtime export
+of the same model (needs ``onnxruntime`` and ``transformers``). Run
+``python embedding_service.py --prewarm`` at image build or container start to
+fetch (and export) the model before the first user arrives.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty, Queue
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -------------------------------------------------
+# Embedding Configuration
+# -------------------------------------------------
+EMBED_MODEL = os.getenv('EMBED_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+EMBED_BACKEND = os.getenv('EMBED_BACKEND', 'torch').lower()  # torch | onnx
+EMBED_QUANTIZE = os.getenv('EMBED_QUANTIZE', 'True').lower() == 'true'  # int8 weights for onnx
+EMBED_THREADS = int(os.getenv('EMBED_THREADS', 0))  # intra-op threads, 0 = library default
+EMBED_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', 64))
+EMBED_MAX_WAIT_MS = float(os.getenv('EMBED_MAX_WAIT_MS', 5))
+EMBED_MAX_LENGTH = 256  # all-MiniLM-L6-v2 truncates at 256 word pieces
+EMBED_ONNX_DIR = os.getenv('EMBED_ONNX_DIR', os.path.join('.cache', 'onnx'))
+EMBED_SOCKET = os.getenv('EMBED_SOCKET', '')
+
+_HEADER = struct.Struct(">iI")  # rows (-1 on error), dim or error length
+_LENGTH = struct.Struct(">I")
+
+# -------------------------------------------------
+# Model Backends
+# -------------------------------------------------
+class TorchBackend:
+    """``SentenceTransformer.encode`` with a fixed batch size and thread count."""
+
+    name = "torch"
+
+    def __init__(self, model_name=EMBED_MODEL, threads=EMBED_THREADS, batch_size=EMBED_BATCH_SIZE):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.model_id = f"{model_name}:{self.name}"
+        self.batch_size = batch_size
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return self.model.encode(list(texts), batch_size=self.batch_size, show_progress_bar=False,
+                                 convert_to_numpy=True).astype("float32", copy=False)
+
+
+def export_onnx(model_name=EMBED_MODEL, directory=EMBED_ONNX_DIR, quantize=EMBED_QUANTIZE):
+    """Export ``model_name`` to ONNX once (and int8-quantize it); returns the model path."""
+    stem = os.path.join(directory, model_name.replace("/", "__"))
+    fp32_path, int8_path = stem + ".onnx", stem + ".int8.onnx"
+    os.makedirs(directory, exist_ok=True)
+    if not os.path.exists(fp32_path):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name).eval()
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        names = ["input_ids", "attention_mask", "token_type_ids"]
+        tmp = fp32_path + ".tmp"
+        with torch.no_grad():
+            torch.onnx.export(model, tuple(sample[n] for n in names), tmp, input_names=names,
+                              output_names=["last_hidden_state"], opset_version=14,
+                              dynamic_axes={n: {0: "batch", 1: "tokens"}
+                                            for n in names + ["last_hidden_state"]})
+        os.replace(tmp, fp32_path)
+    if not quantize:
+        return fp32_path
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp = int8_path + ".tmp"
+        quantize_dynamic(fp32_path, tmp, weight_type=QuantType.QInt8)
+        os.replace(tmp, int8_path)
+    return int8_path
+
+
+class OnnxBackend:
+    """ONNX Runtime on CPU: mean pooling + L2 norm, as the sentence-transformers model does.
+
+    Texts are sorted by length before batching so each batch pads to similar
+    lengths; results come back in the caller's order.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name=EMBED_MODEL, threads=EMBED_THREADS, batch_size=EMBED_BATCH_SIZE,
+                 quantize=EMBED_QUANTIZE, directory=EMBED_ONNX_DIR):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        path = export_onnx(model_name, directory, quantize)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.inputs = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.batch_size = batch_size
+        self.dim = self.session.get_outputs()[0].shape[-1]
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.model_id = f"{model_name}:{self.name}"
+
+    def encode(self, texts):
+        texts = list(texts)
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        for start in range(0, len(texts), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            tokens = self.tokenizer([texts[i] for i in rows], padding=True, truncation=True,
+                                    max_length=EMBED_MAX_LENGTH, return_tensors="np")
+            feed = {name: tokens[name].astype("int64") for name in self.inputs}
+            hidden = self.session.run(None, feed)[0]
+            mask = tokens["attention_mask"][..., None].astype("float32")
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            out[rows] = pooled
+        return out
+
+
+def configured_model_id():
+    """``model_id`` of the backend the settings select, for encoders that
+    cannot report their own (the sidecar client)."""
+    backend = "onnx-int8" if EMBED_BACKEND == "onnx" and EMBED_QUANTIZE else EMBED_BACKEND
+    return f"{EMBED_MODEL}:{backend}"
+
+
+def load_backend(name=EMBED_BACKEND, **kwargs):
+    if name == "onnx":
+        try:
+            return OnnxBackend(**kwargs)
+        except ImportError:
+            print("ONNX embeddings need onnxruntime and transformers; falling back to torch")
+    kwargs.pop("quantize", None)
+    kwargs.pop("directory", None)
+    return TorchBackend(**kwargs)
+
+# -------------------------------------------------
+# Dynamic Batching
+# -------------------------------------------------
+class EmbeddingService:
+    """Coalesces concurrent ``encode`` calls into shared model batches.
+
+    The batching thread takes the first waiting request, then keeps collecting
+    for up to ``max_wait`` seconds or until ``batch_size`` texts are queued,
+    encodes them in one call and hands each caller its rows.
+    """
+
+    def __init__(self, backend=None, batch_size=EMBED_BATCH_SIZE, max_wait=EMBED_MAX_WAIT_MS / 1000):
+        self.backend = backend or load_backend()
+        self.dim = self.backend.dim
+        self.model_id = getattr(self.backend, "model_id", self.backend.name)
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.counters = {"requests": 0, "texts": 0, "batches": 0, "encode_seconds": 0.0}
+        self._lock = threading.Lock()
+        self._queue = Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        future = Future()
+        texts = [str(t) for t in texts]
+        if not texts:
+            future.set_result(np.zeros((0, self.dim), dtype="float32"))
+        else:
+            self._queue.put((texts, future))
+        return future
+
+    def encode(self, texts):
+        return self.submit(texts).result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return None
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # stop after this batch
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            texts = [t for request, _ in batch for t in request]
+            started = time.perf_counter()
+            try:
+                vectors = self.backend.encode(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._lock:
+                self.counters["requests"] += len(batch)
+                self.counters["texts"] += len(texts)
+                self.counters["batches"] += 1
+                self.counters["encode_seconds"] += time.perf_counter() - started
+            offset = 0
+            for request, future in batch:
+                future.set_result(vectors[offset:offset + len(request)])
+                offset += len(request)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["backend"] = self.backend.name
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def close(self, timeout=None):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+# -------------------------------------------------
+# Unix Socket Sidecar
+# -------------------------------------------------
+def _recv_exactly(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("embedding socket closed")
+        buf += chunk
+    return bytes(buf)
+
+
+class _EmbeddingHandler(socketserver.BaseRequestHandler):
+    """One connection, many requests: length-prefixed JSON texts in, float32 rows out."""
+
+    def handle(self):
+        while True:
+            try:
+                (length,) = _LENGTH.unpack(_recv_exactly(self.request, _LENGTH.size))
+                texts = json.loads(_recv_exactly(self.request, length))
+            except ConnectionError:
+                return
+            try:
+                vectors = self.server.service.encode(texts)
+            except Exception as e:
+                message = str(e).encode("utf-8")
+                self.request.sendall(_HEADER.pack(-1, len(message)) + message)
+                continue
+            self.request.sendall(_HEADER.pack(len(vectors), vectors.shape[1]) + vectors.tobytes())
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        if os.path.exists(path):
+            os.unlink(path)  # stale socket from a previous run
+        self.service = service
+        super().__init__(path, _EmbeddingHandler)
+
+
+class EmbeddingClient:
+    """``encode`` against an ``EmbeddingServer``; one connection per calling thread."""
+
+    def __init__(self, path=EMBED_SOCKET, timeout=60):
+        self.path = path
+        self.timeout = timeout
+        self.model_id = configured_model_id()  # the sidecar reads the same settings
+        self._local = threading.local()
+        self.dim = len(self.encode(["dimension probe"])[0])
+
+    def _connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            self._local.sock = sock
+        return sock
+
+    def encode(self, texts):
+        payload = json.dumps([str(t) for t in texts]).encode("utf-8")
+        for attempt in range(2):  # reconnect once if the sidecar restarted
+            sock = self._connection()
+            try:
+                sock.sendall(_LENGTH.pack(len(payload)) + payload)
+                rows, width = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+                body = _recv_exactly(sock, width if rows < 0 else rows * width * 4)
+                break
+            except OSError:
+                sock.close()
+                self._local.sock = None
+                if attempt:
+                    raise
+        if rows < 0:
+            raise RuntimeError(f"embedding service: {body.decode('utf-8', 'replace')}")
+        return np.frombuffer(body, dtype="float32").reshape(rows, width).copy()
+
+    def stats(self):
+        return {"backend": "socket", "socket": self.path}
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_embedding_service():
+    """Process-wide encoder: the sidecar when ``EMBED_SOCKET`` is up, else an in-process service."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            if EMBED_SOCKET and os.path.exists(EMBED_SOCKET):
+                try:
+                    _service = EmbeddingClient(EMBED_SOCKET)
+                except OSError as e:
+                    print(f"Embedding sidecar unreachable ({e}); loading the model in-process")
+            if _service is None:
+                _service = EmbeddingService()
+        return _service
+
+
+def prewarm(background=True):
+    """Load the encoder and run one batch now instead of on the first search.
+
+    Returns the warm-up thread (``None`` when ``background`` is false).
+    """
+    def warm():
+        try:
+            get_embedding_service().encode(["warm-up"])
+        except Exception as e:
+            print(f"Embedding warm-up failed: {e}")
+
+    if not background:
+        warm()
+        return None
+    thread = threading.Thread(target=warm, name="embedding-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", default=EMBED_SOCKET or "/tmp/jobspy-embed.sock")
+    parser.add_argument("--backend", default=EMBED_BACKEND, choices=["torch", "onnx"])
+    parser.add_argument("--threads", type=int, default=EMBED_THREADS)
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--prewarm", action="store_true",
+                        help="download (and export) the model, encode once and exit")
+    args = parser.parse_args()
+
+    if args.prewarm:  # container start / image build hook
+        started = time.perf_counter()
+        backend = load_backend(args.backend, threads=args.threads, batch_size=args.batch_size)
+        backend.encode(["warm-up"])
+        print(f"Embedding model ready ({backend.name}) in {time.perf_counter() - started:.1f}s")
+        return
+
+    backend = load_backend(args.backend, threads=args.threads, batch_size=args.batch_size)
+    service = EmbeddingService(backend, batch_size=args.batch_size)
+    with EmbeddingServer(args.socket, service) as server:
+        print(f"Embedding service ({backend.name}, dim {backend.dim}) listening on {args.socket}")
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Per-source rate limits, circuit breakers and adaptive timeouts.
+
+Every outbound call to a job source (a jobspy board or an ATS host) goes
+through that source's ``SourceGovernor``:
+
+    jobs = get_governor("linkedin").call(scrape_jobs, **params)
+
+A source that keeps failing is skipped outright (``SourceUnavailable``) until
+its cooldown ends, then a single probe call decides whether it is back.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+import numpy as np
+from dotenv import load_dotenv
+
+from metrics import registry
+from rate_limit import TokenBucket
+
+load_dotenv()
+
+# -------------------------------------------------
+# Governor Configuration
+# -------------------------------------------------
+GOVERNOR_ENABLED = os.getenv('GOVERNOR_ENABLED', 'True').lower() == 'true'
+
+# Calls per minute, bursting to the same number; "source=rate,..." overrides
+SOURCE_RATE_PER_MINUTE = int(os.getenv('SOURCE_RATE_PER_MINUTE', 60))
+SOURCE_RATE_LIMITS = {"linkedin": 10, "indeed": 30, "glassdoor": 20, "zip_recruiter": 20,
+                      "lever": 600, "greenhouse": 600}
+for _item in filter(None, os.getenv('SOURCE_RATE_LIMITS', '').split(',')):
+    _name, _, _rate = _item.partition('=')
+    SOURCE_RATE_LIMITS[_name.strip()] = int(_rate)
+
+BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', 20))  # recent calls considered
+BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', 5))  # before the error rate counts
+BREAKER_ERROR_RATE = float(os.getenv('BREAKER_ERROR_RATE', 0.5))  # opens at or above this
+BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', 60))  # seconds before a probe, doubled per failed probe
+BREAKER_MAX_COOLDOWN = float(os.getenv('BREAKER_MAX_COOLDOWN', 900))
+
+TIMEOUT_PERCENTILE = float(os.getenv('TIMEOUT_PERCENTILE', 95))
+TIMEOUT_MULTIPLIER = float(os.getenv('TIMEOUT_MULTIPLIER', 2.0))  # headroom over the percentile
+TIMEOUT_MIN = float(os.getenv('TIMEOUT_MIN', 2.0))  # never below this many seconds
+LATENCY_WINDOW = 50  # successful calls kept per source
+LATENCY_MIN_SAMPLES = 10  # until then the configured maximum is used
+
+
+class SourceUnavailable(Exception):
+    """Raised instead of calling a source whose circuit is open."""
+
+
+class SourceRateLimited(Exception):
+    """Raised when a source's rate limit would delay the call past its timeout."""
+
+# -------------------------------------------------
+# Circuit Breaker
+# -------------------------------------------------
+class CircuitBreaker:
+    """Opens when the error rate over the last ``window`` calls reaches
+    ``error_rate``; after ``cooldown`` seconds one probe call is let through
+    (half-open). A successful probe closes the circuit, a failed one reopens
+    it for twice as long, up to ``max_cooldown``.
+
+    ``allow`` hands out a ticket that goes back to ``record`` with the
+    outcome. Only the probe's ticket can change an open circuit; outcomes of
+    calls admitted before it opened (slow stragglers) are dropped.
+    """
+
+    PROBE = "probe"
+
+    def __init__(self, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS, error_rate=BREAKER_ERROR_RATE,
+                 cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN, clock=time.monotonic):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self.state = "closed"
+        self.cooldown = cooldown
+        self.opened_at = None
+        self._results = deque(maxlen=window)
+        self._probing = False
+        self._epoch = 0  # bumped whenever the circuit opens
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """A ticket if a call may go out now, else None; in half-open state
+        only one call (the probe) at a time."""
+        with self._lock:
+            if self.state == "closed":
+                return self._epoch
+            if self.state == "open" and self.clock() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return self.PROBE
+            return None
+
+    def release(self, ticket):
+        """Give back a ticket without a verdict (the call never went out)."""
+        with self._lock:
+            if ticket == self.PROBE:
+                self._probing = False
+
+    def record(self, ticket, ok):
+        with self._lock:
+            if ticket == self.PROBE:
+                self._probing = False
+                if ok:
+                    self.state = "closed"
+                    self.cooldown = self.base_cooldown
+                    self._results.clear()
+                else:
+                    self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                    self._open()
+                return
+            if self.state != "closed" or ticket != self._epoch:
+                return
+            self._results.append(ok)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.error_rate:
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = self.clock()
+        self._epoch += 1
+
+    def error_rate_now(self):
+        with self._lock:
+            return self._results.count(False) / len(self._results) if self._results else 0.0
+
+# -------------------------------------------------
+# Source Governor
+# -------------------------------------------------
+class SourceGovernor:
+    """Token bucket + circuit breaker + adaptive timeout for one source.
+
+    The timeout is ``multiplier`` times the ``percentile`` of recent successful
+    latencies, clamped to ``[min_timeout, max_timeout]``. Only exceptions for
+    which ``is_fault`` returns true count against the breaker (by default all
+    of them), so e.g. a 404 for one company does not trip its whole board.
+    """
+
+    def __init__(self, name, rate_per_minute=None, max_timeout=30.0, min_timeout=TIMEOUT_MIN,
+                 percentile=TIMEOUT_PERCENTILE, multiplier=TIMEOUT_MULTIPLIER,
+                 breaker=None, is_fault=None):
+        self.name = name
+        rate = rate_per_minute or SOURCE_RATE_LIMITS.get(name, SOURCE_RATE_PER_MINUTE)
+        self.bucket = TokenBucket(rate, 60)
+        self.max_timeout = max_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.breaker = breaker or CircuitBreaker()
+        self.is_fault = is_fault or (lambda e: True)
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "failures": 0, "timeouts": 0, "rejected_open": 0,
+                         "rejected_rate": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def timeout(self):
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return self.max_timeout
+        adaptive = float(np.percentile(samples, self.percentile)) * self.multiplier
+        return min(max(adaptive, self.min_timeout), self.max_timeout)
+
+    @contextmanager
+    def admit(self):
+        """Admit one call; yields its timeout and records how it went.
+
+        Raises ``SourceUnavailable`` while the circuit is open and
+        ``SourceRateLimited`` when the next token is further away than the
+        timeout. Exceptions raised in the block propagate.
+        """
+        ticket = self.breaker.allow()
+        if ticket is None:
+            self._count("rejected_open")
+            registry.inc("jobspy_source_rejected_total", source=self.name, reason="open")
+            raise SourceUnavailable(f"{self.name} is failing; skipped until its circuit closes")
+        timeout = self.timeout()
+        wait = self.bucket.take(timeout)
+        if wait is None:
+            self.breaker.release(ticket)
+            self._count("rejected_rate")
+            registry.inc("jobspy_source_rejected_total", source=self.name, reason="rate")
+            raise SourceRateLimited(f"{self.name} rate limit reached")
+        if wait:
+            time.sleep(wait)
+            timeout = max(timeout - wait, self.min_timeout)
+
+        self._count("calls")
+        started = time.monotonic()
+        try:
+            yield timeout
+        except Exception as e:
+            fault = self.is_fault(e)
+            if fault:
+                self._count("timeouts" if isinstance(e, TimeoutError) else "failures")
+            self.breaker.record(ticket, not fault)
+            raise
+        else:
+            self.observe(time.monotonic() - started)
+            self.breaker.record(ticket, True)
+
+    def observe(self, seconds):
+        """Add a successful call's latency to the timeout percentile."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def call(self, fn, *args, **kwargs):
+        """``fn(*args, **kwargs)`` under ``admit``, abandoned after the adaptive timeout.
+
+        For callables without a timeout of their own (``scrape_jobs``): the
+        call runs on a daemon thread and a ``TimeoutError`` is raised when it
+        overruns; the thread finishes in the background. If it then succeeds,
+        its latency still counts, so a source with a genuinely slow tail is
+        not cut off at a timeout learned only from its fast calls.
+        """
+        with self.admit() as timeout:
+            future = Future()
+            abandoned = threading.Event()
+            started = time.monotonic()
+
+            def run():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+                    if abandoned.is_set():
+                        self.observe(time.monotonic() - started)
+
+            threading.Thread(target=run, name=f"governed-{self.name}", daemon=True).start()
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeout:
+                abandoned.set()
+                raise TimeoutError(f"{self.name} timed out after {timeout:.1f}s") from None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["open"] = int(self.breaker.state != "closed")
+        stats["error_rate"] = round(self.breaker.error_rate_now(), 4)
+        stats["timeout"] = round(self.timeout(), 3)
+        return stats
+
+# -------------------------------------------------
+# Process-Wide Governors
+# -------------------------------------------------
+_governors = {}
+_governors_lock = threading.Lock()
+
+def get_governor(source, **options):
+    """The governor of ``source``, created with ``options`` on first use."""
+    with _governors_lock:
+        governor = _governors.get(source)
+        if governor is None:
+            governor = _governors[source] = SourceGovernor(source, **options)
+            registry.register_stats(f"jobspy_source_{source}", governor.stats, f"Governor of {source}")
+        return governor
+
+
+def governed(source, fn, **options):
+    """``fn`` called through the governor of ``source`` (unchanged when disabled)."""
+    if not GOVERNOR_ENABLED:
+        return fn
+
+    def wrapper(*args, **kwargs):
+        return get_governor(source, **options).call(fn, *args, **kwargs)
+    return wrapper
+
+
+def governor_stats():
+    with _governors_lock:
+        governors = dict(_governors)
+    return {source: governor.stats() for source, governor in governors.items()}
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -------------------------------------------------
+# Cache Configuration
+# -------------------------------------------------
+ATS_CACHE_DIR = os.getenv('ATS_CACHE_DIR', os.path.join('.cache', 'ats'))
+ATS_CACHE_TTL = int(os.getenv('ATS_CACHE_TTL', 3600))  # seconds
+ATS_CACHE_MEMORY_BYTES = int(os.getenv('ATS_CACHE_MEMORY_BYTES', 64 * 1024 * 1024))
+ATS_CACHE_DISK_BYTES = int(os.getenv('ATS_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+
+
+def parse_ttls(spec):
+    """Parse ``"openai=900,figma=7200"`` into a per-company TTL mapping."""
+    ttls = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            company, seconds = item.split("=", 1)
+            ttls[company.strip().lower()] = int(seconds)
+    return ttls
+
+ATS_CACHE_TTLS = parse_ttls(os.getenv('ATS_CACHE_TTLS', ''))
+
+# -------------------------------------------------
+# Response Cache
+# -------------------------------------------------
+class ResponseCache:
+    """Two-tier (memory LRU + disk) cache for parsed ATS board responses.
+
+    Entries are dicts with ``jobs``, ``etag``, ``last_modified``,
+    ``fetched_at`` and ``size``. An entry older than its company's TTL is
+    stale but kept, so its validators can be replayed as a conditional GET.
+    """
+
+    def __init__(self, directory=ATS_CACHE_DIR, ttl=ATS_CACHE_TTL, ttls=None,
+                 memory_bytes=ATS_CACHE_MEMORY_BYTES, disk_bytes=ATS_CACHE_DISK_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.ttls = ATS_CACHE_TTLS if ttls is None else ttls
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # -- helpers --------------------------------------------------------
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def ttl_for(self, company):
+        return self.ttls.get(company.lower(), self.ttl)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= old["size"]
+            self._memory[key] = entry
+            self._memory_size += entry["size"]
+            while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= evicted["size"]
+                self.counters["evicted"] += 1
+
+    def _write_disk(self, key, entry):
+        if not self.directory:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+            self._trim_disk()
+        except OSError:
+            pass
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                st = os.stat(os.path.join(self.directory, name))
+                files.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+            except OSError:
+                pass
+
+    # -- public API -----------------------------------------------------
+    def get(self, key):
+        """Return the cached entry (fresh or stale) or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def is_fresh(self, entry, company):
+        return time.time() - entry["fetched_at"] < self.ttl_for(company)
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, key, jobs, etag=None, last_modified=None, size=None):
+        entry = {
+            "jobs": jobs,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "size": size if size is not None else len(json.dumps(jobs)),
+        }
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        self._count("stored")
+        return entry
+
+    def touch(self, key, entry):
+        """Mark a stale entry fresh again after a 304 Not Modified."""
+        entry = dict(entry, fetched_at=time.time())
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        self._count("revalidated")
+        return entry
+
+    def record_hit(self):
+        self._count("hits")
+
+    def record_miss(self):
+        self._count("misses")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_size
+        lookups = stats["hits"] + stats["misses"] + stats["revalidated"]
+        stats["hit_rate"] = round((stats["hits"] + stats["revalidated"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,306 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import faiss
+import numpy as np
+from dotenv import load_dotenv
+
+from text_utils import iter_chunks
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process per index directory
+    fcntl = None
+
+load_dotenv()
+
+# -------------------------------------------------
+# Index Configuration
+# -------------------------------------------------
+EMBED_DIM = 384
+JOB_INDEX_DIR = os.getenv('JOB_INDEX_DIR', os.path.join('.cache', 'job_index'))
+JOB_INDEX_TTL = int(os.getenv('JOB_INDEX_TTL', 14 * 24 * 3600))  # seconds since last seen
+JOB_INDEX_COMPACT_RATIO = 0.5  # rewrite vectors once half the rows are dead
+
+LEXICAL_WEIGHT = float(os.getenv('LEXICAL_WEIGHT', 0.2))     # share of BM25 in hybrid scores
+
+# -------------------------------------------------
+# Persistent Job Embedding Index
+# -------------------------------------------------
+class JobIndex:
+    """Chunk embeddings for every job seen so far, keyed by ``job_fingerprint``.
+
+    Vectors live in an append-only float32 file that is memory-mapped on load;
+    ``jobs.json`` maps each fingerprint to its ``[start, count, last_seen]``
+    row range. Only jobs the index has not seen are chunked and encoded.
+
+    Several processes may share a directory: appends, saves and compactions
+    take an exclusive ``flock`` on ``index.lock`` and merge the job table on
+    disk first. A compaction bumps the table's ``generation``; other
+    processes keep reading the old vector file they mapped until their next
+    write, when they pick up the new row numbers.
+
+    ``score`` ranks a given set of jobs exactly, touching only their rows.
+    """
+
+    def __init__(self, directory=JOB_INDEX_DIR, dim=EMBED_DIM, ttl=JOB_INDEX_TTL):
+        self.directory = directory
+        self.dim = dim
+        self.ttl = ttl
+        self.jobs = {}
+        self.generation = 0
+        self.vectors = np.empty((0, dim), dtype="float32")
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._removed = {}  # fingerprint -> last_seen of jobs expired since the last save
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.load()
+
+    # -- storage --------------------------------------------------------
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.directory, "vectors.f32")
+
+    @property
+    def _jobs_path(self):
+        return os.path.join(self.directory, "jobs.json")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the directory across processes (and this index's threads)."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, "index.lock"), "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _map_vectors(self):
+        if self.directory and os.path.exists(self._vectors_path) and os.path.getsize(self._vectors_path):
+            rows = os.path.getsize(self._vectors_path) // (4 * self.dim)
+            self.vectors = np.memmap(self._vectors_path, dtype="float32", mode="r", shape=(rows, self.dim))
+        else:
+            self.vectors = np.empty((0, self.dim), dtype="float32")
+
+    def _read_jobs(self):
+        """``(generation, jobs)`` from disk; the old format is a bare job table."""
+        try:
+            with open(self._jobs_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0, {}
+        if "generation" in data and isinstance(data.get("jobs"), dict):
+            return data["generation"], data["jobs"]
+        return 0, data
+
+    def _write_jobs(self):
+        tmp = f"{self._jobs_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"generation": self.generation, "jobs": self.jobs}, f)
+        os.replace(tmp, self._jobs_path)
+        self._dirty = False
+        self._removed = {}
+
+    def load(self):
+        with self._file_lock():
+            self.generation, jobs = self._read_jobs()
+            self._map_vectors()
+            # Drop entries whose rows never made it to disk.
+            total = len(self.vectors)
+            self.jobs = {fp: v for fp, v in jobs.items() if v[0] + v[1] <= total}
+
+    def _sync(self):
+        """Merge the job table on disk into this one; call under ``_file_lock``.
+
+        Jobs other processes added are taken as they are, ``last_seen`` is
+        the latest either side saw and jobs expired here stay expired unless
+        seen again since. After a compaction elsewhere only the disk table's
+        row numbers are valid, so jobs this process knew but the disk table
+        dropped are forgotten.
+        """
+        generation, disk = self._read_jobs()
+        merged = dict(disk)
+        if generation == self.generation:
+            for fp, entry in self.jobs.items():
+                merged.setdefault(fp, entry)
+        for fp, entry in self.jobs.items():
+            if fp in merged:
+                merged[fp] = [merged[fp][0], merged[fp][1], max(merged[fp][2], entry[2])]
+        for fp, seen in self._removed.items():
+            if fp in merged and merged[fp][2] <= seen:
+                del merged[fp]
+        if generation != self.generation or merged.keys() != self.jobs.keys():
+            self._dirty = True
+        self.generation = generation
+        self._map_vectors()
+        total = len(self.vectors)
+        self.jobs = {fp: v for fp, v in merged.items() if v[0] + v[1] <= total}
+
+    def save(self):
+        """Persist the job table; vectors are already on disk."""
+        with self._lock:
+            if not self.directory or not self._dirty:
+                return
+            with self._file_lock():
+                self._sync()
+                self._write_jobs()
+
+    def _append(self, emb):
+        """Append rows and return the first row number; call under ``_file_lock``."""
+        if not self.directory:
+            start = len(self.vectors)
+            self.vectors = np.vstack([self.vectors, emb])
+            return start
+        row_bytes = 4 * self.dim
+        with open(self._vectors_path, "ab") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size % row_bytes:  # torn write from a crashed process
+                f.truncate(size - size % row_bytes)
+            start = size // row_bytes
+            f.write(np.ascontiguousarray(emb, dtype="float32").tobytes())
+        self._map_vectors()
+        return start
+
+    # -- maintenance ----------------------------------------------------
+    def add_jobs(self, descriptions, encode):
+        """Embed chunks for unseen fingerprints and refresh ``last_seen``.
+
+        ``descriptions`` maps fingerprint -> description text and ``encode``
+        turns a list of chunks into a 2-D float array. Returns the number of
+        newly indexed jobs.
+        """
+        now = time.time()
+        with self._lock:
+            unseen, counts = [], {}
+            for fp, description in descriptions.items():
+                if fp in self.jobs:
+                    self.jobs[fp][2] = now
+                    continue
+                unseen.append((fp, description))
+                counts[fp] = 0
+            chunks = []
+            for fp, chunk in iter_chunks(unseen):
+                chunks.append(chunk)
+                counts[fp] += 1
+            if counts:
+                self._dirty = True
+            if not chunks:
+                for fp in counts:
+                    self.jobs[fp] = [0, 0, now]
+                return len(counts)
+
+            emb = np.asarray(encode(chunks), dtype="float32")
+            faiss.normalize_L2(emb)
+            if not self.directory:
+                start = self._append(emb)
+                for fp, count in counts.items():
+                    self.jobs[fp] = [start if count else 0, count, now]
+                    start += count
+                return len(counts)
+
+            with self._file_lock():
+                self._sync()
+                # Skip jobs another process indexed while these were encoded
+                keep, row = [], 0
+                for fp, count in counts.items():
+                    if fp not in self.jobs:
+                        keep.extend(range(row, row + count))
+                    row += count
+                counts = {fp: count for fp, count in counts.items() if fp not in self.jobs}
+                start = self._append(emb[keep]) if keep else 0
+                for fp, count in counts.items():
+                    self.jobs[fp] = [start if count else 0, count, now]
+                    start += count
+                self._write_jobs()
+            return len(counts)
+
+    def expire(self, max_age=None):
+        """Forget jobs not seen within ``max_age`` seconds; compacts when needed."""
+        max_age = self.ttl if max_age is None else max_age
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [fp for fp, (_, _, seen) in self.jobs.items() if seen < cutoff]
+            for fp in stale:
+                self._removed[fp] = self.jobs.pop(fp)[2]
+            if stale:
+                self._dirty = True
+                live = sum(count for _, count, _ in self.jobs.values())
+                if len(self.vectors) and live < len(self.vectors) * (1 - JOB_INDEX_COMPACT_RATIO):
+                    self.compact()
+            return len(stale)
+
+    def compact(self):
+        """Rewrite the vector file keeping only rows that belong to live jobs."""
+        with self._lock:
+            if not self.directory:
+                self.vectors, self.jobs = self._compacted(self.vectors, self.jobs)
+                return
+            with self._file_lock():
+                self._sync()
+                kept, self.jobs = self._compacted(self.vectors, self.jobs)
+                tmp = f"{self._vectors_path}.{os.getpid()}.tmp"
+                kept.tofile(tmp)
+                os.replace(tmp, self._vectors_path)
+                self.generation += 1
+                self._map_vectors()
+                self._write_jobs()
+
+    @staticmethod
+    def _compacted(vectors, jobs):
+        order = sorted(jobs.items(), key=lambda kv: kv[1][0])
+        rows = [np.arange(s, s + c) for _, (s, c, _) in order if c]
+        keep = np.concatenate(rows) if rows else np.empty(0, dtype="int64")
+        compacted, start = {}, 0
+        for fp, (s, c, seen) in order:
+            compacted[fp] = [start if c else 0, c, seen]
+            start += c
+        return np.array(vectors[keep], dtype="float32"), compacted
+
+    # -- search ---------------------------------------------------------
+    def rows_for(self, fingerprints):
+        """Vector rows of ``fingerprints`` plus the jobs that own them and the
+        offset of each job's first row, for ``np.maximum.reduceat``."""
+        with self._lock:
+            rows, owners, offsets, total = [], [], [], 0
+            for fp in dict.fromkeys(fingerprints):
+                entry = self.jobs.get(fp)
+                if entry and entry[1]:
+                    rows.append(np.arange(entry[0], entry[0] + entry[1]))
+                    owners.append(fp)
+                    offsets.append(total)
+                    total += entry[1]
+            if not rows:
+                return np.empty(0, dtype="int64"), owners, offsets
+            return np.concatenate(rows), owners, offsets
+
+    def score(self, query_emb, fingerprints):
+        """Exact best-chunk cosine similarity for every job in ``fingerprints``
+        that has chunks; one matrix-vector product over their rows."""
+        with self._lock:
+            rows, owners, offsets = self.rows_for(fingerprints)
+            if not len(rows):
+                return {}
+            emb = np.array(self.vectors[rows], dtype="float32")
+        sims = emb @ np.asarray(query_emb, dtype="float32").reshape(-1)
+        return dict(zip(owners, np.maximum.reduceat(sims, offsets).tolist()))
+
+    def __len__(self):
+        return len(self.jobs)
+
+
+def hybrid_scores(semantic, lexical, weight=LEXICAL_WEIGHT):
+    """Blend cosine similarities with BM25 scores scaled to [0, 1] by the best
+    one; jobs missing from either side count as 0 there."""
+    top = max(lexical.values(), default=0) or 1.0
+    return {
+        fp: (1 - weight) * semantic.get(fp, 0.0) + weight * lexical.get(fp, 0.0) / top
+        for fp in set(semantic) | set(lexical)
+    }
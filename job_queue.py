@@ -0,0 +1,245 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, nullcontext
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -------------------------------------------------
+# Queue Configuration
+# -------------------------------------------------
+JOB_QUEUE_DB = os.getenv('JOB_QUEUE_DB', os.path.join('.cache', 'jobs.sqlite3'))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_QUEUE_DEPTH = int(os.getenv('JOB_QUEUE_DEPTH', 50))
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 600))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', 7 * 24 * 3600))  # finished jobs kept this long
+JOB_POLL_SECONDS = 1.0
+JOB_PRUNE_SECONDS = 3600  # how often an idle worker deletes expired results
+
+
+class QueueFull(Exception):
+    """Raised by ``JobQueue.submit`` when the queue is at its configured depth."""
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_expires REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+# -------------------------------------------------
+# SQLite-Backed Job Queue
+# -------------------------------------------------
+class JobQueue:
+    """Durable work queue drained by a fixed pool of worker threads.
+
+    Jobs are rows in a local SQLite database, so several gunicorn workers can
+    share one queue and anything queued or running survives a restart: a
+    running job whose lease expires is picked up again, up to
+    ``max_attempts`` times. While a handler runs, its lease is renewed every
+    third of ``lease_seconds``, so only jobs of a dead worker expire.
+    Finished jobs are deleted ``retention`` seconds after they finish.
+    """
+
+    def __init__(self, handler, db_path=JOB_QUEUE_DB, workers=JOB_WORKERS,
+                 max_depth=JOB_QUEUE_DEPTH, lease_seconds=JOB_LEASE_SECONDS,
+                 max_attempts=JOB_MAX_ATTEMPTS, retention=JOB_RETENTION_SECONDS):
+        self.handler = handler
+        self.db_path = db_path
+        self.workers = workers
+        self.max_depth = max_depth
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self._next_prune = 0.0
+        self._wake = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    # -- producer side --------------------------------------------------
+    def depth(self):
+        """Jobs waiting for a worker (running ones are not counted)."""
+        with closing(self._connect()) as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def submit(self, payload):
+        """Enqueue ``payload`` (JSON-serializable) and return its job id."""
+        job_id = uuid.uuid4().hex
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            queued = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_depth:
+                db.execute("ROLLBACK")
+                raise QueueFull(f"Job queue is full ({queued} waiting)")
+            db.execute(
+                "INSERT INTO jobs (id, status, payload, created_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(payload), time.time())
+            )
+            db.execute("COMMIT")
+        finally:
+            db.close()
+        with self._wake:
+            self._wake.notify()
+        return job_id
+
+    def get(self, job_id):
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job.pop("payload")
+        job.pop("lease_expires")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        if job["status"] == "queued":
+            with closing(self._connect()) as db:
+                job["position"] = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at <= ?",
+                    (job["created_at"],)
+                ).fetchone()[0]
+        return job
+
+    # -- consumer side --------------------------------------------------
+    def _claim(self, db):
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                """SELECT id, payload, attempts FROM jobs
+                   WHERE status = 'queued'
+                      OR (status = 'running' AND lease_expires < ?)
+                   ORDER BY created_at LIMIT 1""",
+                (now,)
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            if row["attempts"] >= self.max_attempts:
+                db.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, result = ? WHERE id = ?",
+                    (now, json.dumps({"status": "error", "message": "Job abandoned after repeated restarts"}), row["id"])
+                )
+                db.execute("COMMIT")
+                return self._claim(db)
+            db.execute(
+                """UPDATE jobs SET status = 'running', attempts = attempts + 1,
+                   started_at = ?, lease_expires = ? WHERE id = ?""",
+                (now, now + self.lease_seconds, row["id"])
+            )
+            db.execute("COMMIT")
+            return row["id"], json.loads(row["payload"])
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _finish(self, db, job_id, status, result):
+        db.execute(
+            "UPDATE jobs SET status = ?, result = ?, finished_at = ?, lease_expires = NULL WHERE id = ?",
+            (status, json.dumps(result, default=str), time.time(), job_id)
+        )
+
+    def prune(self, db=None):
+        """Delete jobs that finished more than ``retention`` seconds ago."""
+        cutoff = time.time() - self.retention
+        with closing(self._connect()) if db is None else nullcontext(db) as db:
+            return db.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,)
+            ).rowcount
+
+    def _heartbeat(self, job_id, done):
+        """Extend the lease of ``job_id`` until ``done`` is set."""
+        interval = self.lease_seconds / 3
+        with closing(self._connect()) as db:
+            while not done.wait(interval):
+                try:
+                    db.execute(
+                        "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'running'",
+                        (time.time() + self.lease_seconds, job_id)
+                    )
+                except sqlite3.Error as e:
+                    print(f"Job queue lease renewal failed for {job_id}: {e}")
+
+    def _work(self):
+        db = self._connect()
+        while not self._stop.is_set():
+            try:
+                claimed = self._claim(db)
+            except sqlite3.Error as e:
+                print(f"Job queue claim failed: {e}")
+                claimed = None
+            if claimed is None:
+                if time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + JOB_PRUNE_SECONDS
+                    try:
+                        self.prune(db)
+                    except sqlite3.Error as e:
+                        print(f"Job queue prune failed: {e}")
+                with self._wake:
+                    self._wake.wait(JOB_POLL_SECONDS)
+                continue
+            job_id, payload = claimed
+            done = threading.Event()
+            threading.Thread(target=self._heartbeat, args=(job_id, done),
+                             name=f"job-lease-{job_id[:8]}", daemon=True).start()
+            try:
+                result = self.handler(payload)
+                status = "failed" if isinstance(result, dict) and result.get("status") == "error" else "done"
+            except Exception as e:
+                result, status = {"status": "error", "message": f"Error: {str(e)}"}, "failed"
+            finally:
+                done.set()
+            try:
+                self._finish(db, job_id, status, result)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"Job queue could not record the result of {job_id}: {e}")
+                try:
+                    self._finish(db, job_id, "failed",
+                                 {"status": "error", "message": f"Result could not be saved: {e}"})
+                except sqlite3.Error as e:
+                    print(f"Job queue could not record the failure of {job_id}: {e}")
+        db.close()
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
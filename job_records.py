@@ -0,0 +1,168 @@
+import html
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Record Schema
+# -------------------------------------------------
+# Typed columns; anything else a scraper returns is carried as an object column
+DATE_FIELDS = ("date_posted",)
+NUMERIC_FIELDS = ("min_amount", "max_amount", "match_score", "text_score")
+
+CARD_TEMPLATE = """<div style="background:black;padding:1.5rem;
+border-radius:12px;margin-bottom:1rem;
+box-shadow:0 4px 12px rgba(0,0,0,0.08)">
+    <a href="{url}" target="_blank"
+       style="font-size:1.1rem;font-weight:700;color:#4DA6FF">
+        {title}
+    </a>
+    <div style="color:white">
+        {company} &mdash; {location}
+    </div>
+    <div style="color:white;font-weight:600">
+        Match Score: {score}%
+    </div>
+    <div style="color:#AAAAAA;font-size:0.85rem">
+        Seen on: {sources}
+    </div>
+</div>"""
+CARD_FIELDS = (("job_url", "#"), ("title", "N/A"), ("company", "N/A"), ("location", "N/A"),
+               ("match_score", 0.0), ("merged_sources", "N/A"))
+
+
+def _typed(name, values):
+    if name in DATE_FIELDS:
+        return pd.to_datetime(values, errors="coerce", utc=True).dt.tz_localize(None).to_numpy()
+    if name in NUMERIC_FIELDS:
+        return pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+    return values.to_numpy(dtype="object")
+
+
+def _nulls(values):
+    if values.dtype.kind == "M":
+        return np.isnat(values)
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    return pd.isna(values)
+
+# -------------------------------------------------
+# Columnar Job Table
+# -------------------------------------------------
+class JobTable:
+    """Search results as one NumPy array per column.
+
+    Sorting, filtering and top-k reorder a single index array and take every
+    column with it; nothing is materialized per row until ``to_records`` or
+    ``render_cards`` builds the output in one pass.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._size = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        """Typed arrays for ``columns`` (all of them by default) of ``df``; missing names are skipped."""
+        names = df.columns if columns is None else [c for c in dict.fromkeys(columns) if c in df.columns]
+        return cls({name: _typed(name, df[name]) for name in names})
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def column(self, name, default=None):
+        """Column ``name`` with nulls (or the whole column, when missing) set to ``default``."""
+        values = self.columns.get(name)
+        if values is None:
+            return np.full(self._size, default, dtype="object")
+        if default is None:
+            return values
+        out = values.astype("object")
+        out[_nulls(values)] = default
+        return out
+
+    # -- vectorized ops -------------------------------------------------
+    def take(self, indices):
+        return JobTable({name: values[indices] for name, values in self.columns.items()})
+
+    def head(self, n):
+        return self.take(slice(0, n))
+
+    def filter(self, mask):
+        return self.take(np.flatnonzero(mask))
+
+    def _sort_key(self, name, descending):
+        values = self.columns[name]
+        if values.dtype.kind == "M":
+            key = values.view("int64").astype("float64")
+            key[np.isnat(values)] = np.nan
+        else:
+            key = values.astype("float64")
+        # Missing values sort last either way
+        return np.where(np.isnan(key), np.inf, -key if descending else key)
+
+    def argsort(self, name, descending=True):
+        if name not in self.columns:
+            return np.arange(self._size)
+        return np.argsort(self._sort_key(name, descending), kind="stable")
+
+    def sort(self, name, descending=True):
+        """Rows ordered by a numeric or date column, missing values last."""
+        return self.take(self.argsort(name, descending))
+
+    def top_k(self, name, k, descending=True):
+        """The ``k`` best rows by ``name`` in order, without sorting the rest."""
+        if k >= self._size or name not in self.columns:
+            return self.sort(name, descending).head(k)
+        key = self._sort_key(name, descending)
+        best = np.argpartition(key, k)[:k]
+        return self.take(best[np.argsort(key[best], kind="stable")])
+
+    # -- output -----------------------------------------------------------
+    def _json_column(self, name):
+        values = self.columns[name]
+        nulls = _nulls(values)
+        if values.dtype.kind == "M":
+            out = np.datetime_as_string(values, unit="s").astype("object")
+        elif values.dtype.kind == "f":
+            out = values.astype("object")
+        else:
+            out = values.copy()
+        out[nulls] = None
+        return out.tolist()
+
+    def to_records(self, fields=None):
+        """JSON-ready dicts: ISO dates, ``None`` for missing values."""
+        names = [f for f in fields if f in self.columns] if fields else list(self.columns)
+        if not names:
+            return [{} for _ in range(self._size)]
+        columns = [self._json_column(name) for name in names]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+    def to_frame(self):
+        return pd.DataFrame(self.columns)
+
+    def render_cards(self):
+        """The whole result list as one HTML string, for a single ``st.markdown`` call.
+
+        Cells are read straight off the column arrays, with nulls swapped for
+        the card default as they go, so no per-column object copies are made.
+        """
+        escape = html.escape
+        rows = zip(*(self._cells(name, default) for name, default in CARD_FIELDS))
+        return "\n".join(
+            CARD_TEMPLATE.format(url=escape(str(url)), title=escape(str(title)),
+                                 company=escape(str(company)), location=escape(str(location)),
+                                 score=round(float(score), 2), sources=escape(str(sources)))
+            for url, title, company, location, score, sources in rows
+        )
+
+    def _cells(self, name, default):
+        values = self.columns.get(name)
+        if values is None:
+            return itertools.repeat(default, self._size)
+        return (default if null else value for value, null in zip(values, _nulls(values)))
@@ -0,0 +1,284 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from dedup import fingerprint
+from locations import location_mask, resolve_location, resolve_locations
+from text_index import TextIndex
+
+load_dotenv()
+
+# -------------------------------------------------
+# Store Configuration
+# -------------------------------------------------
+JOB_STORE_DB = os.getenv('JOB_STORE_DB', os.path.join('.cache', 'job_store.sqlite3'))
+JOB_STORE_RETENTION = int(os.getenv('JOB_STORE_RETENTION', 30 * 24 * 3600))  # purge closed postings after
+
+INDEX_DESCRIPTION_CHARS = 2000  # description prefix kept in the in-memory text index
+
+POSTING_COLUMNS = ["title", "company", "location", "description", "job_url", "source"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL UNIQUE,
+    board TEXT NOT NULL,
+    board_company TEXT NOT NULL,
+    title TEXT NOT NULL,
+    company TEXT,
+    location TEXT,
+    description TEXT,
+    job_url TEXT,
+    source TEXT,
+    country TEXT,
+    region TEXT,
+    remote INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    closed_at REAL,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS postings_board ON postings (board, board_company, closed_at);
+CREATE INDEX IF NOT EXISTS postings_open ON postings (closed_at, source, country);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5(
+    title, location, company, content='postings', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS postings_ai AFTER INSERT ON postings BEGIN
+    INSERT INTO postings_fts (rowid, title, location, company)
+    VALUES (new.id, new.title, new.location, new.company);
+END;
+CREATE TRIGGER IF NOT EXISTS postings_ad AFTER DELETE ON postings BEGIN
+    INSERT INTO postings_fts (postings_fts, rowid, title, location, company)
+    VALUES ('delete', old.id, old.title, old.location, old.company);
+END;
+CREATE TRIGGER IF NOT EXISTS postings_au AFTER UPDATE OF title, location, company ON postings
+WHEN old.title IS NOT new.title OR old.location IS NOT new.location OR old.company IS NOT new.company
+BEGIN
+    INSERT INTO postings_fts (postings_fts, rowid, title, location, company)
+    VALUES ('delete', old.id, old.title, old.location, old.company);
+    INSERT INTO postings_fts (rowid, title, location, company)
+    VALUES (new.id, new.title, new.location, new.company);
+END;
+
+CREATE TABLE IF NOT EXISTS boards (
+    board TEXT NOT NULL,
+    company TEXT NOT NULL,
+    last_crawled REAL,
+    postings INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (board, company)
+);
+"""
+
+# Columns added after the first release of the store: (name, definition)
+MIGRATIONS = [
+    ("revision", "INTEGER NOT NULL DEFAULT 0"),
+]
+POST_MIGRATION = "CREATE INDEX IF NOT EXISTS postings_revision ON postings (revision);"
+
+_TOKEN = re.compile(r"\w+")
+
+# -------------------------------------------------
+# Local Posting Store
+# -------------------------------------------------
+class JobStore:
+    """SQLite store of normalized ATS postings with an FTS5 index on title,
+    location and company.
+
+    Boards are written whole by the crawler: postings in the latest crawl get
+    ``last_seen`` bumped (``first_seen`` is kept), postings that dropped off a
+    board that crawled successfully are marked closed. Searches only read open
+    postings, so a search never waits on the network.
+    """
+
+    def __init__(self, db_path=JOB_STORE_DB, retention=JOB_STORE_RETENTION, text_index=True):
+        self.db_path = db_path
+        self.retention = retention
+        self.text_index = TextIndex() if text_index else None
+        self._indexed_revision = -1
+        self._sync_lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.executescript(SCHEMA)
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(postings)")}
+            for name, definition in MIGRATIONS:
+                if name not in columns:
+                    db.execute(f"ALTER TABLE postings ADD COLUMN {name} {definition}")
+            db.executescript(POST_MIGRATION)
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    # -- writer side ----------------------------------------------------
+    def upsert_board(self, board, company, jobs, seen_at=None):
+        """Replace the open postings of one board with ``jobs``.
+
+        Returns ``(new, updated, closed)`` counts.
+        """
+        seen_at = time.time() if seen_at is None else seen_at
+        df = pd.DataFrame(jobs, columns=POSTING_COLUMNS)
+        df = df[df["title"].notna()]
+        if not df.empty:
+            keys = df["job_url"].where(df["job_url"].notna() & (df["job_url"] != ""),
+                                       fingerprint(df))
+            places = resolve_locations(df["location"])
+            rows = list(zip(
+                keys, [board] * len(df), [company] * len(df), df["title"], df["company"],
+                df["location"].fillna(""), df["description"].fillna(""), df["job_url"],
+                df["source"], places["country"], places["region"],
+                places["remote"].astype(int), [seen_at] * len(df), [seen_at] * len(df),
+            ))
+        else:
+            rows = []
+
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            before = db.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+            # Rows whose text or open/closed state changes get the next revision,
+            # which is what the in-memory text index syncs on
+            revision = db.execute("SELECT COALESCE(MAX(revision), 0) + 1 FROM postings").fetchone()[0]
+            db.executemany(
+                """INSERT INTO postings (job_key, board, board_company, title, company, location,
+                       description, job_url, source, country, region, remote, first_seen, last_seen,
+                       revision)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (job_key) DO UPDATE SET
+                       title = excluded.title, company = excluded.company,
+                       location = excluded.location, description = excluded.description,
+                       source = excluded.source, country = excluded.country,
+                       region = excluded.region, remote = excluded.remote,
+                       last_seen = excluded.last_seen, closed_at = NULL,
+                       revision = CASE
+                           WHEN title IS NOT excluded.title
+                             OR description IS NOT excluded.description
+                             OR closed_at IS NOT NULL
+                           THEN excluded.revision ELSE revision END""",
+                [row + (revision,) for row in rows]
+            )
+            new = db.execute("SELECT COUNT(*) FROM postings").fetchone()[0] - before
+            closed = db.execute(
+                """UPDATE postings SET closed_at = ?, revision = ?
+                   WHERE board = ? AND board_company = ? AND closed_at IS NULL AND last_seen < ?""",
+                (seen_at, revision, board, company, seen_at)
+            ).rowcount
+            db.execute(
+                """INSERT INTO boards (board, company, last_crawled, postings) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (board, company) DO UPDATE SET
+                       last_crawled = excluded.last_crawled, postings = excluded.postings""",
+                (board, company, seen_at, len(rows))
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+        return new, len(rows) - new, closed
+
+    def purge(self, now=None):
+        """Delete postings closed longer than the retention period."""
+        cutoff = (time.time() if now is None else now) - self.retention
+        with closing(self._connect()) as db:
+            return db.execute("DELETE FROM postings WHERE closed_at < ?", (cutoff,)).rowcount
+
+    # -- reader side ----------------------------------------------------
+    def last_crawled(self):
+        """Time of the most recent board crawl, or ``None`` for an empty store."""
+        with closing(self._connect()) as db:
+            return db.execute("SELECT MAX(last_crawled) FROM boards").fetchone()[0]
+
+    def sync_index(self):
+        """Apply postings changed since the last sync to the in-memory text
+        index; returns how many rows were read."""
+        with self._sync_lock:
+            with closing(self._connect()) as db:
+                rows = db.execute(
+                    """SELECT id, title, description, closed_at, revision FROM postings
+                       WHERE revision > ? ORDER BY revision""",
+                    (self._indexed_revision,)
+                ).fetchall()
+            for row in rows:
+                if row["closed_at"] is None:
+                    self.text_index.add(row["id"], title=row["title"],
+                                        description=(row["description"] or "")[:INDEX_DESCRIPTION_CHARS])
+                else:
+                    self.text_index.remove(row["id"])
+            if rows:
+                self._indexed_revision = rows[-1]["revision"]
+            return len(rows)
+
+    def search(self, job_role=None, location=None, sources=None, limit=None):
+        """Open postings matching ``job_role``, fitting ``location`` as in
+        ``locations.location_mask``.
+
+        With the text index, titles match on analyzed terms (abbreviations
+        expanded, last word as a prefix) and results carry a BM25
+        ``text_score``, best first. Without it, the title must contain the
+        words as a phrase (FTS5) and results are newest first.
+        """
+        clauses, params = ["p.closed_at IS NULL"], []
+        join, scores = "", None
+        tokens = _TOKEN.findall(job_role or "")
+        if tokens and self.text_index is not None:
+            self.sync_index()
+            ids, values = self.text_index.search(job_role)
+            scores = pd.Series(values, index=ids, dtype="float64")
+            clauses.append("p.id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(ids))
+        elif tokens:
+            phrase = " ".join(tokens).replace('"', '""')
+            join = "JOIN postings_fts f ON f.rowid = p.id"
+            clauses.append("postings_fts MATCH ?")
+            params.append(f'title : "{phrase}" *')
+        if sources:
+            clauses.append(f"p.source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        country, region, _ = resolve_location(str(location or "").strip())
+        if country and region is None:
+            # Country-wide search: index pre-filter, location_mask below keeps the
+            # unresolved and remote postings whose text still fits
+            clauses.append("(p.country = ? OR p.country IS NULL OR p.remote = 1)")
+            params.append(country)
+
+        query = f"""SELECT p.id, p.title, p.company, p.location, p.description, p.job_url, p.source,
+                           p.first_seen, p.last_seen
+                    FROM postings p {join}
+                    WHERE {' AND '.join(clauses)}
+                    ORDER BY p.first_seen DESC"""
+        with closing(self._connect()) as db:
+            df = pd.read_sql_query(query, db, params=params)
+        if scores is not None:
+            df["text_score"] = df["id"].map(scores)
+            df = df.sort_values("text_score", ascending=False, kind="stable")
+        if location and not df.empty:
+            df = df[location_mask(df["location"], location)]
+        if limit:
+            df = df.head(limit)
+        return df.drop(columns="id").reset_index(drop=True).assign(
+            first_seen=lambda d: pd.to_datetime(d["first_seen"], unit="s"),
+            last_seen=lambda d: pd.to_datetime(d["last_seen"], unit="s"),
+        )
+
+    def stats(self):
+        with closing(self._connect()) as db:
+            row = db.execute(
+                """SELECT COUNT(*) AS total,
+                          SUM(closed_at IS NULL) AS open,
+                          (SELECT COUNT(*) FROM boards) AS boards,
+                          (SELECT MAX(last_crawled) FROM boards) AS last_crawled
+                   FROM postings"""
+            ).fetchone()
+        return {k: row[k] for k in row.keys()}
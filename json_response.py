@@ -0,0 +1,82 @@
+import gzip
+import json
+import math
+import os
+
+from dotenv import load_dotenv
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, several times slower on large result lists
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+load_dotenv()
+
+# -------------------------------------------------
+# Response Configuration
+# -------------------------------------------------
+JSON_COMPRESS_MIN_BYTES = int(os.getenv('JSON_COMPRESS_MIN_BYTES', 1024))  # smaller bodies go out as-is
+JSON_GZIP_LEVEL = int(os.getenv('JSON_GZIP_LEVEL', 6))
+JSON_BROTLI_QUALITY = int(os.getenv('JSON_BROTLI_QUALITY', 5))
+JSON_MAX_PAGE_SIZE = int(os.getenv('JSON_MAX_PAGE_SIZE', 500))
+
+ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+# -------------------------------------------------
+# Encoding
+# -------------------------------------------------
+def dumps(payload):
+    """UTF-8 JSON bytes; NaN and numpy scalars are handled by orjson."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=JSON_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=JSON_GZIP_LEVEL)
+
+
+def json_response(payload, accept_encodings=None, status=200):
+    """A Flask response with ``payload`` encoded once, compressed when the client accepts it.
+
+    ``accept_encodings`` is ``request.accept_encodings``; brotli is offered
+    only when the ``brotli`` package is installed.
+    """
+    body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = accept_encodings.best_match(ENCODINGS) if accept_encodings else None
+    if encoding and len(body) >= JSON_COMPRESS_MIN_BYTES:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(body, status=status, mimetype="application/json", headers=headers)
+
+# -------------------------------------------------
+# Projection and Pagination
+# -------------------------------------------------
+def parse_fields(value):
+    """``"title,company"`` or ``["title", "company"]`` -> list of names; ``None`` means all."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    fields = [str(f).strip() for f in value if str(f).strip()]
+    return fields or None
+
+
+def paginate(table, page=1, page_size=None):
+    """Slice a ``JobTable`` to one page; returns the page and its pagination metadata."""
+    total = len(table)
+    page_size = min(max(int(page_size or total or 1), 1), JSON_MAX_PAGE_SIZE)
+    page = max(int(page or 1), 1)
+    start = (page - 1) * page_size
+    meta = {"page": page, "page_size": page_size, "total": total,
+            "pages": math.ceil(total / page_size)}
+    return table.take(slice(start, start + page_size)), meta
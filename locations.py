@@ -0,0 +1,255 @@
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+# -------------------------------------------------
+# Gazetteer
+# -------------------------------------------------
+# Canonical country names match the values jobspy accepts for country_indeed
+DEFAULT_COUNTRY = "USA"
+
+COUNTRY_ALIASES = {
+    "USA": ["united states", "united states of america", "usa", "u.s.a.", "america"],
+    "India": ["india", "bharat"],
+    "Canada": ["canada"],
+    "UK": ["united kingdom", "great britain", "britain", "england", "scotland", "wales",
+           "northern ireland"],
+    "Australia": ["australia"],
+    "Germany": ["germany", "deutschland"],
+    "France": ["france"],
+    "Singapore": ["singapore"],
+}
+
+# Short codes only count in upper case ("Remote - US", "London, UK"),
+# so "us" in "join us" or "can" in "you can" never resolve to a country
+# (state codes such as "DE" and "IN" take precedence over the matching ISO codes).
+# Codes that are not English words also count in any case ("london, uk").
+COUNTRY_CODES = {"US": "USA", "USA": "USA", "UK": "UK", "GB": "UK", "IND": "India",
+                 "CAN": "Canada", "AUS": "Australia", "SG": "Singapore"}
+ANY_CASE_CODES = {"USA", "UK", "GB", "IND", "SG"}
+
+# Countries a trailing state code may stand for as an ISO code instead
+# ("Toronto, CA", "Pune, IN"); a city of that country keeps it
+ISO_CODES = {"CA": "Canada", "IN": "India", "DE": "Germany", "SG": "Singapore"}
+
+REGIONS = {
+    "USA": {
+        "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+        "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "Florida": "FL", "Georgia": "GA",
+        "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN", "Iowa": "IA",
+        "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
+        "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS",
+        "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV",
+        "New Hampshire": "NH", "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY",
+        "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK",
+        "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC",
+        "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT",
+        "Virginia": "VA", "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI",
+        "Wyoming": "WY", "District of Columbia": "DC",
+    },
+    "India": {
+        "Karnataka": "KA", "Maharashtra": "MH", "Telangana": "TG", "Tamil Nadu": "TN",
+        "Delhi": "DL", "Haryana": "HR", "Uttar Pradesh": "UP", "West Bengal": "WB",
+        "Gujarat": "GJ", "Kerala": "KL", "Andhra Pradesh": "AP", "Rajasthan": "RJ",
+    },
+    "Canada": {
+        "Ontario": "ON", "British Columbia": "BC", "Quebec": "QC", "Alberta": "AB",
+        "Manitoba": "MB", "Saskatchewan": "SK", "Nova Scotia": "NS", "New Brunswick": "NB",
+    },
+    "Australia": {
+        "New South Wales": "NSW", "Victoria": "VIC", "Queensland": "QLD",
+        "Western Australia": "WA", "South Australia": "SA", "Tasmania": "TAS",
+        "Australian Capital Territory": "ACT",
+    },
+    "Germany": {"Bavaria": None, "Berlin": None, "Hesse": None, "Baden-Württemberg": None},
+    "UK": {},
+    "France": {"Île-de-France": None, "Ile-de-France": None},
+    "Singapore": {},
+}
+
+# Major cities mapped to (country, region)
+CITIES = {
+    "USA": {
+        "San Francisco": "California", "Los Angeles": "California", "San Jose": "California",
+        "San Diego": "California", "Palo Alto": "California", "Mountain View": "California",
+        "Sunnyvale": "California", "Menlo Park": "California", "Seattle": "Washington",
+        "Redmond": "Washington", "Bellevue": "Washington", "New York City": "New York",
+        "NYC": "New York", "Brooklyn": "New York", "Boston": "Massachusetts",
+        "Cambridge, MA": "Massachusetts", "Austin": "Texas", "Dallas": "Texas",
+        "Houston": "Texas", "Chicago": "Illinois", "Denver": "Colorado", "Atlanta": "Georgia",
+        "Miami": "Florida", "Phoenix": "Arizona", "Philadelphia": "Pennsylvania",
+        "Pittsburgh": "Pennsylvania", "Portland": "Oregon", "Salt Lake City": "Utah",
+        "Raleigh": "North Carolina", "Washington, DC": "District of Columbia",
+        "Minneapolis": "Minnesota", "Detroit": "Michigan", "Nashville": "Tennessee",
+        "San Antonio": "Texas", "Columbus": "Ohio",
+    },
+    "India": {
+        "Bangalore": "Karnataka", "Bengaluru": "Karnataka", "Mumbai": "Maharashtra",
+        "Pune": "Maharashtra", "Hyderabad": "Telangana", "Chennai": "Tamil Nadu",
+        "New Delhi": "Delhi", "Gurgaon": "Haryana", "Gurugram": "Haryana",
+        "Noida": "Uttar Pradesh", "Kolkata": "West Bengal", "Ahmedabad": "Gujarat",
+        "Kochi": "Kerala", "Jaipur": "Rajasthan",
+    },
+    "Canada": {
+        "Toronto": "Ontario", "Ottawa": "Ontario", "Waterloo, ON": "Ontario",
+        "Vancouver": "British Columbia", "Montreal": "Quebec", "Montréal": "Quebec",
+        "Calgary": "Alberta", "Edmonton": "Alberta", "Winnipeg": "Manitoba",
+    },
+    "UK": {
+        "London": "England", "Manchester": "England", "Birmingham": "England",
+        "Cambridge, UK": "England", "Oxford": "England", "Bristol": "England",
+        "Leeds": "England", "Edinburgh": "Scotland", "Glasgow": "Scotland",
+        "Cardiff": "Wales", "Belfast": "Northern Ireland",
+    },
+    "Australia": {
+        "Sydney": "New South Wales", "Melbourne": "Victoria", "Brisbane": "Queensland",
+        "Perth": "Western Australia", "Adelaide": "South Australia",
+        "Canberra": "Australian Capital Territory",
+    },
+    "Germany": {
+        "Munich": "Bavaria", "München": "Bavaria", "Hamburg": None, "Frankfurt": "Hesse",
+        "Cologne": None, "Köln": None, "Stuttgart": "Baden-Württemberg",
+    },
+    "France": {
+        "Paris": "Île-de-France", "Lyon": None, "Toulouse": None, "Marseille": None,
+        "Nice": None, "Lille": None,
+    },
+    "Singapore": {},
+}
+
+REMOTE_TERMS = ["remote", "work from home", "wfh", "anywhere"]
+
+# -------------------------------------------------
+# Compiled Index
+# -------------------------------------------------
+def _build_index():
+    """Map every lowercase alias to ``(country, region, is_country)`` and compile
+    one alternation per case rule. Longer aliases come first so
+    "new york city" wins over "new york" and "west virginia" over "virginia".
+
+    ``code_countries`` lists every ``(country, region)`` a region code can
+    stand for, to settle trailing codes such as "WA" or "CA"."""
+    names, codes, code_countries = {}, {}, {}
+    for country, aliases in COUNTRY_ALIASES.items():
+        for alias in aliases:
+            names[alias.lower()] = (country, None, True)
+    for country, regions in REGIONS.items():
+        for region, code in regions.items():
+            names.setdefault(region.lower(), (country, region, False))
+            if code:
+                codes.setdefault(code, (country, region, False))
+                code_countries.setdefault(code, []).append((country, region))
+    for code, country in ISO_CODES.items():
+        if code in code_countries:
+            code_countries[code].append((country, None))
+    for country, cities in CITIES.items():
+        for city, region in cities.items():
+            names.setdefault(city.lower(), (country, region, False))
+    for code, country in COUNTRY_CODES.items():
+        codes[code] = (country, None, True)
+
+    def alternation(words):
+        return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+    name_pattern = re.compile(rf"(?<!\w)(?:{alternation(names)})(?!\w)", re.IGNORECASE)
+    # Codes must stand alone as a location component: "Austin, TX", "Remote - US", "(UK)"
+    component = r"(?:^|[\s,(/-])({})(?=$|[\s,)/.-])"
+    code_pattern = re.compile(component.format(alternation(set(codes) - ANY_CASE_CODES)))
+    any_case_pattern = re.compile(component.format(alternation(ANY_CASE_CODES)), re.IGNORECASE)
+    remote_pattern = re.compile(rf"\b(?:{alternation(REMOTE_TERMS)})\b", re.IGNORECASE)
+    return names, codes, code_countries, name_pattern, code_pattern, any_case_pattern, remote_pattern
+
+
+(_NAMES, _CODES, _CODE_COUNTRIES, _NAME_RE, _CODE_RE, _ANY_CASE_CODE_RE,
+ _REMOTE_RE) = _build_index()
+
+# -------------------------------------------------
+# Resolution
+# -------------------------------------------------
+def _trailing_code(text, hits):
+    """The ``(country, region)`` of a state or province code ending ``text``
+    ("Paris, TX"), which outranks city names elsewhere in it. Where the code
+    is shared ("Perth, WA", "Toronto, CA"), a named city or region of one of
+    its countries picks that one."""
+    match = None
+    for match in _CODE_RE.finditer(text):
+        pass
+    if match is None or text[match.end(1):].strip(" .)") or match.group(1) not in _CODE_COUNTRIES:
+        return None
+    options = _CODE_COUNTRIES[match.group(1)]
+    named = {c for start, (c, _, is_country) in hits if start != match.start(1) and not is_country}
+    return next(((c, r) for c, r in options if c in named), options[0])
+
+
+@lru_cache(maxsize=65536)
+def resolve_location(text):
+    """Return ``(country, region, remote)`` for a free-text location.
+
+    An explicit country anywhere in the string wins, then a trailing state
+    code; otherwise the first state, province or city found decides it.
+    Unresolved parts are ``None``.
+    """
+    if not text:
+        return None, None, False
+    hits = [(m.start(), _NAMES[m.group(0).lower()]) for m in _NAME_RE.finditer(text)]
+    hits += [(m.start(1), _CODES[m.group(1)]) for m in _CODE_RE.finditer(text)]
+    hits += [(m.start(1), _CODES[m.group(1).upper()]) for m in _ANY_CASE_CODE_RE.finditer(text)]
+    hits.sort(key=lambda h: h[0])
+    country = next((c for _, (c, _, is_country) in hits if is_country), None)
+    trailing = None if country else _trailing_code(text, hits)
+    if trailing:
+        country = trailing[0]
+    regions = [(c, r) for _, (c, r, is_country) in hits
+               if not is_country and (country is None or c == country)]
+    if regions:
+        country, region = regions[0]
+    elif trailing:
+        region = trailing[1]
+    else:
+        region = None
+    return country, region, bool(_REMOTE_RE.search(text))
+
+
+def _distinct(locations):
+    """Factorize a location Series with missing values as empty strings."""
+    return pd.factorize(locations.where(locations.notna(), "").astype(str))
+
+
+def resolve_locations(locations):
+    """Vectorized ``resolve_location`` over a Series: each distinct string is
+    resolved once. Returns a frame with ``country``, ``region`` and ``remote``."""
+    codes, uniques = _distinct(locations)
+    resolved = pd.DataFrame([resolve_location(u) for u in uniques],
+                            columns=["country", "region", "remote"])
+    result = resolved.iloc[codes]
+    result.index = locations.index
+    return result
+
+
+def country_for_search(location, default=DEFAULT_COUNTRY):
+    """Country to pass to jobspy as ``country_indeed`` for a user's search location."""
+    return resolve_location(str(location or "").strip())[0] or default
+
+
+def location_mask(job_locations, user_location):
+    """Boolean mask of postings that fit ``user_location``.
+
+    Remote postings and postings without a location always fit. Otherwise the
+    user's text must appear in the job location as whole words, or - when the
+    user searched a whole country - the job must resolve to that country.
+    """
+    user_location = str(user_location or "").strip()
+    if not user_location:
+        return pd.Series(True, index=job_locations.index)
+    codes, uniques = _distinct(job_locations)
+    text = pd.Series(uniques, dtype=object)
+    resolved = pd.DataFrame([resolve_location(u) for u in uniques],
+                            columns=["country", "region", "remote"])
+
+    fits = (text == "") | resolved["remote"].astype(bool)
+    fits |= text.str.contains(rf"(?<!\w){re.escape(user_location)}(?!\w)", case=False, regex=True)
+    user_country, user_region, _ = resolve_location(user_location)
+    if user_country and user_region is None:
+        fits |= resolved["country"] == user_country
+    return pd.Series(fits.to_numpy(dtype=bool).take(codes), index=job_locations.index)
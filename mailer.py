@@ -0,0 +1,334 @@
+import os
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from dotenv import load_dotenv
+
+from config import Config
+from rate_limit import TokenBucket
+
+load_dotenv()
+
+# -------------------------------------------------
+# Mail Configuration
+# -------------------------------------------------
+SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+SENDER_EMAIL = os.getenv('SENDER_EMAIL', '')
+SENDER_PASSWORD = os.getenv('SENDER_PASSWORD', '')
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'True').lower() == 'true'
+
+MAIL_POOL_SIZE = int(os.getenv('MAIL_POOL_SIZE', 2))
+MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 20))
+MAIL_MAX_RETRIES = int(os.getenv('MAIL_MAX_RETRIES', 3))
+MAIL_RETRY_BACKOFF = float(os.getenv('MAIL_RETRY_BACKOFF', 2.0))  # seconds, doubled per retry
+MAIL_IDLE_SECONDS = 60  # NOOP-check pooled connections idle longer than this
+MAIL_SEND_TIMEOUT = 300
+
+# Per-minute ceilings of the common providers, applied on top of the hourly limit
+PROVIDER_LIMITS_PER_MINUTE = {
+    "smtp.gmail.com": 20,
+    "smtp.office365.com": 30,
+    "smtp-mail.outlook.com": 30,
+    "smtp.mail.yahoo.com": 10,
+}
+
+# -------------------------------------------------
+# Rate Limiting
+# -------------------------------------------------
+class ProviderRateLimiter:
+    """Hourly limit from ``Config.RATE_LIMIT_PER_HOUR`` plus the provider's per-minute cap."""
+
+    def __init__(self, server=SMTP_SERVER, per_hour=None):
+        if per_hour is None and Config.RATE_LIMIT_ENABLED:
+            per_hour = Config.RATE_LIMIT_PER_HOUR
+        self.buckets = []
+        if per_hour:
+            self.buckets.append(TokenBucket(per_hour, 3600))
+        per_minute = PROVIDER_LIMITS_PER_MINUTE.get(server.lower())
+        if per_minute:
+            self.buckets.append(TokenBucket(per_minute, 60))
+
+    def delay(self):
+        """Take a token from every bucket, returning how long to wait for them."""
+        return max((bucket.delay() for bucket in self.buckets), default=0.0)
+
+    def acquire(self):
+        wait = self.delay()
+        if wait:
+            time.sleep(wait)
+
+# -------------------------------------------------
+# SMTP Connection Pool
+# -------------------------------------------------
+class SMTPPool:
+    """Keeps up to ``size`` logged-in SMTP connections for reuse."""
+
+    def __init__(self, server=SMTP_SERVER, port=SMTP_PORT, username=SENDER_EMAIL,
+                 password=SENDER_PASSWORD, size=MAIL_POOL_SIZE, starttls=SMTP_STARTTLS,
+                 timeout=30):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.opened = 0
+
+    def _open(self):
+        conn = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        conn.ehlo()
+        if self.starttls:
+            conn.starttls()
+            conn.ehlo()
+        if self.username and self.password:
+            conn.login(self.username, self.password)
+        self.opened += 1
+        return conn
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    conn, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+                if time.monotonic() - last_used < MAIL_IDLE_SECONDS:
+                    return conn
+                try:
+                    if conn.noop()[0] == 250:
+                        return conn
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        if broken:
+            self._discard(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._slots.release()
+
+    def _discard(self, conn):
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+# -------------------------------------------------
+# Batched Dispatcher
+# -------------------------------------------------
+def _is_transient(error):
+    # SMTPException subclasses OSError, so the SMTP cases go first
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+def _breaks_connection(error):
+    """Whether the connection is unusable after ``error``: a dropped session
+    or a socket error, as opposed to the server refusing one message."""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class MailDispatcher:
+    """Queues outgoing messages and sends them in batches over pooled connections.
+
+    ``send`` returns a ``Future`` resolved once the message is accepted by the
+    server or has failed permanently. Transient failures (4xx, dropped
+    connections) are retried with exponential backoff. A message can be
+    withdrawn with ``cancel`` until a worker starts sending it.
+    """
+
+    def __init__(self, pool=None, limiter=None, workers=MAIL_POOL_SIZE,
+                 batch_size=MAIL_BATCH_SIZE, max_retries=MAIL_MAX_RETRIES,
+                 backoff=MAIL_RETRY_BACKOFF):
+        self.pool = pool or SMTPPool()
+        self.limiter = limiter or ProviderRateLimiter(self.pool.server)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._sending = set()  # futures of messages on the wire right now
+        self.counters = {"sent": 0, "failed": 0, "retried": 0, "batches": 0, "cancelled": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"mail-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def send(self, msg):
+        self.start()
+        future = Future()
+        self._queue.put((msg, future, 0))
+        return future
+
+    def cancel(self, future):
+        """Withdraw a queued (or backing-off) message; ``False`` once it is
+        being sent or already done."""
+        with self._lock:
+            if future in self._sending or not future.cancel():
+                return False
+            self.counters["cancelled"] += 1
+            return True
+
+    def _claim(self, future):
+        with self._lock:
+            if future.cancelled():
+                return False
+            self._sending.add(future)
+            return True
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _retry_later(self, item, error):
+        msg, future, attempt = item
+        if attempt >= self.max_retries or not _is_transient(error):
+            with self._lock:
+                if future.cancelled():
+                    return
+                self.counters["failed"] += 1
+                future.set_exception(error)
+            return
+        self._count("retried")
+        delay = self.backoff * (2 ** attempt)
+        timer = threading.Timer(delay, self._queue.put, args=((msg, future, attempt + 1),))
+        timer.daemon = True
+        timer.start()
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            conn, broken = None, False
+            for i, item in enumerate(batch):
+                msg, future, _ = item
+                if future.cancelled():
+                    continue
+                wait = self.limiter.delay()
+                if wait:
+                    # Don't sit on a logged-in session the server may drop meanwhile
+                    if conn is not None:
+                        self.pool.release(conn)
+                        conn = None
+                    time.sleep(wait)
+                if not self._claim(future):
+                    continue
+                if conn is None:
+                    try:
+                        conn = self.pool.acquire()
+                    except Exception as e:
+                        with self._lock:
+                            self._sending.discard(future)
+                        for rest in batch[i:]:
+                            self._retry_later(rest, e)
+                        break
+                    self._count("batches")
+                    broken = False
+                try:
+                    conn.send_message(msg)
+                except Exception as e:
+                    if _breaks_connection(e):
+                        broken = True
+                    else:
+                        # Refused recipient or message: reset and keep the session
+                        try:
+                            conn.rset()
+                        except Exception:
+                            broken = True
+                    self._retry_later(item, e)
+                else:
+                    self._count("sent")
+                    future.set_result(True)
+                finally:
+                    with self._lock:
+                        self._sending.discard(future)
+                if broken:
+                    # Connection died mid-batch; the rest go out on a fresh one
+                    self.pool.release(conn, broken=True)
+                    conn = None
+            if conn is not None:
+                self.pool.release(conn)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["queued"] = self.pending()
+        stats["connections_opened"] = self.pool.opened
+        return stats
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher():
+    """Process-wide dispatcher sharing one SMTP pool."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = MailDispatcher()
+        return _dispatcher
+
+def mail_stats():
+    """Dispatcher counters, without creating the dispatcher just to report them."""
+    return _dispatcher.stats() if _dispatcher is not None else {}
+
+def send_message(msg, timeout=MAIL_SEND_TIMEOUT):
+    """Send ``msg`` through the shared dispatcher and wait for the outcome.
+
+    A message still queued after ``timeout`` seconds (e.g. behind the hourly
+    limit) is withdrawn, so a reported failure never goes out later.
+    """
+    dispatcher = get_dispatcher()
+    future = dispatcher.send(msg)
+    try:
+        return future.result(timeout)
+    except FutureTimeout:
+        if dispatcher.cancel(future):
+            raise TimeoutError(f"Email not sent within {timeout}s; withdrawn from the queue") from None
+        # Already on the wire: the SMTP timeout bounds the wait
+        return future.result()
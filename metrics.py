@@ -0,0 +1,259 @@
+"""Stage timings, counters and a Prometheus text exposition, with no dependencies.
+
+    with span("scrape", site="indeed"):
+        jobs = scrape_jobs(...)
+
+records the duration in ``jobspy_stage_seconds{stage="scrape",site="indeed"}``
+and, if the block raises, increments ``jobspy_stage_errors_total``. Spans that
+run inside ``trace()`` are also collected for that request's log line. The
+Flask app serves ``render()`` at ``/metrics``; other processes (Streamlit, the
+crawler) can expose theirs with ``start_http_server``.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -------------------------------------------------
+# Metrics Configuration
+# -------------------------------------------------
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # standalone exporter of the Streamlit app
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'False').lower() == 'true'  # allow ?profile=1
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))  # seconds between samples
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join('.cache', 'profiles'))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# -------------------------------------------------
+# Registry
+# -------------------------------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Registry:
+    """Thread-safe counters and histograms plus gauges read at scrape time."""
+
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self._help = {}
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, help_text):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][slot] += 1
+            histogram[1] += value
+
+    def register_stats(self, prefix, stats, help_text=""):
+        """Expose every numeric value of ``stats()`` as gauge ``<prefix>_<key>``."""
+        self._collectors.append((prefix, stats, help_text))
+
+    def _collect_stats(self):
+        gauges = []
+        for prefix, stats, help_text in self._collectors:
+            try:
+                values = stats()
+            except Exception as e:  # a broken collector must not break the scrape
+                print(f"Metrics collector {prefix} failed: {e}")
+                continue
+            if not isinstance(values, dict):
+                values = {"": values}
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                gauges.append((f"{prefix}_{key}" if key else prefix, value, help_text))
+        return gauges
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, (list(b), s)) for k, (b, s) in self._histograms.items())
+        lines, described = [], set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                help_text = self._help.get(name, (kind, ""))[1]
+                lines.append(f"# HELP {name} {help_text}".rstrip())
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), (buckets, total) in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), buckets):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        for name, value, help_text in self._collect_stats():
+            self._help.setdefault(name, ("gauge", help_text))
+            header(name, "gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+registry.describe("jobspy_stage_seconds", "histogram", "Duration of instrumented stages")
+registry.describe("jobspy_stage_errors_total", "counter", "Instrumented stages that raised")
+
+# -------------------------------------------------
+# Spans and Traces
+# -------------------------------------------------
+_local = threading.local()
+
+
+@contextmanager
+def span(stage, **labels):
+    """Time the block as ``stage``; count it as an error if it raises."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        registry.inc("jobspy_stage_errors_total", stage=stage, **labels)
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        registry.observe("jobspy_stage_seconds", seconds, stage=stage, **labels)
+        spans = getattr(_local, "spans", None)
+        if spans is not None:
+            spans.append((stage, seconds))
+
+
+def timed(stage, fn, **labels):
+    """``fn`` wrapped in ``span(stage, **labels)``."""
+    def wrapper(*args, **kwargs):
+        with span(stage, **labels):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def trace():
+    """Collect ``(stage, seconds)`` for every span this thread finishes inside the block."""
+    previous = getattr(_local, "spans", None)
+    _local.spans = spans = []
+    try:
+        yield spans
+    finally:
+        _local.spans = previous
+        if previous is not None:
+            previous.extend(spans)
+
+
+def format_trace(spans):
+    return ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in spans)
+
+
+def render():
+    return registry.render()
+
+# -------------------------------------------------
+# Sampling Profiler
+# -------------------------------------------------
+class SamplingProfiler:
+    """Samples one thread's stack every ``interval`` seconds from a helper thread.
+
+    ``folded()`` returns collapsed stacks (``outer;inner count`` per line), the
+    input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id=None, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def folded(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+    def save(self, name, directory=PROFILE_DIR):
+        """Write the folded stacks to ``directory``; returns the file name."""
+        os.makedirs(directory, exist_ok=True)
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{threading.get_ident() % 10000}.folded"
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            f.write(self.folded())
+        return filename
+
+# -------------------------------------------------
+# Standalone Exporter
+# -------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_server(port=METRICS_PORT, host="0.0.0.0"):
+    """Serve ``/metrics`` from a daemon thread (for processes without Flask)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
@@ -0,0 +1,86 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from governor import governed
+from metrics import registry, timed
+from scrape_cache import scrape_cache
+
+load_dotenv()
+
+SITE_TIMEOUT = float(os.getenv('SITE_TIMEOUT', 30))  # seconds per board
+
+
+def iter_site_results(params, sites, scrape, timeout=SITE_TIMEOUT):
+    """Scrape each site on its own worker and yield results as they finish.
+
+    Yields ``(site, jobs_df, error)`` tuples in completion order. A site that
+    raises yields its error; sites still running after ``timeout`` seconds
+    yield a ``TimeoutError`` and are abandoned. Cache misses go through the
+    site's governor (see ``governor.py``), so a failing site is skipped at
+    once and a slow one is cut off at its adaptive timeout.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(sites), thread_name_prefix="site")
+    futures = {
+        pool.submit(scrape_cache.get_or_scrape, dict(params, site_name=[site]),
+                    timed("scrape", governed(site, scrape, max_timeout=timeout), site=site)): site
+        for site in sites
+    }
+    expires = time.monotonic() + timeout
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=max(0, expires - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is not None:
+                    yield futures[future], None, future.exception()
+                else:
+                    yield futures[future], future.result(), None
+        for future in pending:
+            registry.inc("jobspy_site_timeouts_total", site=futures[future])
+            yield futures[future], None, TimeoutError(f"{futures[future]} timed out after {timeout:.0f}s")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def scrape_sites(params, scrape, timeout=SITE_TIMEOUT):
+    """Scrape every site of ``params["site_name"]`` in parallel and merge them.
+
+    Returns ``(jobs_df, failed)`` with ``failed`` mapping site -> error
+    message; raises when every site failed.
+    """
+    frames, failed = [], {}
+    for site, jobs, error in iter_site_results(params, params["site_name"], scrape, timeout):
+        if error is not None:
+            failed[site] = str(error)
+        else:
+            frames.append(jobs)
+    if failed:
+        print(f"Scrape: {len(failed)} of {len(params['site_name'])} sites failed: {failed}")
+        if not frames:
+            raise RuntimeError(f"All job sites failed: {'; '.join(failed.values())}")
+    return merge_results(frames), failed
+
+
+def merge_results(frames):
+    """Concatenate per-site frames, drop duplicate postings and sort newest first."""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    jobs = pd.concat(frames, ignore_index=True)
+    if "date_posted" in jobs.columns:
+        jobs["date_posted"] = pd.to_datetime(jobs["date_posted"], errors="coerce")
+    if "job_url" in jobs.columns:
+        jobs = jobs[~(jobs["job_url"].notna() & jobs.duplicated("job_url"))]
+    subset = [c for c in ("title", "company", "location") if c in jobs.columns]
+    if subset:
+        jobs = jobs.drop_duplicates(subset)
+    if "date_posted" in jobs.columns:
+        jobs = jobs.sort_values("date_posted", ascending=False, na_position="last")
+    return jobs
@@ -0,0 +1,41 @@
+"""Token buckets shared by the mail dispatcher and the per-source governors."""
+import threading
+import time
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per ``per`` seconds, bursting to ``rate``."""
+
+    def __init__(self, rate, per):
+        self.capacity = float(rate)
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """Take a token, returning how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.fill_rate
+
+    def acquire(self):
+        wait = self.delay()
+        if wait:
+            time.sleep(wait)
+
+    def take(self, max_wait):
+        """Like ``delay``, but the token is only taken if the wait is at most
+        ``max_wait``; returns the wait, or ``None`` with the bucket untouched."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.fill_rate
+            if wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
@@ -0,0 +1,202 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -------------------------------------------------
+# Resume Processing Configuration
+# -------------------------------------------------
+RESUME_MAX_BYTES = int(os.getenv('RESUME_MAX_BYTES', 5 * 1024 * 1024))
+RESUME_MAX_PAGES = int(os.getenv('RESUME_MAX_PAGES', 20))  # later pages are ignored
+RESUME_WORKERS = int(os.getenv('RESUME_WORKERS', min(4, os.cpu_count() or 1)))  # 0 = extract inline
+RESUME_DEADLINE = float(os.getenv('RESUME_DEADLINE', 20))  # seconds per upload
+RESUME_CACHE_ENTRIES = int(os.getenv('RESUME_CACHE_ENTRIES', 128))
+
+
+class ResumeRejected(Exception):
+    """Raised for uploads over ``RESUME_MAX_BYTES`` or that are not readable PDFs."""
+
+
+def resume_key(data):
+    """Content address of an upload: SHA-256 of the raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _extract_pages(data, start, stop):
+    # Runs in a worker process; each worker parses its own reader from the bytes
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _page_count(data):
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+
+    try:
+        return len(PdfReader(io.BytesIO(data)).pages)
+    except (PdfReadError, ValueError) as e:
+        raise ResumeRejected(f"Could not read the PDF: {e}") from e
+
+
+def _page_ranges(pages, parts):
+    """Split ``range(pages)`` into at most ``parts`` contiguous, near-equal slices."""
+    bounds = np.linspace(0, pages, min(parts, pages) + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+# -------------------------------------------------
+# Resume Processor
+# -------------------------------------------------
+class ResumeProcessor:
+    """Extracts resume text page-parallel and caches text + embedding by content hash.
+
+    Pages are split into contiguous ranges handled by a pool of worker
+    processes, so a pathological page neither holds the GIL nor outlives
+    ``deadline``: on timeout the text of the pages finished so far is used and
+    the pool is replaced, the old one being terminated only after every other
+    extraction on it has finished. Re-uploading the same bytes costs one hash.
+    """
+
+    def __init__(self, max_bytes=RESUME_MAX_BYTES, max_pages=RESUME_MAX_PAGES,
+                 workers=RESUME_WORKERS, deadline=RESUME_DEADLINE,
+                 max_entries=RESUME_CACHE_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.workers = workers
+        self.deadline = deadline
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_users = {}  # pool -> extractions running on it
+        self._pool_lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "rejected": 0, "timeouts": 0, "pages": 0}
+
+    # -- extraction -----------------------------------------------------
+    def _acquire_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a threaded server process is not safe
+                self._pool = multiprocessing.get_context("spawn").Pool(
+                    self.workers, maxtasksperchild=100)
+                self._pool_users[self._pool] = 0
+            self._pool_users[self._pool] += 1
+            return self._pool
+
+    def _release_pool(self, pool, stuck=False):
+        """Drop one user of ``pool``. A pool with a stuck worker is retired:
+        new extractions get a fresh pool, and the old one is terminated once
+        the extractions still running on it have finished."""
+        with self._pool_lock:
+            if stuck and pool is self._pool:
+                self._pool = None
+            self._pool_users[pool] -= 1
+            if pool is self._pool or self._pool_users[pool]:
+                return
+            del self._pool_users[pool]
+        pool.terminate()
+
+    def extract(self, data):
+        """Return ``(text, pages_read, total_pages)`` for the PDF in ``data``."""
+        total = _page_count(data)
+        pages = min(total, self.max_pages)
+        if self.workers <= 0:
+            return "\n".join(_extract_pages(data, 0, pages)).strip(), pages, total
+        pool = self._acquire_pool()
+        stuck = False
+        try:
+            pending = [pool.apply_async(_extract_pages, (data, start, stop))
+                       for start, stop in _page_ranges(pages, self.workers)]
+            deadline = time.monotonic() + self.deadline
+            texts = []
+            for result in pending:
+                try:
+                    texts.extend(result.get(timeout=max(deadline - time.monotonic(), 0)))
+                except multiprocessing.TimeoutError:
+                    print(f"Resume extraction hit the {self.deadline:.0f}s deadline "
+                          f"after {len(texts)} of {pages} pages")
+                    with self._lock:
+                        self.counters["timeouts"] += 1
+                    stuck = True
+                    break
+                except Exception as e:
+                    raise ResumeRejected(f"Could not read the PDF: {e}") from e
+        finally:
+            self._release_pool(pool, stuck)
+        return "\n".join(texts).strip(), len(texts), total
+
+    # -- cache ----------------------------------------------------------
+    def process(self, data, encode=None):
+        """Text (and, with ``encode``, the embedding) of an uploaded resume.
+
+        Returns a dict with ``key``, ``text``, ``pages``, ``truncated`` and
+        ``embedding`` (``None`` until an ``encode`` callable has been given).
+        ``encode`` takes a list of texts and returns one vector per text.
+        """
+        if len(data) > self.max_bytes:
+            with self._lock:
+                self.counters["rejected"] += 1
+            raise ResumeRejected(f"Resume is {len(data) / 1e6:.1f} MB; "
+                                 f"the limit is {self.max_bytes / 1e6:.1f} MB")
+        key = resume_key(data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+            else:
+                self.counters["misses"] += 1
+
+        if entry is None:
+            try:
+                text, pages, total = self.extract(data)
+            except ResumeRejected:
+                with self._lock:
+                    self.counters["rejected"] += 1
+                raise
+            entry = {"key": key, "text": text, "pages": pages,
+                     "truncated": pages < total, "embedding": None}
+            with self._lock:
+                self.counters["pages"] += pages
+                if pages == min(total, self.max_pages):  # deadline-cut results are not cached
+                    self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        if encode is not None and entry["embedding"] is None and entry["text"]:
+            entry["embedding"] = np.asarray(encode([entry["text"]]), dtype="float32")[0]
+        return entry
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._entries)
+        return stats
+
+    def close(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+_processor = None
+_processor_lock = threading.Lock()
+
+def get_resume_processor():
+    """Process-wide processor sharing one worker pool and cache."""
+    global _processor
+    with _processor_lock:
+        if _processor is None:
+            _processor = ResumeProcessor()
+        return _processor
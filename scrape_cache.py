@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -------------------------------------------------
+# Cache Configuration
+# -------------------------------------------------
+SCRAPE_CACHE_TTL = int(os.getenv('SCRAPE_CACHE_TTL', 900))  # seconds
+SCRAPE_CACHE_ENTRIES = int(os.getenv('SCRAPE_CACHE_ENTRIES', 256))
+
+
+def normalize_query(params):
+    """Canonical, hashable form of a ``scrape_jobs`` keyword set.
+
+    Case and extra whitespace in free-text fields are ignored and the order of
+    ``site_name`` does not matter.
+    """
+    key = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(str(v).strip().lower() for v in value))
+        elif isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        key.append((name, value))
+    return tuple(key)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+# -------------------------------------------------
+# Scrape Result Cache with Single-Flight
+# -------------------------------------------------
+class ScrapeCache:
+    """TTL cache of ``scrape_jobs`` DataFrames keyed by the normalized query.
+
+    Concurrent identical misses are coalesced: the first caller scrapes, the
+    rest wait on its in-flight result. Callers always get their own copy of
+    the DataFrame.
+    """
+
+    def __init__(self, ttl=SCRAPE_CACHE_TTL, max_entries=SCRAPE_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def get_or_scrape(self, params, scrape):
+        """Return ``scrape(**params)`` from cache, an in-flight call, or a new call."""
+        key = normalize_query(params)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry[1].copy()
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.counters["coalesced"] += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.counters["misses"] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result.copy()
+
+        try:
+            flight.result = scrape(**params)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.counters["errors"] += 1
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (time.time(), flight.result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return flight.result.copy()
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._entries)
+            stats["in_flight"] = len(self._flights)
+        requests = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round(stats["hits"] / requests, 4) if requests else 0.0
+        stats["coalesced_rate"] = round(stats["coalesced"] / requests, 4) if requests else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+scrape_cache = ScrapeCache()
@@ -1,13 +1,20 @@
 import streamlit as st
 import pandas as pd
-from jobspy import scrape_jobs
 from datetime import datetime
-from pypdf import PdfReader
-from sentence_transformers import SentenceTransformer
-import faiss
-import re
-import hashlib
-import requests
+
+from ats import ats_cache_stats
+from ats_crawler import ATS_CRAWL_IN_APP, ATSCrawler
+from dedup import dedupe_jobs
+from embedding_cache import EmbeddingCache
+from embedding_service import get_embedding_service, prewarm
+from job_records import JobTable
+from job_store import JobStore
+from locations import country_for_search
+from metrics import METRICS_PORT, registry, span, start_http_server, timed
+from parallel_scrape import scrape_sites
+from resume import ResumeRejected, get_resume_processor
+from scrape_cache import scrape_cache
+from text_index import TextIndex
 
 # -------------------------------------------------
 # Page Configuration (UNCHANGED)
@@ -24,196 +31,113 @@ st.set_page_config(
 # -------------------------------------------------
 EMBED_DIM = 384
 
-# -------------------------------------------------
-# ATS Companies – Data / AI / ML (50+)
-# -------------------------------------------------
-ATS_COMPANIES = {
-    "lever": [
-        "scaleai","figma","canva","duolingo","webflow","postman","posthog",
-        "segment","plaid","brex","shopify","algolia","datarobot","paxos",
-        "supabase","vercel","linear","netlify","airbyte","fivetran",
-        "rudderstack","montecarlodata","weightsandbiases","cohere",
-        "stabilityai","cerebras","perplexityai","huggingface"
-    ],
-    "greenhouse": [
-        "databricks","snowflake","datadog","airbnb","uber","lyft",
-        "dropbox","twilio","github","elastic","cloudflare","mongodb",
-        "palantir","pinterest","spotify","reddit","zoom","square",
-        "hashicorp","gitlab","digitalocean","openai","anthropic",
-        "amplitude","mixpanel"
-    ]
-}
+# jobspy, faiss (via job_index), pypdf (in resume workers) and torch take seconds to import, so
+# they load on first use instead of before the first page renders.
 
 # -------------------------------------------------
 # Load Model (UNCHANGED)
 # -------------------------------------------------
 @st.cache_resource
 def load_model():
-    return SentenceTransformer("all-MiniLM-L6-v2")
+    # all-MiniLM-L6-v2 behind a batching service shared by every session
+    # (or the sidecar process when EMBED_SOCKET is set)
+    return get_embedding_service()
 
-model = load_model()
+@st.cache_resource
+def start_model_warmup():
+    # Once per process, off the script thread; a search that arrives first
+    # simply waits in load_model() for the same load
+    return prewarm()
 
 # -------------------------------------------------
 # Utility Functions (UNCHANGED)
 # -------------------------------------------------
-def clean_html(text):
-    if not isinstance(text, str):
-        return ""
-    text = re.sub(r"<.*?>", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
-
-def extract_resume_text(pdf_file):
-    reader = PdfReader(pdf_file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text.strip()
-
-def determine_country(location_text):
-    loc = str(location_text).lower()
-    mapping = {
-        "india": "India", "canada": "Canada", "uk": "UK",
-        "united kingdom": "UK", "australia": "Australia",
-        "germany": "Germany", "france": "France", "singapore": "Singapore"
-    }
-    for k, v in mapping.items():
-        if k in loc:
-            return v
-    return "USA"
-
-# -------------------------------------------------
-# Location Matching (NEW – CORE CHANGE)
-# -------------------------------------------------
-def location_match(job_location, user_location):
-    if not job_location or not user_location:
-        return True
-
-    jl = job_location.lower()
-    ul = user_location.lower()
-
-    # Always allow remote roles
-    if "remote" in jl:
-        return True
-
-    # Direct substring match
-    if ul in jl:
-        return True
-
-    country_map = {
-        "india": ["india", "in"],
-        "usa": ["united states", "usa", "us"],
-        "uk": ["united kingdom", "uk", "england"],
-        "canada": ["canada"],
-        "australia": ["australia"],
-        "germany": ["germany"],
-        "france": ["france"],
-        "singapore": ["singapore"]
-    }
-
-    for key, variants in country_map.items():
-        if ul == key and any(v in jl for v in variants):
-            return True
-
-    return False
-
-# -------------------------------------------------
-# ATS Fetchers (BACKEND ONLY)
-# -------------------------------------------------
-def fetch_lever_jobs(company):
-    try:
-        url = f"https://api.lever.co/v0/postings/{company}?mode=json"
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            return []
-        return [{
-            "title": j.get("text"),
-            "company": company.title(),
-            "location": j.get("categories", {}).get("location", ""),
-            "description": clean_html(j.get("description", "")),
-            "job_url": j.get("hostedUrl"),
-            "source": "Lever"
-        } for j in r.json()]
-    except Exception:
-        return []
-
-def fetch_greenhouse_jobs(company):
+def load_resume(resume_file):
+    # Parsed page-parallel and cached with its embedding by content hash, so
+    # searching again with the same upload skips both the parse and the encode
     try:
-        url = f"https://boards-api.greenhouse.io/v1/boards/{company}/jobs"
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            return []
-        return [{
-            "title": j.get("title"),
-            "company": company.title(),
-            "location": j.get("location", {}).get("name", ""),
-            "description": clean_html(j.get("content", "")),
-            "job_url": j.get("absolute_url"),
-            "source": "Greenhouse"
-        } for j in r.json().get("jobs", [])]
-    except Exception:
-        return []
-
-def fetch_all_ats_jobs():
-    jobs = []
-    for c in ATS_COMPANIES["lever"]:
-        jobs.extend(fetch_lever_jobs(c))
-    for c in ATS_COMPANIES["greenhouse"]:
-        jobs.extend(fetch_greenhouse_jobs(c))
-    return pd.DataFrame(jobs)
-
-# -------------------------------------------------
-# Deduplication (IN-MEMORY)
-# -------------------------------------------------
-def job_fingerprint(row):
-    base = (
-        str(row.get("title","")) +
-        str(row.get("company","")) +
-        str(row.get("location",""))
-    ).lower()
-    return hashlib.md5(base.encode()).hexdigest()
+        return get_resume_processor().process(resume_file.getvalue(), embed)
+    except ResumeRejected as e:
+        st.error(str(e))
+        return None
 
 # -------------------------------------------------
 # RAG Utilities (UNCHANGED LOGIC)
 # -------------------------------------------------
-def chunk_text(text, chunk_size=300):
-    words = clean_html(text).split()
-    return [" ".join(words[i:i+chunk_size]) for i in range(0, len(words), chunk_size)]
+@st.cache_resource
+def load_job_index():
+    from job_index import JobIndex
 
-def rank_jobs_with_rag(resume_text, jobs_df):
-    if not resume_text or jobs_df.empty:
-        jobs_df["match_score"] = 0
-        return jobs_df
+    return JobIndex(dim=EMBED_DIM)
 
-    chunks, mapping = [], []
+@st.cache_resource
+def load_embedding_cache():
+    return EmbeddingCache(EMBED_DIM)
 
-    for idx, row in jobs_df.iterrows():
-        for ch in chunk_text(row["description"]):
-            if ch.strip():
-                chunks.append(ch)
-                mapping.append(idx)
+@st.cache_resource
+def load_job_store():
+    # Searches read the local store; the crawler keeps it fresh in the background
+    store = JobStore()
+    crawler = ATSCrawler(store=store)
+    if store.last_crawled() is None:
+        crawler.crawl_once()
+    if ATS_CRAWL_IN_APP:
+        crawler.start(delay=crawler.interval)
+    return store
 
-    if not chunks:
+@st.cache_resource
+def start_metrics_exporter():
+    # Streamlit has no routes of its own, so metrics get a small HTTP server
+    registry.register_stats("jobspy_scrape_cache", scrape_cache.stats, "Scrape cache counters")
+    registry.register_stats("jobspy_ats_cache", ats_cache_stats, "ATS response cache counters")
+    registry.register_stats("jobspy_embedding_cache", load_embedding_cache().stats, "Embedding cache counters")
+    registry.register_stats("jobspy_resume", get_resume_processor().stats, "Resume processing counters")
+    return start_http_server(METRICS_PORT) if METRICS_PORT else None
+
+def embed(texts):
+    # Content-addressed: only texts never encoded before reach the model
+    cache = load_embedding_cache()
+    model = load_model()
+    emb = cache.encode(texts, timed("embed.encode", model.encode), model.model_id)
+    cache.save()
+    return emb
+
+def rank_jobs_with_rag(resume, jobs_df):
+    if not resume or not resume["text"] or jobs_df.empty:
         jobs_df["match_score"] = 0
         return jobs_df
 
-    emb = model.encode(chunks, show_progress_bar=False)
-    faiss.normalize_L2(emb)
-    index = faiss.IndexFlatIP(EMBED_DIM)
-    index.add(emb)
-
-    r_emb = model.encode([resume_text])
+    import faiss
+    from job_index import hybrid_scores
+
+    # Only jobs the persistent index has not seen yet get chunked and encoded
+    job_index = load_job_index()
+    with span("rank.index"):
+        job_index.add_jobs(
+            dict(zip(jobs_df["job_id"], jobs_df["description"])),
+            embed
+        )
+        job_index.expire()
+        job_index.save()
+
+    resume_text = resume["text"]
+    r_emb = resume["embedding"][None, :].copy()
     faiss.normalize_L2(r_emb)
 
-    scores, idxs = index.search(r_emb, min(20, len(chunks)))
-
-    job_scores = {}
-    for s, i in zip(scores[0], idxs[0]):
-        job_scores[mapping[i]] = max(job_scores.get(mapping[i], 0), s)
+    # Hybrid: exact best-chunk similarity for every job, blended with BM25 of
+    # the resume against title + description
+    with span("rank.lexical"):
+        lexical_index = TextIndex()
+        lexical_index.add_many(jobs_df["job_id"].tolist(), title=jobs_df["title"].fillna("").tolist(),
+                               description=jobs_df["description"].tolist())
+        keys, values = lexical_index.search(resume_text, require=None, prefix=False)
+    with span("rank.score"):
+        job_scores = hybrid_scores(job_index.score(r_emb, jobs_df["job_id"]), dict(zip(keys, values.tolist())))
+    if not job_scores:
+        jobs_df["match_score"] = 0
+        return jobs_df
 
-    jobs_df["match_score"] = jobs_df.index.map(
-        lambda i: round(job_scores.get(i, 0) * 100, 2)
-    )
+    jobs_df["match_score"] = (jobs_df["job_id"].map(job_scores).fillna(0) * 100).round(2)
 
     return jobs_df.sort_values("match_score", ascending=False)
 
@@ -259,27 +183,28 @@ if search_clicked:
     else:
         with st.spinner("Scraping, filtering, and ranking jobs..."):
 
-            country = country_override if country_override != "Auto-detect" else determine_country(location)
+            country = country_override if country_override != "Auto-detect" else country_for_search(location)
 
             # ATS jobs
-            ats_df = fetch_all_ats_jobs()
-            if not ats_df.empty:
-                ats_df = ats_df[
-                    ats_df["location"].apply(lambda x: location_match(x, location))
-                ]
-                ats_df = ats_df[
-                    ats_df["title"].str.contains(job_role, case=False, na=False)
-                ]
+            with span("search.ats"):
+                ats_df = load_job_store().search(job_role, location)
 
             # JobSpy jobs
-            jobspy_df = scrape_jobs(
-                site_name=["indeed", "linkedin"],
-                search_term=job_role,
-                location=location,
-                results_wanted=results_wanted,
-                hours_old=48,
-                country_indeed=country
-            )
+            from jobspy import scrape_jobs
+
+            with span("search.scrape"):
+                try:
+                    jobspy_df, _ = scrape_sites(dict(
+                        site_name=["indeed", "linkedin"],
+                        search_term=job_role,
+                        location=location,
+                        results_wanted=results_wanted,
+                        hours_old=48,
+                        country_indeed=country
+                    ), scrape_jobs)
+                except RuntimeError as e:
+                    st.caption(f"Job boards unavailable right now: {e}")
+                    jobspy_df = pd.DataFrame()
 
             if not jobspy_df.empty:
                 jobspy_df["source"] = "JobBoard"
@@ -288,35 +213,22 @@ if search_clicked:
             jobs_df["description"] = jobs_df["description"].fillna("")
 
             # Deduplication
-            jobs_df["job_id"] = jobs_df.apply(job_fingerprint, axis=1)
-            jobs_df = jobs_df.drop_duplicates("job_id")
+            with span("search.dedupe"):
+                jobs_df = dedupe_jobs(jobs_df, near_duplicates=True)
 
             # RAG ranking
-            resume_text = extract_resume_text(resume_file) if resume_file else None
-            jobs_df = rank_jobs_with_rag(resume_text, jobs_df)
-
-            st.markdown(f"### Jobs Found: {len(jobs_df)}")
-
-            for _, row in jobs_df.iterrows():
-                st.markdown(
-                    f"""
-                    <div style="background:black;padding:1.5rem;
-                    border-radius:12px;margin-bottom:1rem;
-                    box-shadow:0 4px 12px rgba(0,0,0,0.08)">
-                        <a href="{row.get('job_url', '#')}" target="_blank"
-                           style="font-size:1.1rem;font-weight:700;color:#4DA6FF">
-                            {row.get('title', 'N/A')}
-                        </a>
-                        <div style="color:white">
-                            {row.get('company', 'N/A')} — {row.get('location', 'N/A')}
-                        </div>
-                        <div style="color:white;font-weight:600">
-                            Match Score: {row.get('match_score', 0)}%
-                        </div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+            with span("search.resume"):
+                resume = load_resume(resume_file) if resume_file else None
+            if resume and resume["truncated"]:
+                st.caption(f"Only the first {resume['pages']} pages of your resume were used.")
+            with span("search.rank"):
+                jobs_df = rank_jobs_with_rag(resume, jobs_df)
+
+            # One markdown call renders the whole list
+            with span("search.render"):
+                results = JobTable.from_frame(jobs_df)
+                st.markdown(f"### Jobs Found: {len(results)}")
+                st.markdown(results.render_cards(), unsafe_allow_html=True)
 
 else:
     st.info("Enter details in the sidebar to start your job search.")
@@ -329,3 +241,10 @@ st.markdown(
     "<p style='text-align:center'>Built by Akash Karri | GenAI + FAISS Retrieval</p>",
     unsafe_allow_html=True
 )
+
+# -------------------------------------------------
+# Background Model Warm-Up
+# -------------------------------------------------
+# Started after the page has been sent, so the first paint never waits on it
+start_model_warmup()
+start_metrics_exporter()
@@ -0,0 +1,317 @@
+import bisect
+import re
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+
+# -------------------------------------------------
+# Analyzer Configuration
+# -------------------------------------------------
+BM25_K1 = 1.2
+BM25_B = 0.75
+FIELD_WEIGHTS = {"title": 1.0, "description": 0.3}
+MAX_PREFIX_TERMS = 64        # most frequent completions scored for a prefix term
+MAX_QUERY_TERMS = 31         # one bit each in the per-document match mask
+DENSE_RATIO = 1 / 16         # required terms in more docs than this are gathered, not scattered
+COMPACT_RATIO = 0.5          # rebuild postings once half the documents are dead
+
+# Abbreviations expand to the words they stand for, on both the index and
+# the query side, so "ML Engineer" and "Machine Learning Engineer" analyze alike
+ABBREVIATIONS = {
+    "ml": "machine learning", "ai": "artificial intelligence", "mle": "machine learning engineer",
+    "nlp": "natural language processing", "cv": "computer vision", "llm": "large language model",
+    "swe": "software engineer", "sde": "software development engineer",
+    "sre": "site reliability engineer", "pm": "product manager", "tpm": "technical program manager",
+    "qa": "quality assurance", "ux": "user experience", "ui": "user interface",
+    "bi": "business intelligence", "sr": "senior", "jr": "junior", "mgr": "manager",
+    "eng": "engineer", "dev": "developer", "devs": "developers",
+}
+
+# Spelling variants folded into one token before tokenizing
+VARIANTS = {
+    r"front[\s-]+end": "frontend",
+    r"back[\s-]+end": "backend",
+    r"full[\s-]+stack": "fullstack",
+    r"dev[\s-]+ops": "devops",
+    r"ml[\s-]+ops": "mlops",
+    r"e[\s-]?commerce": "ecommerce",
+    r"c\+\+": "cpp",
+    r"c#": "csharp",
+}
+
+_VARIANT_RE = re.compile("|".join(f"(?:{p})" for p in VARIANTS), re.IGNORECASE)
+_VARIANT_PATTERNS = [(re.compile(p, re.IGNORECASE), token) for p, token in VARIANTS.items()]
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _fold_variant(match):
+    text = match.group(0)
+    for pattern, token in _VARIANT_PATTERNS:
+        if pattern.fullmatch(text):
+            return f" {token} "
+    return text
+
+
+def _stem(token):
+    # Plural folding only; anything heavier hurts prefix queries
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def analyze(text, prefix=False):
+    """Tokens of ``text`` after variant folding, abbreviation expansion and
+    plural folding. With ``prefix`` the last token is returned separately
+    (unstemmed) for prefix matching, unless it was an abbreviation."""
+    words = _TOKEN_RE.findall(_VARIANT_RE.sub(_fold_variant, text.lower()))
+    last = None
+    if prefix and words and words[-1] not in ABBREVIATIONS:
+        last = words.pop()
+    tokens = []
+    for word in words:
+        expanded = ABBREVIATIONS.get(word)
+        tokens.extend(expanded.split() if expanded else [word])
+    tokens = [_stem(t) for t in tokens]
+    return (tokens, last) if prefix else tokens
+
+# -------------------------------------------------
+# Inverted Index
+# -------------------------------------------------
+class TextIndex:
+    """Incremental in-memory inverted index with BM25 scoring.
+
+    Documents are keyed by any hashable ``key``; re-adding a key replaces it.
+    Postings are appended to compact ``array`` buffers as documents arrive and
+    frozen into numpy arrays the first time a term is queried, so a lookup is a handful
+    of vectorized adds over the matching postings only.
+    """
+
+    def __init__(self, fields=FIELD_WEIGHTS, k1=BM25_K1, b=BM25_B):
+        self.weights = dict(fields)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.keys = []
+        self.docs = {}
+        self.alive = []
+        self.lengths = {f: [] for f in self.weights}
+        self.total_length = {f: 0 for f in self.weights}
+        self.postings = {f: {} for f in self.weights}
+        self._frozen = {f: {} for f in self.weights}
+        self._vocab = {f: None for f in self.weights}
+        self._arrays = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    # -- ingestion ------------------------------------------------------
+    def add(self, key, **fields):
+        """Index one document; ``fields`` maps field name to its text."""
+        with self._lock:
+            if key in self.docs:
+                self._kill(self.docs[key])
+            doc = len(self.keys)
+            self.keys.append(key)
+            self.docs[key] = doc
+            self.alive.append(True)
+            for field in self.weights:
+                counts = Counter(analyze(fields.get(field) or ""))
+                length = sum(counts.values())
+                self.lengths[field].append(length)
+                self.total_length[field] += length
+                postings, frozen = self.postings[field], self._frozen[field]
+                for term, tf in counts.items():
+                    entry = postings.get(term)
+                    if entry is None:
+                        postings[term] = (array("i", [doc]), array("f", [tf]))
+                        self._vocab[field] = None
+                    else:
+                        entry[0].append(doc)
+                        entry[1].append(tf)
+                        frozen.pop(term, None)
+            self._arrays = None
+
+    def add_many(self, keys, **columns):
+        for i, key in enumerate(keys):
+            self.add(key, **{field: values[i] for field, values in columns.items()})
+
+    def remove(self, key):
+        with self._lock:
+            doc = self.docs.pop(key, None)
+            if doc is not None:
+                self._kill(doc)
+                self._maybe_compact()
+
+    def _kill(self, doc):
+        self.alive[doc] = False
+        for field in self.weights:
+            self.total_length[field] -= self.lengths[field][doc]
+        self._arrays = None
+
+    def _maybe_compact(self):
+        dead = len(self.keys) - len(self.docs)
+        if self.keys and dead / len(self.keys) > COMPACT_RATIO:
+            self.compact()
+
+    def compact(self):
+        """Rebuild postings without dead documents."""
+        with self._lock:
+            live = sorted(self.docs.values())
+            remap = np.full(len(self.keys), -1, dtype=np.int64)
+            remap[live] = np.arange(len(live))
+            keys = [self.keys[doc] for doc in live]
+            lengths = {f: [self.lengths[f][doc] for doc in live] for f in self.weights}
+            postings = self.postings
+            self._reset()
+            self.keys = keys
+            self.docs = {key: doc for doc, key in enumerate(keys)}
+            self.alive = [True] * len(keys)
+            for field in self.weights:
+                self.lengths[field] = lengths[field]
+                self.total_length[field] = sum(lengths[field])
+                for term, (docs, tfs) in postings[field].items():
+                    mapped = remap[np.frombuffer(docs, dtype=np.int32)]
+                    keep = mapped >= 0
+                    if keep.any():
+                        self.postings[field][term] = (
+                            array("i", mapped[keep].astype(np.int32).tobytes()),
+                            array("f", np.frombuffer(tfs, dtype=np.float32)[keep].tobytes()),
+                        )
+
+    # -- lookup ---------------------------------------------------------
+    def _doc_arrays(self):
+        if self._arrays is None:
+            self._arrays = (np.array(self.alive, dtype=bool), np.array(self.keys, dtype=object))
+        return self._arrays
+
+    def _norms(self, field):
+        lengths = np.array(self.lengths[field], dtype=np.float32)
+        avg = self.total_length[field] / max(len(self.docs), 1) or 1.0
+        return self.k1 * (1 - self.b + self.b * lengths / avg)
+
+    def _term(self, field, term):
+        """``[docs, impact, corpus_size, dense]`` for a term, where impact is the
+        precomputed BM25 weight of each posting (everything but the idf).
+
+        Length norms are taken when the term is frozen and refreshed once the
+        corpus has grown or shrunk by a tenth since.
+        """
+        frozen = self._frozen[field].get(term)
+        if frozen is None or abs(frozen[2] - len(self.docs)) > 0.1 * frozen[2]:
+            docs, tfs = self.postings[field][term]
+            docs = np.frombuffer(docs, dtype=np.int32).copy()
+            tfs = np.frombuffer(tfs, dtype=np.float32)
+            norms = self._norms(field)[docs]
+            impact = (self.weights[field] * tfs * (self.k1 + 1) / (tfs + norms)).astype(np.float32)
+            frozen = self._frozen[field][term] = [docs, impact, len(self.docs), None]
+        return frozen
+
+    def _dense(self, frozen, n):
+        """Impact of a common term as a full-length vector, for gathering."""
+        if frozen[3] is None or len(frozen[3]) < n:
+            dense = np.zeros(n, dtype=np.float32)
+            dense[frozen[0]] = frozen[1]
+            frozen[3] = dense
+        return frozen[3]
+
+    def _complete(self, field, prefix):
+        vocab = self._vocab[field]
+        if vocab is None:
+            vocab = self._vocab[field] = sorted(self.postings[field])
+        start = bisect.bisect_left(vocab, prefix)
+        end = bisect.bisect_left(vocab, prefix + "￿")
+        terms = vocab[start:end]
+        if len(terms) > MAX_PREFIX_TERMS:
+            postings = self.postings[field]
+            terms = sorted(terms, key=lambda t: len(postings[t][0]), reverse=True)[:MAX_PREFIX_TERMS]
+        return terms
+
+    def search(self, query, require="title", limit=None, prefix=True):
+        """Keys of documents matching every query term in the ``require``
+        field (the last term as a prefix), best BM25 score first. With
+        ``require=None`` any document containing any term matches.
+
+        Returns ``(keys, scores)``.
+        """
+        tokens, last = analyze(query or "", prefix=True) if prefix else (analyze(query or ""), None)
+        groups = [[t] for t in dict.fromkeys(tokens)]
+        with self._lock:
+            n = len(self.keys)
+            if last:
+                # "engineers" should still find the plural-folded "engineer"
+                groups.append(list(dict.fromkeys(self._complete(require, last) + [_stem(last)])))
+            if not groups or not self.docs:
+                return [], np.empty(0, dtype=np.float32)
+            alive, keys = self._doc_arrays()
+            live = len(self.docs)
+            if require is None:
+                return self._search_any(groups, alive, keys, limit)
+            terms, sizes = [], []
+            for bit, group in enumerate(groups[:MAX_QUERY_TERMS]):
+                size = 0
+                for field in self.weights:
+                    for term in group:
+                        if term in self.postings[field]:
+                            frozen = self._term(field, term)
+                            df = len(frozen[0])
+                            idf = np.float32(np.log1p((live - df + 0.5) / (df + 0.5)))
+                            terms.append((bit, field, frozen, idf))
+                            size += df if field == require else 0
+                if not size:
+                    return [], np.empty(0, dtype=np.float32)
+                sizes.append(size)
+
+            # The rarest required group seeds the candidates. Other terms are
+            # scattered into full-length arrays when rare, and gathered at the
+            # candidates only when common.
+            seed_bit = int(np.argmin(sizes))
+            scores = np.zeros(n, dtype=np.float32)
+            hits = np.zeros(n, dtype=np.int32)
+            seed_docs, common = [], []
+            for bit, field, frozen, idf in terms:
+                docs, impact = frozen[0], frozen[1]
+                if field == require and bit != seed_bit and len(docs) > live * DENSE_RATIO:
+                    common.append((self._dense(frozen, n), idf, np.int32(1 << bit)))
+                    continue
+                scores[docs] += idf * impact
+                if field == require:
+                    hits[docs] |= 1 << bit
+                    if bit == seed_bit:
+                        seed_docs.append(docs)
+            candidates = seed_docs[0] if len(seed_docs) == 1 else np.unique(np.concatenate(seed_docs))
+            found = hits[candidates]
+            ranked = scores[candidates]
+            for dense, idf, mask in common:
+                values = dense[candidates]
+                ranked += idf * values
+                found |= (values > 0) * mask
+            keep = (found == (1 << len(sizes)) - 1) & alive[candidates]
+            matched, ranked = candidates[keep], ranked[keep]
+            if limit and limit < len(matched):
+                top = np.argpartition(-ranked, limit - 1)[:limit]
+                matched, ranked = matched[top], ranked[top]
+            order = np.argsort(-ranked)
+            return keys[matched[order]].tolist(), ranked[order]
+
+    def _search_any(self, groups, alive, keys, limit):
+        live = len(self.docs)
+        scores = np.zeros(len(self.keys), dtype=np.float32)
+        for group in groups:
+            for field in self.weights:
+                for term in group:
+                    if term in self.postings[field]:
+                        docs, impact = self._term(field, term)[:2]
+                        idf = np.float32(np.log1p((live - len(docs) + 0.5) / (len(docs) + 0.5)))
+                        scores[docs] += idf * impact
+        matched = np.flatnonzero((scores > 0) & alive)
+        ranked = scores[matched]
+        if limit and limit < len(matched):
+            top = np.argpartition(-ranked, limit - 1)[:limit]
+            matched, ranked = matched[top], ranked[top]
+        order = np.argsort(-ranked)
+        return keys[matched[order]].tolist(), ranked[order]
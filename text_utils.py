@@ -0,0 +1,65 @@
+import html
+import re
+
+# -------------------------------------------------
+# Chunking Configuration
+# -------------------------------------------------
+CHUNK_TOKENS = 200   # words + punctuation per chunk, headroom for word pieces under the model's 256
+CHUNK_OVERLAP = 40   # tokens repeated from the end of the previous chunk
+
+# Tags must start like a tag, so "salary < 100k" in plain text survives
+_MARKUP = re.compile(r"<(script|style)\b.*?</\1\s*>|<!--.*?-->|</?[a-zA-Z!][^>]*>",
+                     re.DOTALL | re.IGNORECASE)
+# Word and punctuation units, as the BERT basic tokenizer splits them
+_TOKENS = re.compile(r"\w+|[^\w\s]")
+
+
+def _strip_markup(text):
+    if "&lt;" in text:  # entity-encoded markup, as Greenhouse sends it
+        text = html.unescape(text)
+    if "<" in text:
+        text = _MARKUP.sub(" ", text)
+    if "&" in text:
+        text = html.unescape(text)
+    return text
+
+
+def clean_html(text):
+    if not isinstance(text, str):
+        return ""
+    return " ".join(_strip_markup(text).split())
+
+# -------------------------------------------------
+# Token-Window Chunking
+# -------------------------------------------------
+def iter_text_chunks(text, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP, clean=True):
+    """Yield overlapping windows of at most ``max_tokens`` tokens from ``text``.
+
+    Punctuation counts as its own token and comes back space-separated, which
+    the model's tokenizer splits identically. Text without markup or entities
+    skips cleaning, so already-cleaned ATS descriptions are only tokenized.
+    """
+    if not isinstance(text, str):
+        return
+    tokens = _TOKENS.findall(_strip_markup(text) if clean else text)
+    step = max(max_tokens - overlap, 1)
+    for start in range(0, len(tokens), step):
+        yield " ".join(tokens[start:start + max_tokens])
+        if start + max_tokens >= len(tokens):
+            break
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP):
+    return list(iter_text_chunks(text, max_tokens, overlap))
+
+def iter_chunks(descriptions, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP, clean=True):
+    """Yield ``(key, chunk)`` for every chunk of every description.
+
+    ``descriptions`` is a mapping or Series (keys are the index) or any
+    iterable of ``(key, text)`` pairs such as
+    ``zip(df["job_id"], df["description"])``; only one description's tokens
+    are held at a time.
+    """
+    items = descriptions.items() if hasattr(descriptions, "items") else descriptions
+    for key, text in items:
+        for chunk in iter_text_chunks(text, max_tokens, overlap, clean):
+            yield key, chunk